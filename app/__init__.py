@@ -1,16 +1,15 @@
 import os
-from flask import Flask, jsonify, send_from_directory, render_template, request, redirect, url_for, session, flash
+from flask import Flask, send_from_directory, render_template, request, redirect, url_for, session, flash
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_swagger_ui import get_swaggerui_blueprint
 from functools import wraps
 
 from app.config import config_by_name
+from app.utils.read_only import RoutingSession
 
 # Initialize extensions
-db = SQLAlchemy()
-migrate = Migrate()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 
 # Configure Swagger UI
@@ -26,6 +25,12 @@ def admin_login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def init_migrate(app):
+    """Register Flask-Migrate, importing it (and Alembic) only when migrations are needed."""
+    if 'migrate' not in app.extensions:
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
 def create_app(config_name='default'):
     """Application factory function."""
     app = Flask(__name__)
@@ -35,11 +40,35 @@ def create_app(config_name='default'):
     if not app.config.get('SECRET_KEY'):
         app.config['SECRET_KEY'] = 'super_secret_key_replace_in_production'
     
+    # Configure the connection pools before the engines are created
+    from app.utils.pool import init_pool
+    init_pool(app)
+    
     # Initialize extensions with app
     db.init_app(app)
-    migrate.init_app(app, db)
     jwt.init_app(app)
     
+    # Web workers never migrate; the ``flask db`` commands and deploy scripts do
+    if os.environ.get('FLASK_RUN_FROM_CLI') == 'true':
+        init_migrate(app)
+    
+    # Apply the SQLite connection profile and track connections so bulk loads
+    # can refuse to run alongside the app
+    from app.utils.sqlite import init_sqlite
+    init_sqlite(app)
+    
+    # Serve the reads of GET requests from a separate read-only engine
+    from app.utils.read_only import init_read_only
+    init_read_only(app)
+    
+    # Opt-in SQL and serialization timing in a Server-Timing header
+    from app.utils.request_timing import init_request_timing
+    init_request_timing(app)
+    
+    # Prometheus metrics at /metrics
+    from app.utils.metrics import init_metrics
+    init_metrics(app)
+    
     # Register blueprints
     from app.api.v1 import api_bp
     app.register_blueprint(api_bp, url_prefix='/api/v1')
@@ -65,43 +94,43 @@ def create_app(config_name='default'):
 
 def register_routes(app):
     """Register all routes for the application."""
-    import json
     from app.models.user import User
     from app.models.item import Item
     from app.models.pharmaceutical import Company, Drug, Brand, AdultDosage, PediatricDosage, NeonatalDosage
+    from app.utils.static_docs import StaticDocument, serve_document
+    
+    # Static API documents, kept in memory with their gzip variants and ETags
+    static_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+    swagger_doc = StaticDocument(os.path.join(static_dir, 'swagger.json'), 'application/json')
+    index_doc = StaticDocument(os.path.join(static_dir, 'index.html'), 'text/html')
+    postman_doc = StaticDocument(os.path.join(static_dir, 'pharma-api-postman-collection.json'), 'application/json')
+    for document in (swagger_doc, index_doc, postman_doc):
+        try:
+            document.refresh()
+        except FileNotFoundError:
+            # Served as a 404 until the file appears
+            pass
     
-    # Direct route for swagger.json
+    # Single route for swagger.json; /api/v1/swagger.json is kept as an alias
     @app.route('/swagger.json')
+    @app.route('/api/v1/swagger.json')
     def serve_swagger():
-        # Get the absolute path to the swagger.json file
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        swagger_file = os.path.join(current_dir, 'static', 'swagger.json')
-        
-        # Check if the file exists
-        if not os.path.exists(swagger_file):
-            return jsonify({"error": "Swagger file not found"}), 404
-        
-        # Read the file and return its contents
-        with open(swagger_file, 'r') as f:
-            swagger_data = json.load(f)
-        
-        return jsonify(swagger_data)
+        return serve_document(swagger_doc)
+    
+    # These take precedence over the generic static file route
+    @app.route('/static/index.html')
+    def serve_index():
+        return serve_document(index_doc)
+    
+    @app.route('/static/pharma-api-postman-collection.json')
+    def serve_postman_collection():
+        return serve_document(postman_doc)
 
     # Redirect to Swagger UI
     @app.route('/api/docs')
     def swagger_ui():
         return redirect('/api/docs/')
 
-    # Load JSON data function
-    def load_json_data(file_path, limit=None):
-        try:
-            with open(file_path, 'r') as file:
-                data = json.load(file)
-                return data[:limit] if limit else data
-        except Exception as e:
-            print(f"Error loading JSON file {file_path}: {e}")
-            return []
-
     # Routes
     @app.route('/')
     def home():
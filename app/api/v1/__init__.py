@@ -1,4 +1,4 @@
-from flask import Blueprint, send_from_directory
+from flask import Blueprint
 from flask_restful import Api
 
 # Create blueprint
@@ -14,8 +14,11 @@ from .resources.pharmaceutical import (
     BrandResource, BrandListResource,
     AdultDosageResource, AdultDosageListResource,
     PediatricDosageResource, PediatricDosageListResource,
-    NeonatalDosageResource, NeonatalDosageListResource
+    NeonatalDosageResource, NeonatalDosageListResource,
+    DosingResource, DrugEligibilityResource
 )
+from .resources.admin import PoolStatsResource, ExportResource
+from .resources.catalog import CatalogBundleResource, CatalogBundleInfoResource, ChangeFeedResource
 
 # User endpoints
 api.add_resource(UserListResource, '/users')
@@ -39,8 +42,14 @@ api.add_resource(PediatricDosageListResource, '/pediatric-dosages')
 api.add_resource(PediatricDosageResource, '/pediatric-dosages/<int:dosage_id>')
 api.add_resource(NeonatalDosageListResource, '/neonatal-dosages')
 api.add_resource(NeonatalDosageResource, '/neonatal-dosages/<int:dosage_id>')
+api.add_resource(DosingResource, '/dosing')
+api.add_resource(DrugEligibilityResource, '/eligibility')
 
-# Add route to serve swagger.json
-@api_bp.route('/swagger.json')
-def swagger():
-    return send_from_directory('app/static', 'swagger.json') 
\ No newline at end of file
+# Offline catalog bundle
+api.add_resource(CatalogBundleResource, '/catalog/bundle')
+api.add_resource(CatalogBundleInfoResource, '/catalog/bundle/info')
+api.add_resource(ChangeFeedResource, '/changes')
+
+# Admin endpoints
+api.add_resource(PoolStatsResource, '/admin/pool')
+api.add_resource(ExportResource, '/export/<string:table>.<any(csv, ndjson):fmt>') 
@@ -0,0 +1,64 @@
+import os
+from flask import Response, current_app, request
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app import db
+from app.models.user import User
+from app.utils.error_handlers import NotFoundError, AuthError
+from app.utils.export import EXPORT_TABLES, EXPORT_FORMATS, export_stream
+from app.utils.pool import app_engines, pool_stats
+
+
+class PoolStatsResource(Resource):
+    """Resource for connection pool statistics of the serving worker."""
+    
+    @jwt_required()
+    def get(self):
+        """Get the pool statistics of each database engine."""
+        # Check if user is admin
+        current_user_id = get_jwt_identity()
+        current_user = User.query.get(current_user_id)
+        
+        if not current_user.admin:
+            raise AuthError("Admin privileges required")
+        
+        # Pools are per process, so the statistics are those of this worker
+        return {
+            "pid": os.getpid(),
+            "engines": {
+                name: pool_stats(engine)
+                for name, engine in app_engines(current_app._get_current_object()).items()
+            }
+        }, 200
+
+
+class ExportResource(Resource):
+    """Resource for streaming full-table exports."""
+    
+    @jwt_required()
+    def get(self, table, fmt):
+        """Stream every row of a catalog table as CSV or NDJSON."""
+        # Check if user is admin
+        current_user_id = get_jwt_identity()
+        current_user = User.query.get(current_user_id)
+        
+        if not current_user.admin:
+            raise AuthError("Admin privileges required")
+        
+        if table not in EXPORT_TABLES:
+            raise NotFoundError(f"Unknown export table {table}; expected one of {', '.join(EXPORT_TABLES)}")
+        
+        # Compress on the fly for clients that accept it
+        gzip = request.accept_encodings['gzip'] > 0
+        # A GET request's bind is the read-only engine, when there is one
+        engine = db.session.get_bind()
+        response = Response(
+            export_stream(engine, EXPORT_TABLES[table], fmt, gzip=gzip),
+            content_type=EXPORT_FORMATS[fmt]
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename={table}.{fmt}'
+        response.headers['Vary'] = 'Accept-Encoding'
+        if gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
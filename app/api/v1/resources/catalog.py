@@ -0,0 +1,70 @@
+from flask import current_app, request, send_file
+from flask_restful import Resource
+
+from app import db
+from app.models.change_log import ChangeLog
+from app.schemas.change_log import ChangeLogSchema
+from app.utils.bundle import current_bundle, bundle_path
+from app.utils.error_handlers import ValidationError
+
+# Change records returned per page by default and at most
+DEFAULT_CHANGES_LIMIT = 1000
+MAX_CHANGES_LIMIT = 10000
+
+
+class CatalogBundleResource(Resource):
+    """Resource for downloading the offline catalog bundle."""
+    
+    def get(self):
+        """Download the current catalog as a gzip-compressed SQLite file."""
+        app = current_app._get_current_object()
+        bundle = current_bundle(db.session.get_bind())
+        
+        # The version doubles as the ETag, so unchanged catalogs answer 304
+        response = send_file(
+            bundle_path(app, bundle),
+            mimetype='application/gzip',
+            as_attachment=True,
+            download_name=f"catalog-{bundle['version']}.sqlite.gz",
+            etag=bundle['version'],
+            conditional=True,
+            max_age=0
+        )
+        response.headers['X-Catalog-Version'] = bundle['version']
+        response.headers['X-Catalog-Uncompressed-Size'] = str(bundle['uncompressed_size'])
+        response.headers['X-Catalog-SHA256'] = bundle['sha256']
+        return response
+
+
+class CatalogBundleInfoResource(Resource):
+    """Resource for the metadata of the offline catalog bundle."""
+    
+    def get(self):
+        """Get the version, size and row counts of the current catalog bundle."""
+        bundle = current_bundle(db.session.get_bind())
+        return {key: value for key, value in bundle.items() if key != 'file'}, 200
+
+
+class ChangeFeedResource(Resource):
+    """Resource for incremental sync from the change log."""
+    
+    def get(self):
+        """Get the catalog changes recorded after a sequence number."""
+        since = request.args.get('since', 0, type=int)
+        limit = request.args.get('limit', DEFAULT_CHANGES_LIMIT, type=int)
+        
+        if since < 0:
+            raise ValidationError("since must not be negative")
+        if not 1 <= limit <= MAX_CHANGES_LIMIT:
+            raise ValidationError(f"limit must be between 1 and {MAX_CHANGES_LIMIT}")
+        
+        # One row past the page tells whether more changes follow
+        changes = ChangeLog.query.filter(ChangeLog.seq > since).order_by(ChangeLog.seq).limit(limit + 1).all()
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        
+        return {
+            "changes": ChangeLogSchema(many=True).dump(changes),
+            "next_since": changes[-1].seq if changes else since,
+            "has_more": has_more
+        }, 200
@@ -10,6 +10,11 @@ from app.schemas.pharmaceutical import (
     AdultDosageSchema, PediatricDosageSchema, NeonatalDosageSchema
 )
 from app.utils.error_handlers import NotFoundError, ValidationError, AuthError
+from app.utils.age_range import ADULT_MIN_AGE_DAYS
+from app.utils.eligibility import get_eligibility, describe_flags
+
+# Upper bound on drug IDs answered by a single eligibility request
+MAX_ELIGIBILITY_BATCH = 10000
 
 
 # Company resources
@@ -666,4 +671,60 @@ class NeonatalDosageListResource(Resource):
         
         except Exception as e:
             db.session.rollback()
-            raise ValidationError(str(e)) 
\ No newline at end of file
+            raise ValidationError(str(e))
+
+
+# Dosing lookup resource
+class DosingResource(Resource):
+    """Resource for age-based dosing lookups across all populations."""
+    
+    def get(self):
+        """Get the dosages of a drug that apply to a patient of the given age."""
+        drug_id = request.args.get('drug_id', type=int)
+        age_days = request.args.get('age_days', type=int)
+        
+        if drug_id is None or age_days is None:
+            raise ValidationError("drug_id and age_days query parameters are required")
+        if age_days < 0:
+            raise ValidationError("age_days must not be negative")
+        
+        # Range query served by the (drug_id, age_min_days, age_max_days) index
+        def applicable(model):
+            return model.query.filter(
+                model.drug_id == drug_id,
+                model.age_min_days <= age_days,
+                model.age_max_days >= age_days
+            ).all()
+        
+        adult_dosages = []
+        if age_days >= ADULT_MIN_AGE_DAYS:
+            adult_dosages = AdultDosage.query.filter_by(drug_id=drug_id).all()
+        
+        return {
+            "drug_id": drug_id,
+            "age_days": age_days,
+            "adult": AdultDosageSchema(many=True).dump(adult_dosages),
+            "pediatric": PediatricDosageSchema(many=True).dump(applicable(PediatricDosage)),
+            "neonatal": NeonatalDosageSchema(many=True).dump(applicable(NeonatalDosage))
+        }, 200
+
+
+class DrugEligibilityResource(Resource):
+    """Resource for batch dosing eligibility checks."""
+    
+    def post(self):
+        """Get adult/pediatric/neonatal eligibility for many drugs at once."""
+        json_data = request.get_json()
+        if not json_data or not isinstance(json_data.get('drug_ids'), list):
+            raise ValidationError("A list of drug_ids is required")
+        
+        drug_ids = json_data['drug_ids']
+        if len(drug_ids) > MAX_ELIGIBILITY_BATCH:
+            raise ValidationError(f"At most {MAX_ELIGIBILITY_BATCH} drug_ids can be checked per request")
+        if not all(isinstance(drug_id, int) and not isinstance(drug_id, bool) for drug_id in drug_ids):
+            raise ValidationError("drug_ids must be integers")
+        
+        flags = get_eligibility(drug_ids)
+        return {
+            "eligibility": {str(drug_id): describe_flags(value) for drug_id, value in flags.items()}
+        }, 200
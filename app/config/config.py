@@ -16,6 +16,34 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 hour
     API_TITLE = os.getenv('API_TITLE', 'Advanced Flask API')
     API_VERSION = os.getenv('API_VERSION', '1.0')
+    ELIGIBILITY_CACHE_TTL = int(os.getenv('ELIGIBILITY_CACHE_TTL', 60))  # seconds
+    STATIC_DOCS_MAX_AGE = int(os.getenv('STATIC_DOCS_MAX_AGE', 86400))  # Cache-Control max-age of API docs, seconds
+    # Offline catalog bundle; defaults to <instance>/bundles
+    CATALOG_BUNDLE_DIR = os.getenv('CATALOG_BUNDLE_DIR')
+    CATALOG_BUNDLE_CHECK_TTL = int(os.getenv('CATALOG_BUNDLE_CHECK_TTL', 60))  # seconds
+    # SQLite profile applied to every new connection (ignored by other databases);
+    # an empty value (or 0) keeps SQLite's default for that setting
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000) or 0)  # milliseconds
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024) or 0)  # bytes
+    SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', -65536) or 0)  # pages, or KiB if negative
+    SQLITE_TEMP_STORE = os.getenv('SQLITE_TEMP_STORE', 'MEMORY')
+    SQLITE_FOREIGN_KEYS = os.getenv('SQLITE_FOREIGN_KEYS', 'true').lower() in ('1', 'true', 'yes')
+    # Connection pool of each engine (not used by in-memory SQLite databases)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))  # seconds to wait for a connection
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # seconds; -1 never recycles
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    # Read-only engine for GET requests: DATABASE_READ_URL (e.g. a replica), or the
+    # primary SQLite file opened with mode=ro when unset
+    READ_ONLY_ENGINE = os.getenv('READ_ONLY_ENGINE', 'true').lower() in ('1', 'true', 'yes')
+    DATABASE_READ_URL = os.getenv('DATABASE_READ_URL')
+    # Per-request SQL count, DB and serialization time in a Server-Timing header
+    REQUEST_TIMING = os.getenv('REQUEST_TIMING', 'false').lower() in ('1', 'true', 'yes')
+    # Prometheus metrics at /metrics; set PROMETHEUS_MULTIPROC_DIR to aggregate gunicorn workers
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
 
 
 class DevelopmentConfig(Config):
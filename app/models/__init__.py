@@ -1,5 +1,7 @@
 from app.models.user import User
 from app.models.item import Item
 from app.models.pharmaceutical import (
-    Company, Drug, Brand, AdultDosage, PediatricDosage, NeonatalDosage
-) 
\ No newline at end of file
+    Company, Drug, Brand, AdultDosage, PediatricDosage, NeonatalDosage, DrugEligibility
+) 
+from app.models.import_record import ImportRecord
+from app.models.change_log import ChangeLog
@@ -0,0 +1,26 @@
+from sqlalchemy import event
+
+from app import db
+from app.utils.change_log import install_triggers
+
+
+class ChangeLog(db.Model):
+    """Change to a catalog row, appended by database triggers."""
+    __tablename__ = 'change_log'
+    # AUTOINCREMENT keeps SQLite from reusing the sequence numbers of pruned rows
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    seq = db.Column(db.Integer, primary_key=True)
+    # Entity name (e.g. ``brand``), its ID and, for brand-drug links, the drug ID
+    entity = db.Column(db.String(32), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    related_id = db.Column(db.Integer, nullable=True)
+    op = db.Column(db.String(8), nullable=False)
+    changed_at = db.Column(db.DateTime, nullable=False, server_default=db.func.current_timestamp())
+    
+    def __repr__(self):
+        return f'<ChangeLog {self.seq} {self.op} {self.entity}:{self.entity_id}>'
+
+
+# Tables created with create_all() get the triggers too; migrations create them explicitly
+event.listen(db.metadata, 'after_create', install_triggers)
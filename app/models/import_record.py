@@ -0,0 +1,18 @@
+from datetime import datetime
+from app import db
+
+
+class ImportRecord(db.Model):
+    """Content hash of a source record as of the last delta import."""
+    __tablename__ = 'import_records'
+    
+    # Source file (e.g. ``companies``) and the record's ID in that file
+    source = db.Column(db.String(50), primary_key=True)
+    source_key = db.Column(db.String(64), primary_key=True)
+    content_hash = db.Column(db.String(64), nullable=False)
+    # ID of the row the record was imported into, when it maps to a single row
+    row_id = db.Column(db.Integer, nullable=True)
+    imported_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ImportRecord {self.source}:{self.source_key}>'
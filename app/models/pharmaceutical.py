@@ -1,5 +1,8 @@
 from datetime import datetime
+from sqlalchemy import event, inspect
 from app import db
+from app.utils.age_range import resolve_age_bounds
+from app.utils.hashing import dosage_content_hash
 
 
 class Company(db.Model):
@@ -7,6 +10,8 @@ class Company(db.Model):
     __tablename__ = 'companies'
     
     id = db.Column(db.Integer, primary_key=True)
+    # ID of the company in the supplier feed (COMPANY.json ``ID``, brand ``CID``)
+    source_id = db.Column(db.Integer, nullable=True, unique=True, index=True)
     name = db.Column(db.String(255), nullable=False, unique=True)
     code = db.Column(db.String(50), nullable=True)
     address = db.Column(db.Text, nullable=True)
@@ -26,6 +31,8 @@ class Drug(db.Model):
     __tablename__ = 'drugs'
     
     id = db.Column(db.Integer, primary_key=True)
+    # ID of the drug in the supplier feed (DRUG.json ``ID``, dosage ``CODE``)
+    source_id = db.Column(db.Integer, nullable=True, unique=True, index=True)
     name = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text, nullable=True)
     category = db.Column(db.String(100), nullable=True)
@@ -47,6 +54,8 @@ class Brand(db.Model):
     __tablename__ = 'brands'
     
     id = db.Column(db.Integer, primary_key=True)
+    # ID of the brand in the supplier feed (BRAND.json ``BID``)
+    source_id = db.Column(db.Integer, nullable=True, unique=True, index=True)
     name = db.Column(db.String(255), nullable=False)
     strength = db.Column(db.String(100), nullable=True)
     form = db.Column(db.String(100), nullable=True)
@@ -78,6 +87,9 @@ class AdultDosage(db.Model):
     frequency = db.Column(db.String(100), nullable=True)
     route = db.Column(db.String(100), nullable=True)
     notes = db.Column(db.Text, nullable=True)
+    # Hash of the drug and normalized dosage content, used by the importer to
+    # skip rows it already stored; not unique, so the API may store identical rows
+    content_hash = db.Column(db.String(64), nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -88,15 +100,24 @@ class AdultDosage(db.Model):
 class PediatricDosage(db.Model):
     """Model for pediatric dosage information."""
     __tablename__ = 'pediatric_dosages'
+    __table_args__ = (
+        db.Index('ix_pediatric_dosages_drug_age', 'drug_id', 'age_min_days', 'age_max_days'),
+    )
+    population = 'pediatric'
     
     id = db.Column(db.Integer, primary_key=True)
     drug_id = db.Column(db.Integer, db.ForeignKey('drugs.id'), nullable=False)
     indication = db.Column(db.Text, nullable=True)
     dosage = db.Column(db.Text, nullable=True)
     age_range = db.Column(db.String(100), nullable=True)
+    age_min_days = db.Column(db.Integer, nullable=True)
+    age_max_days = db.Column(db.Integer, nullable=True)
     frequency = db.Column(db.String(100), nullable=True)
     route = db.Column(db.String(100), nullable=True)
     notes = db.Column(db.Text, nullable=True)
+    # Hash of the drug and normalized dosage content, used by the importer to
+    # skip rows it already stored; not unique, so the API may store identical rows
+    content_hash = db.Column(db.String(64), nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -107,17 +128,72 @@ class PediatricDosage(db.Model):
 class NeonatalDosage(db.Model):
     """Model for neonatal dosage information."""
     __tablename__ = 'neonatal_dosages'
+    __table_args__ = (
+        db.Index('ix_neonatal_dosages_drug_age', 'drug_id', 'age_min_days', 'age_max_days'),
+    )
+    population = 'neonatal'
     
     id = db.Column(db.Integer, primary_key=True)
     drug_id = db.Column(db.Integer, db.ForeignKey('drugs.id'), nullable=False)
     indication = db.Column(db.Text, nullable=True)
     dosage = db.Column(db.Text, nullable=True)
     age_range = db.Column(db.String(100), nullable=True)
+    age_min_days = db.Column(db.Integer, nullable=True)
+    age_max_days = db.Column(db.Integer, nullable=True)
     frequency = db.Column(db.String(100), nullable=True)
     route = db.Column(db.String(100), nullable=True)
     notes = db.Column(db.Text, nullable=True)
+    # Hash of the drug and normalized dosage content, used by the importer to
+    # skip rows it already stored; not unique, so the API may store identical rows
+    content_hash = db.Column(db.String(64), nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def __repr__(self):
-        return f'<NeonatalDosage for Drug ID {self.drug_id}>' 
\ No newline at end of file
+        return f'<NeonatalDosage for Drug ID {self.drug_id}>'
+
+
+class DrugEligibility(db.Model):
+    """Precomputed per-drug dosing eligibility flags for each population."""
+    __tablename__ = 'drug_eligibility'
+    
+    # Keyed by the drug ID referenced from the dosage tables
+    drug_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    flags = db.Column(db.SmallInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<DrugEligibility for Drug ID {self.drug_id}>'
+
+
+def set_age_bounds(mapper, connection, target):
+    """Derive the numeric age interval from ``age_range`` or the dosage notes."""
+    state = inspect(target)
+    notes = state.attrs.notes.history
+    if notes.deleted and not state.attrs.age_range.history.has_changes():
+        # A label filled in from the previous notes follows the notes when they change
+        previous_label = resolve_age_bounds(notes.deleted[0], target.population)[2]
+        if previous_label is not None and target.age_range == previous_label:
+            target.age_range = None
+
+    min_days, max_days, label = resolve_age_bounds(target.age_range or target.notes, target.population)
+    target.age_min_days = min_days
+    target.age_max_days = max_days
+    if not target.age_range and label:
+        target.age_range = label
+
+
+def set_content_hash(mapper, connection, target):
+    """Keep the dosage content hash in sync with its content."""
+    target.content_hash = dosage_content_hash(
+        target.drug_id, target.dosage, target.frequency, target.route, target.notes, target.indication
+    )
+
+
+for _model in (PediatricDosage, NeonatalDosage):
+    event.listen(_model, 'before_insert', set_age_bounds)
+    event.listen(_model, 'before_update', set_age_bounds)
+
+for _model in (AdultDosage, PediatricDosage, NeonatalDosage):
+    event.listen(_model, 'before_insert', set_content_hash)
+    event.listen(_model, 'before_update', set_content_hash)
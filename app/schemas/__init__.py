@@ -3,4 +3,5 @@ from .item import ItemSchema
 from .pharmaceutical import (
     CompanySchema, DrugSchema, BrandSchema, 
     AdultDosageSchema, PediatricDosageSchema, NeonatalDosageSchema
-) 
\ No newline at end of file
+) 
+from .change_log import ChangeLogSchema
@@ -0,0 +1,19 @@
+from marshmallow import Schema, fields, post_dump
+
+
+class ChangeLogSchema(Schema):
+    """Schema for ChangeLog entries in the change feed."""
+    
+    seq = fields.Int(dump_only=True)
+    entity = fields.Str(dump_only=True)
+    id = fields.Int(attribute='entity_id', dump_only=True)
+    related_id = fields.Int(dump_only=True)
+    op = fields.Str(dump_only=True)
+    changed_at = fields.DateTime(dump_only=True)
+    
+    @post_dump
+    def drop_empty_related_id(self, data, **kwargs):
+        """Keep records compact; only brand-drug links have a related ID."""
+        if data.get('related_id') is None:
+            data.pop('related_id', None)
+        return data
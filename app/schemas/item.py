@@ -17,5 +17,7 @@ class ItemSchema(Schema):
     
     @post_load
     def make_item(self, data, **kwargs):
-        """Create an Item instance from validated data."""
+        """Create an Item instance from validated data, or return the fields of a partial update."""
+        if kwargs.get('partial'):
+            return data
         return Item(**data) 
\ No newline at end of file
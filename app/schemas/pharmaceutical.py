@@ -6,6 +6,7 @@ class CompanySchema(Schema):
     """Schema for Company model."""
     
     id = fields.Int(dump_only=True)
+    source_id = fields.Int(dump_only=True)
     name = fields.Str(required=True, validate=validate.Length(min=1, max=255))
     code = fields.Str(validate=validate.Length(max=50))
     address = fields.Str()
@@ -15,7 +16,9 @@ class CompanySchema(Schema):
     
     @post_load
     def make_company(self, data, **kwargs):
-        """Create a Company instance from validated data."""
+        """Create a Company instance from validated data, or return the fields of a partial update."""
+        if kwargs.get('partial'):
+            return data
         return Company(**data)
 
 
@@ -23,6 +26,7 @@ class DrugSchema(Schema):
     """Schema for Drug model."""
     
     id = fields.Int(dump_only=True)
+    source_id = fields.Int(dump_only=True)
     name = fields.Str(required=True, validate=validate.Length(min=1, max=255))
     description = fields.Str()
     category = fields.Str(validate=validate.Length(max=100))
@@ -31,7 +35,9 @@ class DrugSchema(Schema):
     
     @post_load
     def make_drug(self, data, **kwargs):
-        """Create a Drug instance from validated data."""
+        """Create a Drug instance from validated data, or return the fields of a partial update."""
+        if kwargs.get('partial'):
+            return data
         return Drug(**data)
 
 
@@ -39,6 +45,7 @@ class BrandSchema(Schema):
     """Schema for Brand model."""
     
     id = fields.Int(dump_only=True)
+    source_id = fields.Int(dump_only=True)
     name = fields.Str(required=True, validate=validate.Length(min=1, max=255))
     strength = fields.Str(validate=validate.Length(max=100))
     form = fields.Str(validate=validate.Length(max=100))
@@ -49,7 +56,9 @@ class BrandSchema(Schema):
     
     @post_load
     def make_brand(self, data, **kwargs):
-        """Create a Brand instance from validated data."""
+        """Create a Brand instance from validated data, or return the fields of a partial update."""
+        if kwargs.get('partial'):
+            return data
         return Brand(**data)
 
 
@@ -68,7 +77,9 @@ class AdultDosageSchema(Schema):
     
     @post_load
     def make_adult_dosage(self, data, **kwargs):
-        """Create an AdultDosage instance from validated data."""
+        """Create an AdultDosage instance from validated data, or return the fields of a partial update."""
+        if kwargs.get('partial'):
+            return data
         return AdultDosage(**data)
 
 
@@ -80,6 +91,8 @@ class PediatricDosageSchema(Schema):
     indication = fields.Str()
     dosage = fields.Str()
     age_range = fields.Str(validate=validate.Length(max=100))
+    age_min_days = fields.Int(dump_only=True)
+    age_max_days = fields.Int(dump_only=True)
     frequency = fields.Str(validate=validate.Length(max=100))
     route = fields.Str(validate=validate.Length(max=100))
     notes = fields.Str()
@@ -88,7 +101,9 @@ class PediatricDosageSchema(Schema):
     
     @post_load
     def make_pediatric_dosage(self, data, **kwargs):
-        """Create a PediatricDosage instance from validated data."""
+        """Create a PediatricDosage instance from validated data, or return the fields of a partial update."""
+        if kwargs.get('partial'):
+            return data
         return PediatricDosage(**data)
 
 
@@ -100,6 +115,8 @@ class NeonatalDosageSchema(Schema):
     indication = fields.Str()
     dosage = fields.Str()
     age_range = fields.Str(validate=validate.Length(max=100))
+    age_min_days = fields.Int(dump_only=True)
+    age_max_days = fields.Int(dump_only=True)
     frequency = fields.Str(validate=validate.Length(max=100))
     route = fields.Str(validate=validate.Length(max=100))
     notes = fields.Str()
@@ -108,5 +125,7 @@ class NeonatalDosageSchema(Schema):
     
     @post_load
     def make_neonatal_dosage(self, data, **kwargs):
-        """Create a NeonatalDosage instance from validated data."""
+        """Create a NeonatalDosage instance from validated data, or return the fields of a partial update."""
+        if kwargs.get('partial'):
+            return data
         return NeonatalDosage(**data) 
\ No newline at end of file
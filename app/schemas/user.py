@@ -30,5 +30,7 @@ class UserSchema(Schema):
     
     @post_load
     def make_user(self, data, **kwargs):
-        """Create a User instance from validated data."""
+        """Create a User instance from validated data, or return the fields of a partial update."""
+        if kwargs.get('partial'):
+            return data
         return User(**data) 
\ No newline at end of file
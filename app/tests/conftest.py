@@ -2,8 +2,12 @@ import os
 import pytest
 from flask_jwt_extended import create_access_token
 from app import create_app, db
+from app.config.config import TestingConfig
+from app.models.pharmaceutical import Company
 from app.models.user import User
 from app.models.item import Item
+from app.utils.pool import app_engines, dispose_engines
+from app.utils.query_counter import assert_max_queries
 
 
 @pytest.fixture
@@ -97,4 +101,50 @@ def user_headers(app, regular_user_id):
     """Create headers with regular user JWT token."""
     with app.app_context():
         access_token = create_access_token(identity=regular_user_id)
-        return {'Authorization': f'Bearer {access_token}'} 
\ No newline at end of file
+        return {'Authorization': f'Bearer {access_token}'} 
+
+
+@pytest.fixture
+def query_budget(app):
+    """Return a context manager failing when more than ``budget`` SQL statements run inside it."""
+    def budget(max_queries):
+        return assert_max_queries(app_engines(app).values(), max_queries)
+    return budget
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """
+    Return a factory creating testing apps with config overrides.
+    
+    ``make_app(database='catalog.db', METRICS_ENABLED=False)`` sets the given
+    ``TestingConfig`` keys before creating the app, backs it by that SQLite file
+    in the test's temporary directory (in-memory by default), creates the
+    tables and adds a company per name in ``companies``. With ``tables=False``
+    the database is left empty, e.g. for migrations. The apps are torn down
+    after the test.
+    """
+    apps = []
+    
+    def factory(database=None, tables=True, companies=('COMPANY',), **config):
+        if database is not None:
+            config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / database}"
+        for key, value in config.items():
+            monkeypatch.setattr(TestingConfig, key, value)
+        app = create_app('testing')
+        apps.append((app, tables))
+        if tables:
+            with app.app_context():
+                db.create_all()
+                db.session.add_all([Company(name=name) for name in companies])
+                db.session.commit()
+        return app
+    
+    yield factory
+    
+    for app, tables in apps:
+        if tables:
+            with app.app_context():
+                db.session.remove()
+                db.drop_all()
+        dispose_engines(app)
@@ -0,0 +1,55 @@
+import gzip
+import sqlite3
+import pytest
+from app import db
+from app.models.pharmaceutical import Company, Brand
+
+
+@pytest.fixture
+def bundle_app(app, tmp_path):
+    """Write bundles to a temporary directory and add a small catalog."""
+    app.config['CATALOG_BUNDLE_DIR'] = str(tmp_path / 'bundles')
+    with app.app_context():
+        company = Company(name='ACME')
+        db.session.add(company)
+        db.session.commit()
+        db.session.add(Brand(name='ACMEPRIN', company_id=company.id))
+        db.session.commit()
+    return app
+
+
+def test_bundle_download(bundle_app, tmp_path):
+    """Test the bundle is a compressed SQLite copy of the catalog served with an ETag."""
+    client = bundle_app.test_client()
+    response = client.get('/api/v1/catalog/bundle')
+    assert response.status_code == 200
+    version = response.headers['X-Catalog-Version']
+    assert response.headers['ETag'] == f'"{version}"'
+    
+    path = tmp_path / 'catalog.sqlite'
+    path.write_bytes(gzip.decompress(response.get_data()))
+    connection = sqlite3.connect(path)
+    assert connection.execute('SELECT name FROM brands').fetchall() == [('ACMEPRIN',)]
+    assert connection.execute("SELECT value FROM bundle_info WHERE key = 'version'").fetchone() == (version,)
+    connection.close()
+    
+    # Unchanged catalogs are not downloaded again
+    response = client.get('/api/v1/catalog/bundle', headers={'If-None-Match': f'"{version}"'})
+    assert response.status_code == 304
+
+
+def test_bundle_version_follows_catalog_changes(bundle_app):
+    """Test a catalog change produces a new bundle version once the check TTL expired."""
+    bundle_app.config['CATALOG_BUNDLE_CHECK_TTL'] = 0
+    client = bundle_app.test_client()
+    info = client.get('/api/v1/catalog/bundle/info').get_json()
+    assert info['tables']['brands'] == 1
+    assert client.get('/api/v1/catalog/bundle/info').get_json()['version'] == info['version']
+    
+    with bundle_app.app_context():
+        db.session.add(Company(name='GLOBEX'))
+        db.session.commit()
+    
+    changed = client.get('/api/v1/catalog/bundle/info').get_json()
+    assert changed['version'] != info['version']
+    assert changed['tables']['companies'] == 2
@@ -0,0 +1,58 @@
+from sqlalchemy import insert
+from app import db
+from app.models.pharmaceutical import Company, Drug, Brand, brand_drugs
+
+
+def test_changes_record_creates_updates_and_deletes(app, client):
+    """Test ORM and Core writes are recorded in order in the change feed."""
+    with app.app_context():
+        company = Company(name='ACME')
+        drug = Drug(name='Paracetamol')
+        db.session.add_all([company, drug])
+        db.session.commit()
+        brand = Brand(name='ACMEPRIN', company_id=company.id)
+        db.session.add(brand)
+        db.session.commit()
+        # Bulk Core writes, as done by the importer, are captured too
+        db.session.execute(insert(brand_drugs), [{'brand_id': brand.id, 'drug_id': drug.id}])
+        company.name = 'ACME Corp'
+        db.session.commit()
+        db.session.delete(drug)
+        db.session.commit()
+        ids = (company.id, drug.id, brand.id)
+    
+    response = client.get('/api/v1/changes')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['has_more'] is False
+    records = [(change['entity'], change['id'], change.get('related_id'), change['op']) for change in data['changes']]
+    company_id, drug_id, brand_id = ids
+    assert records == [
+        ('company', company_id, None, 'insert'),
+        ('drug', drug_id, None, 'insert'),
+        ('brand', brand_id, None, 'insert'),
+        ('brand_drug', brand_id, drug_id, 'insert'),
+        ('company', company_id, None, 'update'),
+        # Deleting the drug also removes its brand links
+        ('brand_drug', brand_id, drug_id, 'delete'),
+        ('drug', drug_id, None, 'delete'),
+    ]
+    assert data['next_since'] == data['changes'][-1]['seq']
+
+
+def test_changes_paging(app, client):
+    """Test the feed pages with since and limit."""
+    with app.app_context():
+        db.session.add_all([Company(name=f'COMPANY {cid}') for cid in range(5)])
+        db.session.commit()
+    
+    first = client.get('/api/v1/changes?limit=3').get_json()
+    assert len(first['changes']) == 3
+    assert first['has_more'] is True
+    
+    rest = client.get(f"/api/v1/changes?since={first['next_since']}&limit=3").get_json()
+    assert len(rest['changes']) == 2
+    assert rest['has_more'] is False
+    assert rest['changes'][0]['seq'] > first['next_since']
+    
+    assert client.get('/api/v1/changes?limit=0').status_code == 400
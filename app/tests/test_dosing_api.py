@@ -0,0 +1,129 @@
+import json
+import pytest
+from app import db
+from app.models.pharmaceutical import Drug, AdultDosage, PediatricDosage, NeonatalDosage
+from app.utils.age_range import parse_age_range, resolve_age_bounds
+from app.utils.hashing import dosage_content_hash
+
+
+@pytest.fixture
+def drug_id(app):
+    """Create a drug with dosages for every population."""
+    with app.app_context():
+        drug = Drug(name='Test Drug')
+        db.session.add(drug)
+        db.session.commit()
+
+        db.session.add_all([
+            AdultDosage(drug_id=drug.id, dosage='500 mg'),
+            PediatricDosage(drug_id=drug.id, dosage='10 mg/kg', notes='Recommended for 6-12 Years of Children'),
+            PediatricDosage(drug_id=drug.id, dosage='5 mg/kg', notes='For children under 2 years of age.'),
+            NeonatalDosage(drug_id=drug.id, dosage='2 mg/kg', notes='As Required')
+        ])
+        db.session.commit()
+        return drug.id
+
+
+def test_parse_age_range():
+    """Test parsing age bounds out of instruction text."""
+    assert parse_age_range('Recommended for 6-12 Years of Children') == (2190, 4744, '6-12 Years')
+    assert parse_age_range('For 1 month-12 Years.') == (30, 4744, '1 month-12 Years')
+    assert parse_age_range('For children under 2 years of age.') == (None, 729, 'under 2 years')
+    assert parse_age_range('Should not be used under 6 months of age.') == (180, None, 'under 6 months')
+    assert parse_age_range('Recommended for children over 4 months') == (120, None, 'over 4 months')
+    # Treatment durations are not ages
+    assert parse_age_range('For 14 to 21 days') is None
+    assert parse_age_range('Not recommended in this age group') is None
+
+
+def test_resolve_age_bounds_defaults():
+    """Test population defaults fill missing bounds."""
+    assert resolve_age_bounds('As Required', 'neonatal') == (0, 28, None)
+    assert resolve_age_bounds('For children under 2 years of age.', 'pediatric') == (29, 729, 'under 2 years')
+
+
+def test_age_bounds_set_on_insert(app, drug_id):
+    """Test dosage writes fill the age interval and label."""
+    with app.app_context():
+        dosage = PediatricDosage.query.filter_by(drug_id=drug_id, dosage='10 mg/kg').first()
+        assert dosage.age_range == '6-12 Years'
+        assert (dosage.age_min_days, dosage.age_max_days) == (2190, 4744)
+
+
+def test_age_bounds_follow_notes_edits(app, drug_id):
+    """Test editing the notes re-derives a label taken from them, but keeps an explicit one."""
+    with app.app_context():
+        dosage = PediatricDosage.query.filter_by(drug_id=drug_id, dosage='10 mg/kg').first()
+        dosage.notes = 'For children under 2 years of age.'
+        db.session.commit()
+        assert dosage.age_range == 'under 2 years'
+        assert (dosage.age_min_days, dosage.age_max_days) == (29, 729)
+
+        dosage.age_range = '1-5 Years'
+        db.session.commit()
+        dosage.notes = 'Recommended for 6-12 Years of Children'
+        db.session.commit()
+        assert dosage.age_range == '1-5 Years'
+        assert (dosage.age_min_days, dosage.age_max_days) == (365, 2189)
+
+
+def test_dosage_content_hash_set_on_insert(app, drug_id):
+    """Test dosage writes store a hash that ignores formatting differences."""
+    with app.app_context():
+        dosage = AdultDosage.query.filter_by(drug_id=drug_id).first()
+        assert dosage.content_hash == dosage_content_hash(drug_id, ' 500  MG ')
+        assert dosage.content_hash != dosage_content_hash(drug_id, '250 mg')
+
+
+def test_identical_dosages_can_be_stored(client, admin_headers, drug_id):
+    """Test the content hash does not stop the API from storing a dosage twice."""
+    body = {'drug_id': drug_id, 'dosage': '500 mg'}
+    response = client.post('/api/v1/adult-dosages', headers=admin_headers, json=body)
+
+    assert response.status_code == 201
+
+
+def test_dosage_update_applies_changed_fields(client, admin_headers, app, drug_id):
+    """Test a partial PUT changes only the fields it sends."""
+    with app.app_context():
+        dosage_id = PediatricDosage.query.filter_by(drug_id=drug_id, dosage='10 mg/kg').first().id
+
+    response = client.put(f'/api/v1/pediatric-dosages/{dosage_id}', headers=admin_headers, json={'route': 'IV'})
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert (data['route'], data['dosage']) == ('IV', '10 mg/kg')
+
+
+def test_dosing_lookup_by_age(client, drug_id):
+    """Test only dosages applicable at the given age are returned."""
+    response = client.get(f'/api/v1/dosing?drug_id={drug_id}&age_days=3000')
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [d['dosage'] for d in data['pediatric']] == ['10 mg/kg']
+    assert data['neonatal'] == []
+    assert data['adult'] == []
+
+    # A twelve-and-a-half-year-old is still within "6-12 Years"
+    response = client.get(f'/api/v1/dosing?drug_id={drug_id}&age_days=4560')
+    data = json.loads(response.data)
+    assert [d['dosage'] for d in data['pediatric']] == ['10 mg/kg']
+
+    response = client.get(f'/api/v1/dosing?drug_id={drug_id}&age_days=10')
+    data = json.loads(response.data)
+    assert data['pediatric'] == []
+    assert [d['dosage'] for d in data['neonatal']] == ['2 mg/kg']
+
+    response = client.get(f'/api/v1/dosing?drug_id={drug_id}&age_days=9000')
+    data = json.loads(response.data)
+    assert [d['dosage'] for d in data['adult']] == ['500 mg']
+
+
+def test_dosing_lookup_requires_params(client):
+    """Test the dosing lookup validates its query parameters."""
+    response = client.get('/api/v1/dosing?drug_id=1')
+
+    assert response.status_code == 400
+    data = json.loads(response.data)
+    assert data['status'] == 'error'
@@ -0,0 +1,68 @@
+import json
+import pytest
+from app import db
+from app.models.pharmaceutical import Drug, AdultDosage, PediatricDosage, NeonatalDosage, DrugEligibility
+from app.utils.eligibility import get_eligibility, describe_flags
+
+
+@pytest.fixture
+def drug_ids(app):
+    """Create one drug with dosing data and one with only placeholders."""
+    with app.app_context():
+        dosed = Drug(name='Dosed Drug')
+        placeholder = Drug(name='Placeholder Drug')
+        db.session.add_all([dosed, placeholder])
+        db.session.commit()
+
+        db.session.add_all([
+            AdultDosage(drug_id=dosed.id, dosage='500 mg'),
+            PediatricDosage(drug_id=dosed.id, notes='Not recommended in this age group'),
+            PediatricDosage(drug_id=placeholder.id, notes='Not recommended in this age group'),
+            NeonatalDosage(drug_id=placeholder.id, notes='Not recommended in this age group')
+        ])
+        db.session.commit()
+        return dosed.id, placeholder.id
+
+
+def test_flags_maintained_on_dosage_writes(app, drug_ids):
+    """Test dosage inserts and deletes keep the persisted flags current."""
+    dosed_id, placeholder_id = drug_ids
+    with app.app_context():
+        flags = DrugEligibility.query.get(dosed_id).flags
+        assert describe_flags(flags) == {
+            'adult': 'has_dosing',
+            'pediatric': 'not_recommended',
+            'neonatal': 'no_data'
+        }
+
+        # Loading the bitmap, then writing, must update it in place
+        assert get_eligibility([placeholder_id])[placeholder_id] != 0
+        for dosage in PediatricDosage.query.filter_by(drug_id=placeholder_id).all():
+            db.session.delete(dosage)
+        db.session.add(PediatricDosage(drug_id=placeholder_id, dosage='5 mg/kg'))
+        db.session.commit()
+
+        status = describe_flags(get_eligibility([placeholder_id])[placeholder_id])
+        assert status['pediatric'] == 'has_dosing'
+        assert status['neonatal'] == 'not_recommended'
+
+
+def test_batch_eligibility(client, drug_ids):
+    """Test eligibility for many drugs is answered in one call."""
+    dosed_id, placeholder_id = drug_ids
+    response = client.post('/api/v1/eligibility', json={'drug_ids': [dosed_id, placeholder_id, 9999]})
+
+    assert response.status_code == 200
+    data = json.loads(response.data)['eligibility']
+    assert data[str(dosed_id)]['adult'] == 'has_dosing'
+    assert data[str(placeholder_id)]['pediatric'] == 'not_recommended'
+    assert data['9999'] == {'adult': 'no_data', 'pediatric': 'no_data', 'neonatal': 'no_data'}
+
+
+def test_batch_eligibility_validation(client):
+    """Test the batch endpoint rejects malformed input."""
+    response = client.post('/api/v1/eligibility', json={'drug_ids': ['abc']})
+
+    assert response.status_code == 400
+    data = json.loads(response.data)
+    assert data['status'] == 'error'
@@ -0,0 +1,51 @@
+import csv
+import gzip
+import io
+import json
+import pytest
+from app import db
+from app.models.pharmaceutical import Company, Brand
+from app.utils import export
+
+
+@pytest.fixture
+def catalog(app):
+    """Create companies and brands spanning several export batches."""
+    with app.app_context():
+        db.session.add_all([Company(name=f'COMPANY {cid}') for cid in range(1, 6)])
+        db.session.commit()
+        db.session.add_all([Brand(name=f'BRAND {bid}', company_id=bid % 5 + 1) for bid in range(1, 26)])
+        db.session.commit()
+
+
+def test_export_csv(client, admin_headers, catalog, monkeypatch):
+    """Test a table is streamed as CSV in batches."""
+    monkeypatch.setattr(export, 'EXPORT_BATCH_SIZE', 10)
+    response = client.get('/api/v1/export/brands.csv', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/csv')
+    
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == 25
+    assert rows[0]['name'] == 'BRAND 1'
+    assert rows[0]['company_id'] == '2'
+
+
+def test_export_ndjson_gzip(client, admin_headers, catalog):
+    """Test NDJSON exports are gzip-compressed for clients accepting it."""
+    response = client.get(
+        '/api/v1/export/companies.ndjson',
+        headers={**admin_headers, 'Accept-Encoding': 'gzip'}
+    )
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    
+    lines = gzip.decompress(response.get_data()).decode('utf-8').splitlines()
+    companies = [json.loads(line) for line in lines]
+    assert [company['name'] for company in companies] == [f'COMPANY {cid}' for cid in range(1, 6)]
+
+
+def test_export_requires_admin_and_known_table(client, admin_headers, user_headers):
+    """Test exports are refused to non-admins and unknown tables."""
+    assert client.get('/api/v1/export/brands.csv', headers=user_headers).status_code == 401
+    assert client.get('/api/v1/export/users.csv', headers=admin_headers).status_code == 404
@@ -0,0 +1,293 @@
+import importlib
+import json
+
+import pytest
+from flask_migrate import upgrade
+from sqlalchemy import select
+from app import db, init_migrate
+from app.models.import_record import ImportRecord
+from app.models.pharmaceutical import (
+    Company, Drug, Brand, AdultDosage, PediatricDosage, DrugEligibility, brand_drugs
+)
+from app.utils.migration_gate import migrations_dir
+
+
+def write_feed(data_dir, **files):
+    """Write feed files such as ``COMPANY=[...]`` as ``COMPANY.json`` into ``data_dir``."""
+    data_dir.mkdir(exist_ok=True)
+    for name, records in files.items():
+        (data_dir / f'{name}.json').write_text(json.dumps(records))
+    return data_dir
+
+
+@pytest.fixture
+def importer(app, monkeypatch):
+    """Return the import script module, running against the test app."""
+    monkeypatch.setenv('FLASK_ENV', 'testing')
+    module = importlib.import_module('scripts.import_data')
+    monkeypatch.setattr(module, 'app', app)
+    return module
+
+
+@pytest.fixture
+def feed(tmp_path):
+    """Write a small feed: two drugs, one brand each, and their dosages."""
+    return write_feed(
+        tmp_path / 'feed',
+        COMPANY=[{'ID': 1, 'NAME': 'ACME'}],
+        DRUG=[{'ID': 101, 'NAME': 'ALPHA'}, {'ID': 102, 'NAME': 'BETA'}],
+        BRAND=[{'BID': 11, 'BNAME': 'ALPHA BRAND', 'CID': 1}, {'BID': 12, 'BNAME': 'BETA BRAND', 'CID': 1}],
+        BRAND_DRUG=[{'BID': 11, 'DID': 101}, {'BID': 12, 'DID': 102}],
+        adult=[
+            {'CODE': 101, 'DOSE': '500 mg', 'FREQ': '8 hourly', 'ROUTE': 'PO', 'INSTRUCTION': 'With food'},
+            {'CODE': 102, 'DOSE': '250 mg', 'FREQ': '12 hourly', 'ROUTE': 'PO', 'INSTRUCTION': ''},
+        ],
+        Paedriatic=[
+            {'CODE': 101, 'DOSE': '10 mg/kg', 'FREQ': '8 hourly', 'ROUTE': 'PO',
+             'INSTRUCTION': 'Recommended for 6-12 Years of Children'},
+            {'CODE': 101, 'DOSE': '5 mg/kg', 'FREQ': '8 hourly', 'ROUTE': 'PO',
+             'INSTRUCTION': 'For children under 2 years of age.'},
+        ],
+        Neonatal=[],
+    )
+
+
+def test_full_import_fails_when_eligibility_rebuild_fails(app, importer, feed, monkeypatch):
+    """Test a failed eligibility rebuild rolls back the dosages and fails the run."""
+    def broken_refresh(connection, drug_ids=None):
+        raise RuntimeError('eligibility refresh failed')
+    monkeypatch.setattr(importer, 'refresh_eligibility', broken_refresh)
+
+    status = importer.main(['--data-dir', str(feed), '--no-bundle'])
+
+    assert status == 1
+    with app.app_context():
+        assert Drug.query.count() == 2
+        assert AdultDosage.query.count() == 0
+        assert PediatricDosage.query.count() == 0
+
+
+def test_full_import_is_idempotent(app, importer, feed):
+    """Test re-running a full import stores no dosage twice."""
+    assert importer.main(['--data-dir', str(feed), '--no-bundle']) == 0
+    assert importer.main(['--data-dir', str(feed), '--no-bundle']) == 0
+
+    with app.app_context():
+        assert AdultDosage.query.count() == 2
+        assert PediatricDosage.query.count() == 2
+
+
+def test_full_import_without_on_conflict(app, importer, feed, monkeypatch):
+    """Test databases without ON CONFLICT upserts import through the select-then-write fallback."""
+    monkeypatch.setattr(importer, 'supports_upsert', lambda dialect_name: False)
+
+    assert importer.main(['--data-dir', str(feed), '--no-bundle']) == 0
+    assert importer.main(['--data-dir', str(feed), '--no-bundle']) == 0
+
+    with app.app_context():
+        assert Drug.query.count() == 2
+        assert {(brand.name, brand.company.name) for brand in Brand.query.all()} == {
+            ('ALPHA BRAND', 'ACME'), ('BETA BRAND', 'ACME')
+        }
+
+
+def catalog_rows():
+    """Return every catalog row in ID order, without timestamps."""
+    rows = {}
+    for table in db.metadata.sorted_tables:
+        if table.name in ('users', 'items', 'change_log', 'import_records'):
+            continue
+        columns = [column for column in table.c if column.name not in ('created_at', 'updated_at')]
+        rows[table.name] = db.session.execute(select(*columns).order_by(*table.primary_key.columns)).all()
+    return rows
+
+
+def test_worker_pool_imports_the_same_rows(app, importer, feed, monkeypatch):
+    """Test normalizing in worker processes stores the same rows, in the same order, as in-process."""
+    # One record per chunk, so the steps' results arrive as many futures
+    monkeypatch.setattr(importer, 'CHUNK_RECORDS', 1)
+    imported = {}
+    for workers in (1, 3):
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+        assert importer.main(['--data-dir', str(feed), '--no-bundle', '--workers', str(workers)]) == 0
+        with app.app_context():
+            imported[workers] = catalog_rows()
+
+    assert imported[1]['adult_dosages']
+    assert imported[3] == imported[1]
+
+
+def test_worker_exception_aborts_the_import(app, importer, feed):
+    """Test a record a worker cannot normalize fails the run and leaves the catalog empty."""
+    write_feed(feed, DRUG=[{'ID': 101, 'NAME': 'ALPHA'}, 'not a record'])
+
+    assert importer.main(['--data-dir', str(feed), '--no-bundle', '--workers', '2']) == 1
+
+    with app.app_context():
+        assert Company.query.count() == 0
+        assert Drug.query.count() == 0
+
+
+def catalog_counts():
+    """Return the row count of every catalog table."""
+    return {
+        'drugs': Drug.query.count(),
+        'brands': Brand.query.count(),
+        'linked brands': Brand.query.filter(Brand.company_id.isnot(None)).count(),
+        'brand_drugs': db.session.query(brand_drugs).count(),
+        'adult dosages': AdultDosage.query.count(),
+        'pediatric dosages': PediatricDosage.query.count(),
+        'eligibility flags': DrugEligibility.query.count(),
+    }
+
+
+def test_delta_import_restores_dependents_of_returning_records(app, importer, feed):
+    """Test records removed from the feed and added back bring their dependents back."""
+    full_feed = {path.stem: json.loads(path.read_text()) for path in feed.glob('*.json')}
+    delta = ['--delta', '--data-dir', str(feed), '--no-bundle']
+    assert importer.main(delta) == 0
+    with app.app_context():
+        imported = catalog_counts()
+        assert imported['eligibility flags'] == 2
+
+    # Drug 101, brand 12 and the company leave the feed; their dependents stay in it
+    write_feed(
+        feed,
+        COMPANY=[],
+        DRUG=[record for record in full_feed['DRUG'] if record['ID'] != 101],
+        BRAND=[record for record in full_feed['BRAND'] if record['BID'] != 12],
+    )
+    assert importer.main(delta) == 0
+    with app.app_context():
+        assert catalog_counts() == {
+            'drugs': 1, 'brands': 1, 'linked brands': 0, 'brand_drugs': 0,
+            'adult dosages': 1, 'pediatric dosages': 0, 'eligibility flags': 1,
+        }
+
+    write_feed(feed, **full_feed)
+    assert importer.main(delta) == 0
+    with app.app_context():
+        assert catalog_counts() == imported
+
+
+def test_import_remaps_references_of_a_legacy_catalog(app, importer, feed):
+    """Test references stored as feed IDs by the first importer are re-pointed, not duplicated."""
+    with app.app_context():
+        # The first importer numbered rows in load order but stored the feed IDs
+        # (company 1, brands 11-12, drugs 101-102) as references, so they point
+        # at whichever rows have those IDs; the GAMMA dosage is not in the feed
+        db.session.add_all([
+            Company(id=1, name='OTHER'), Company(id=5, name='ACME'),
+            Drug(id=101, name='BETA'), Drug(id=102, name='ALPHA'), Drug(id=999, name='GAMMA'),
+        ])
+        db.session.flush()
+        db.session.add_all([
+            Brand(id=11, name='BETA BRAND', company_id=1), Brand(id=12, name='ALPHA BRAND', company_id=1),
+        ])
+        db.session.flush()
+        db.session.execute(brand_drugs.insert(), [{'brand_id': 11, 'drug_id': 101}, {'brand_id': 12, 'drug_id': 102}])
+        db.session.execute(AdultDosage.__table__.insert(), [
+            {'drug_id': 101, 'dosage': '500 mg', 'frequency': '8 hourly', 'route': 'PO', 'notes': 'With food'},
+            {'drug_id': 999, 'dosage': '1 g', 'frequency': None, 'route': None, 'notes': None},
+        ])
+        db.session.add(ImportRecord(source='legacy', source_key='feed_id_links', content_hash=''))
+        db.session.commit()
+
+    assert importer.main(['--data-dir', str(feed), '--no-bundle', '--remap-legacy']) == 0
+
+    with app.app_context():
+        assert {(brand.name, brand.company.name) for brand in Brand.query.all()} == {
+            ('ALPHA BRAND', 'ACME'), ('BETA BRAND', 'ACME')
+        }
+        pairs = db.session.execute(
+            select(Brand.name, Drug.name).join(brand_drugs, Brand.id == brand_drugs.c.brand_id)
+            .join(Drug, Drug.id == brand_drugs.c.drug_id)
+        ).all()
+        assert sorted(pairs) == [('ALPHA BRAND', 'ALPHA'), ('BETA BRAND', 'BETA')]
+        assert sorted((d.drug.name, d.dosage) for d in AdultDosage.query.all()) == [
+            ('ALPHA', '500 mg'), ('BETA', '250 mg'), ('GAMMA', '1 g')
+        ]
+        assert ImportRecord.query.filter_by(source='legacy').count() == 0
+
+
+def test_api_rows_survive_legacy_marker_and_remap(make_app, monkeypatch, importer, feed):
+    """Test rows created through the API keep their references through the migration and both imports."""
+    file_app = make_app(database='catalog.db', tables=False)
+    monkeypatch.setattr(importer, 'app', file_app)
+    init_migrate(file_app)
+    with file_app.app_context():
+        upgrade(directory=migrations_dir(file_app), revision='1c7e4a9b3d52')
+        # Row IDs that happen to equal the feed's CID, BID and DIDs, and a dosage
+        # with the content of a feed record
+        company = Company(id=1, name='LOCAL PHARMA')
+        drugs = [Drug(id=101, name='LOCAL DRUG'), Drug(id=102, name='OTHER LOCAL DRUG')]
+        db.session.add(Brand(id=11, name='LOCAL BRAND', company=company, drugs=drugs))
+        db.session.add(AdultDosage(drug=drugs[0], dosage='500 mg', frequency='8 hourly', route='PO', notes='With food'))
+        db.session.commit()
+        upgrade(directory=migrations_dir(file_app))
+        assert importer.legacy_links_marked()
+
+    def local_rows():
+        with file_app.app_context():
+            brand = Brand.query.filter_by(name='LOCAL BRAND').one()
+            return (
+                brand.company.name,
+                sorted(drug.name for drug in brand.drugs),
+                [(dosage.drug.name, dosage.dosage) for dosage in AdultDosage.query.filter_by(drug_id=101)],
+            )
+
+    expected = ('LOCAL PHARMA', ['LOCAL DRUG', 'OTHER LOCAL DRUG'], [('LOCAL DRUG', '500 mg')])
+    # Without --remap-legacy the marker only warns
+    assert importer.main(['--data-dir', str(feed), '--no-bundle']) == 0
+    assert local_rows() == expected
+
+    assert importer.main(['--data-dir', str(feed), '--no-bundle', '--remap-legacy']) == 0
+    assert local_rows() == expected
+    with file_app.app_context():
+        assert {(brand.name, brand.company.name) for brand in Brand.query.all()} == {
+            ('LOCAL BRAND', 'LOCAL PHARMA'), ('ALPHA BRAND', 'ACME'), ('BETA BRAND', 'ACME')
+        }
+        assert AdultDosage.query.count() == 3
+
+
+@pytest.mark.parametrize('mode', [[], ['--delta']], ids=['full', 'delta'])
+def test_dry_run_leaves_the_catalog_unchanged(app, importer, feed, mode):
+    """Test a dry run writes nothing, on an empty catalog and on one with changes pending."""
+    dry_run = mode + ['--data-dir', str(feed), '--no-bundle', '--dry-run']
+    with app.app_context():
+        empty = catalog_counts()
+    assert importer.main(dry_run) == 0
+    with app.app_context():
+        assert catalog_counts() == empty
+        assert ImportRecord.query.count() == 0
+
+    assert importer.main(mode + ['--data-dir', str(feed), '--no-bundle']) == 0
+    write_feed(feed, DRUG=[{'ID': 101, 'NAME': 'ALPHA'}, {'ID': 103, 'NAME': 'GAMMA'}])
+    with app.app_context():
+        imported = catalog_counts()
+    assert importer.main(dry_run) == 0
+    with app.app_context():
+        assert catalog_counts() == imported
+
+
+def test_benchmark_reports_stage_stats(app, importer, feed, tmp_path):
+    """Test --benchmark --scale reports every stage of the scaled import, with --dry-run committing nothing."""
+    output = tmp_path / 'bench.json'
+    argv = ['--data-dir', str(feed), '--no-bundle', '--dry-run', '--benchmark', '--scale', '3',
+            '--output', str(output)]
+
+    assert importer.main(argv) == 0
+
+    results = json.loads(output.read_text())
+    assert (results['mode'], results['scale'], results['dry_run']) == ('full', 3, True)
+    stage_keys = set(importer.StageStats().as_dict())
+    assert {step.label for step in importer.CATALOG_STEPS + importer.DOSAGE_STEPS} == set(results['tables'])
+    assert all(set(stats) == stage_keys for stats in results['tables'].values())
+    assert results['tables']['drugs']['records'] == 6
+    assert results['tables']['adult dosages']['rows'] == 6
+    assert results['total']['queries'] > 0
+    with app.app_context():
+        assert Drug.query.count() == 0
+        assert AdultDosage.query.count() == 0
@@ -113,4 +113,16 @@ def test_delete_item(client, user_headers):
     
     # Verify it's gone
     get_response = client.get(f'/api/v1/items/{item_id}', headers=user_headers)
-    assert get_response.status_code == 404 
\ No newline at end of file
+    assert get_response.status_code == 404
+
+
+def test_partial_item_update(app, client, user_headers, regular_user_id):
+    """Test a PUT with some fields changes only those fields."""
+    with app.app_context():
+        item_id = Item.query.filter_by(user_id=regular_user_id).first().id
+    
+    response = client.put(f'/api/v1/items/{item_id}', headers=user_headers, json={'quantity': 7})
+    
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert (data['name'], data['price'], data['quantity']) == ('Test Item 1', 10.99, 7)
@@ -0,0 +1,32 @@
+import io
+import gzip
+import json
+import pytest
+from app.utils.json_stream import iter_json_array, iter_json_file, find_data_file
+
+
+def test_iter_json_array_across_chunks():
+    """Test elements split over chunk boundaries are decoded intact."""
+    records = [{'BID': 1, 'BNAME': 'A [x], {y}', 'CID': 10}, {'BID': 22, 'BNAME': 'B', 'CID': None}]
+    document = json.dumps(records)
+
+    for chunk_size in (1, 3, 16, 1024):
+        assert list(iter_json_array(io.StringIO(document), chunk_size)) == records
+
+
+def test_iter_json_array_rejects_invalid_documents():
+    """Test non-array and truncated documents raise ValueError."""
+    for document in ('{"BID": 1}', '[{"BID": 1}', '[{"BID": '):
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.StringIO(document), 4))
+
+
+def test_iter_json_file_reads_compressed_variant(tmp_path):
+    """Test a .json.gz file is found and read transparently."""
+    records = [{'BID': bid} for bid in range(100)]
+    with gzip.open(tmp_path / 'BRAND.json.gz', 'wt', encoding='utf-8') as file:
+        json.dump(records, file)
+
+    path = find_data_file(tmp_path / 'BRAND.json')
+    assert path.name == 'BRAND.json.gz'
+    assert list(iter_json_file(path)) == records
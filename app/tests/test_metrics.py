@@ -0,0 +1,89 @@
+import pytest
+from app import create_app
+from prometheus_client import REGISTRY
+
+
+def sample(name, **labels):
+    """Return the current value of a metric sample, or 0 if it has none yet."""
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_request_metrics(client):
+    """Test requests are counted and timed by resource, method and status."""
+    labels = {'resource': 'CompanyListResource', 'method': 'GET'}
+    requests = sample('http_requests_total', status='200', **labels)
+    observations = sample('http_request_duration_seconds_count', **labels)
+
+    assert client.get('/api/v1/companies').status_code == 200
+
+    assert sample('http_requests_total', status='200', **labels) == requests + 1
+    assert sample('http_request_duration_seconds_count', **labels) == observations + 1
+
+
+def test_unmatched_requests_share_a_label(client):
+    """Test requests for unknown URLs do not create a label per URL."""
+    requests = sample('http_requests_total', resource='<unmatched>', method='GET', status='404')
+
+    client.get('/no/such/page')
+
+    assert sample('http_requests_total', resource='<unmatched>', method='GET', status='404') == requests + 1
+
+
+def test_query_and_cache_metrics(client):
+    """Test SQL statements are timed per engine and cache lookups are counted."""
+    queries = sample('db_query_duration_seconds_count', engine='primary')
+    lookups = sample('cache_requests_total', cache='eligibility', result='miss') + \
+        sample('cache_requests_total', cache='eligibility', result='hit')
+
+    client.post('/api/v1/eligibility', json={'drug_ids': [1]})
+
+    assert sample('db_query_duration_seconds_count', engine='primary') > queries
+    assert sample('cache_requests_total', cache='eligibility', result='miss') + \
+        sample('cache_requests_total', cache='eligibility', result='hit') == lookups + 1
+
+
+def test_metrics_endpoint(client):
+    """Test /metrics serves the Prometheus text format and is not counted itself."""
+    client.get('/api/v1/companies')
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    body = response.get_data(as_text=True)
+    assert 'http_requests_total{method="GET",resource="CompanyListResource",status="200"}' in body
+    assert 'db_query_duration_seconds_bucket' in body
+    assert 'resource="metrics"' not in body
+
+
+def test_multiprocess_aggregation(tmp_path, monkeypatch):
+    """Test /metrics reads the samples of all workers from the multiprocess directory."""
+    from prometheus_client import CollectorRegistry, Counter, values
+
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    # Two "workers" writing to the shared directory
+    for pid in (101, 102):
+        monkeypatch.setattr(values, 'ValueClass', values.MultiProcessValue(lambda: pid))
+        Counter('worker_jobs_total', 'Jobs.', registry=CollectorRegistry()).inc(2)
+    monkeypatch.setattr(values, 'ValueClass', values.MutexValue)
+
+    app = create_app('testing')
+    body = app.test_client().get('/metrics').get_data(as_text=True)
+
+    assert 'worker_jobs_total 4.0' in body
+
+
+@pytest.fixture
+def unmetered_app(make_app):
+    """Create an app with metrics disabled."""
+    return make_app(METRICS_ENABLED=False)
+
+
+def test_disabled(unmetered_app):
+    """Test no endpoint is served and no requests are counted when disabled."""
+    requests = sample('http_requests_total', resource='CompanyListResource', method='GET', status='200')
+    client = unmetered_app.test_client()
+
+    assert client.get('/api/v1/companies').status_code == 200
+    assert client.get('/metrics').status_code == 404
+    assert sample('http_requests_total', resource='CompanyListResource', method='GET', status='200') == requests
@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import text
+from app import db
+from app.models.user import User
+from app.utils.change_log import LOGGED_TABLES, OPERATIONS
+from app.utils.migration_gate import (
+    database_revisions, ensure_database, head_revisions, migrations_dir, seed_admin
+)
+
+
+@pytest.fixture
+def file_app(make_app):
+    """Create an app backed by an empty SQLite file."""
+    return make_app(database='deploy.db', tables=False)
+
+
+def test_head_revisions(file_app):
+    """Test the head revision is read from the migration scripts."""
+    assert head_revisions(migrations_dir(file_app)) == {'192aa441f86a'}
+
+
+def test_ensure_database_migrates_and_seeds_once(file_app):
+    """Test the gate migrates and seeds an empty database, then only checks the revision."""
+    seeded = []
+
+    assert ensure_database(file_app, seed=lambda: seeded.append(True)) is True
+    assert seeded == [True]
+    with file_app.app_context():
+        assert database_revisions(db.engine) == {'192aa441f86a'}
+        assert db.session.execute(text('SELECT COUNT(*) FROM change_log')).scalar() == 0
+
+    assert ensure_database(file_app, seed=lambda: seeded.append(True)) is False
+    assert seeded == [True]
+
+
+def test_migrations_keep_change_log_triggers(file_app):
+    """Test every change log trigger exists at head; batch-recreating a logged table drops its triggers."""
+    ensure_database(file_app, seed=None)
+
+    with file_app.app_context():
+        triggers = set(db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars())
+    assert triggers == {
+        f'log_{table}_{operation}' for table, _, _, _ in LOGGED_TABLES for operation in OPERATIONS
+    }
+
+
+def test_seed_admin_is_idempotent(file_app):
+    """Test the default seed creates the admin user once, on the migrated schema alone."""
+    ensure_database(file_app, seed=None)
+
+    with file_app.app_context():
+        seed_admin()
+        seed_admin()
+        assert User.query.filter_by(email='admin@example.com', admin=True).count() == 1
+
+
+def test_ensure_database_seeds_admin(file_app):
+    """Test the gate's default seed runs against the tables the migrations create."""
+    assert ensure_database(file_app) is True
+
+    with file_app.app_context():
+        assert User.query.filter_by(email='admin@example.com', admin=True).count() == 1
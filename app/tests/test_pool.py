@@ -0,0 +1,50 @@
+import threading
+import time
+from sqlalchemy import create_engine, text
+from app.utils.pool import TimedQueuePool, pool_options, pool_stats
+
+
+def test_pool_options_skip_in_memory_sqlite(app):
+    """Test pool options apply to database files and servers but not in-memory SQLite."""
+    assert pool_options(app.config, 'sqlite:///:memory:') == {}
+    options = pool_options(app.config, 'postgresql://db.internal/pharma')
+    assert options['poolclass'] is TimedQueuePool
+    assert options['pool_size'] == app.config['DB_POOL_SIZE']
+    assert options['pool_pre_ping'] is True
+
+
+def test_pool_stats_under_concurrent_load(tmp_path):
+    """Test checkouts beyond the pool size wait and are counted."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool, pool_size=2, max_overflow=0, pool_timeout=10
+    )
+
+    def work():
+        with engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = pool_stats(engine)
+    assert stats['checkouts'] == 8
+    assert stats['timeouts'] == 0
+    assert stats['checked_out'] == 0
+    # Six of the eight workers had to wait for a connection to be returned
+    assert stats['wait_ms_max'] >= 40
+    engine.dispose()
+
+
+def test_pool_stats_endpoint(client, admin_headers, user_headers):
+    """Test the pool statistics are reported to admins only."""
+    response = client.get('/api/v1/admin/pool', headers=admin_headers)
+    assert response.status_code == 200
+    assert 'primary' in response.get_json()['engines']
+
+    response = client.get('/api/v1/admin/pool', headers=user_headers)
+    assert response.status_code == 401
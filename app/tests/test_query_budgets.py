@@ -0,0 +1,138 @@
+import pytest
+from app import db
+from app.models.item import Item
+from app.models.pharmaceutical import Company, Drug, Brand, AdultDosage, PediatricDosage, NeonatalDosage
+from app.models.user import User
+from werkzeug.security import generate_password_hash
+
+# Rows per table; large enough that a per-row query blows every budget
+ROWS = 25
+
+# (method, URL, role, JSON body, expected status, statement budget); URLs and
+# bodies are filled in with the IDs of the ``catalog`` fixture.
+ENDPOINTS = [
+    # Pharmaceutical catalog
+    ('GET', '/api/v1/companies', None, None, 200, 1),
+    ('POST', '/api/v1/companies', 'admin', {'name': 'NEW COMPANY'}, 201, 3),
+    ('GET', '/api/v1/companies/{company_id}', 'user', None, 200, 1),
+    ('PUT', '/api/v1/companies/{company_id}', 'admin', {'address': 'Lahore'}, 200, 4),
+    ('DELETE', '/api/v1/companies/{empty_company_id}', 'admin', None, 200, 5),
+    ('GET', '/api/v1/drugs', None, None, 200, 1),
+    ('POST', '/api/v1/drugs', 'admin', {'name': 'NEW DRUG'}, 201, 3),
+    ('GET', '/api/v1/drugs/{drug_id}', 'user', None, 200, 1),
+    ('PUT', '/api/v1/drugs/{drug_id}', 'admin', {'category': 'Analgesic'}, 200, 4),
+    ('DELETE', '/api/v1/drugs/{bare_drug_id}', 'admin', None, 200, 10),
+    ('GET', '/api/v1/brands', None, None, 200, 1),
+    ('POST', '/api/v1/brands', 'admin', {'name': 'NEW BRAND', 'company_id': '{company_id}'}, 201, 3),
+    ('GET', '/api/v1/brands/{brand_id}', 'user', None, 200, 1),
+    ('PUT', '/api/v1/brands/{brand_id}', 'admin', {'strength': '500 mg'}, 200, 4),
+    ('DELETE', '/api/v1/brands/{brand_id}', 'admin', None, 200, 5),
+    ('GET', '/api/v1/adult-dosages', None, None, 200, 1),
+    ('GET', '/api/v1/adult-dosages?drug_id={drug_id}', None, None, 200, 1),
+    ('POST', '/api/v1/adult-dosages', 'admin', {'drug_id': '{drug_id}', 'dosage': '1 g'}, 201, 8),
+    ('GET', '/api/v1/adult-dosages/{adult_dosage_id}', 'user', None, 200, 1),
+    ('PUT', '/api/v1/adult-dosages/{adult_dosage_id}', 'admin', {'route': 'IV'}, 200, 9),
+    ('DELETE', '/api/v1/adult-dosages/{adult_dosage_id}', 'admin', None, 200, 8),
+    ('GET', '/api/v1/pediatric-dosages', None, None, 200, 1),
+    ('GET', '/api/v1/pediatric-dosages?drug_id={drug_id}', None, None, 200, 1),
+    ('POST', '/api/v1/pediatric-dosages', 'admin', {'drug_id': '{drug_id}', 'dosage': '5 mg/kg'}, 201, 8),
+    ('GET', '/api/v1/pediatric-dosages/{pediatric_dosage_id}', 'user', None, 200, 1),
+    ('PUT', '/api/v1/pediatric-dosages/{pediatric_dosage_id}', 'admin', {'route': 'IV'}, 200, 9),
+    ('DELETE', '/api/v1/pediatric-dosages/{pediatric_dosage_id}', 'admin', None, 200, 8),
+    ('GET', '/api/v1/neonatal-dosages', None, None, 200, 1),
+    ('GET', '/api/v1/neonatal-dosages?drug_id={drug_id}', None, None, 200, 1),
+    ('POST', '/api/v1/neonatal-dosages', 'admin', {'drug_id': '{drug_id}', 'dosage': '3 mg/kg'}, 201, 8),
+    ('GET', '/api/v1/neonatal-dosages/{neonatal_dosage_id}', 'user', None, 200, 1),
+    ('PUT', '/api/v1/neonatal-dosages/{neonatal_dosage_id}', 'admin', {'route': 'IV'}, 200, 9),
+    ('DELETE', '/api/v1/neonatal-dosages/{neonatal_dosage_id}', 'admin', None, 200, 8),
+    ('GET', '/api/v1/dosing?drug_id={drug_id}&age_days=400', None, None, 200, 2),
+    ('POST', '/api/v1/eligibility', None, {'drug_ids': '{drug_ids}'}, 200, 1),
+    # Items
+    ('GET', '/api/v1/items', 'user', None, 200, 2),
+    ('GET', '/api/v1/items', 'admin', None, 200, 2),
+    ('POST', '/api/v1/items', 'user', {'name': 'New Item', 'price': 1.5}, 201, 3),
+    ('GET', '/api/v1/items/{item_id}', 'user', None, 200, 2),
+    ('PUT', '/api/v1/items/{item_id}', 'user', {'quantity': 7}, 200, 4),
+    ('DELETE', '/api/v1/items/{item_id}', 'user', None, 200, 3),
+    # Users
+    ('GET', '/api/v1/users', 'admin', None, 200, 2),
+    ('POST', '/api/v1/users', None, {'username': 'newuser', 'email': 'new@example.com',
+                                      'password': 'secret123'}, 201, 4),
+    ('GET', '/api/v1/users/{user_id}', 'user', None, 200, 1),
+    ('PUT', '/api/v1/users/{user_id}', 'user', {'username': 'renamed'}, 200, 4),
+    ('DELETE', '/api/v1/users/{other_user_id}', 'admin', None, 200, 5),
+    ('POST', '/api/v1/login', None, {'email': 'user@example.com', 'password': 'password'}, 200, 1),
+]
+
+
+@pytest.fixture
+def catalog(app, regular_user_id):
+    """Create ROWS companies, drugs, brands, dosages, items and users, returning sample IDs."""
+    with app.app_context():
+        companies = [Company(name=f'COMPANY {number}') for number in range(ROWS)]
+        drugs = [Drug(name=f'DRUG {number}') for number in range(ROWS)]
+        db.session.add_all(companies + drugs)
+        db.session.flush()
+
+        brands = [
+            Brand(name=f'BRAND {number}', company_id=companies[number].id,
+                  drugs=[drugs[number], drugs[(number + 1) % ROWS]])
+            for number in range(ROWS)
+        ]
+        empty_company = Company(name='COMPANY WITHOUT BRANDS')
+        bare_drug = Drug(name='DRUG WITHOUT DOSAGES')
+        dosages = []
+        for drug in drugs:
+            dosages += [
+                AdultDosage(drug_id=drug.id, dosage='500 mg'),
+                PediatricDosage(drug_id=drug.id, dosage='10 mg/kg', notes='For 1-5 Years'),
+                NeonatalDosage(drug_id=drug.id, dosage='2 mg/kg'),
+            ]
+        items = [Item(name=f'Item {number}', price=1.0, user_id=regular_user_id) for number in range(ROWS)]
+        # Hashing a password is slow by design, so the users share one hash
+        password_hash = generate_password_hash('password')
+        users = [User(username=f'user{number}', email=f'user{number}@example.com', password_hash=password_hash)
+                 for number in range(ROWS)]
+        db.session.add_all(brands + [empty_company, bare_drug] + dosages + items + users)
+        db.session.commit()
+
+        return {
+            'company_id': companies[1].id,
+            'empty_company_id': empty_company.id,
+            'drug_id': drugs[1].id,
+            'bare_drug_id': bare_drug.id,
+            'drug_ids': [drug.id for drug in drugs],
+            'brand_id': brands[1].id,
+            'adult_dosage_id': AdultDosage.query.filter_by(drug_id=drugs[1].id).first().id,
+            'pediatric_dosage_id': PediatricDosage.query.filter_by(drug_id=drugs[1].id).first().id,
+            'neonatal_dosage_id': NeonatalDosage.query.filter_by(drug_id=drugs[1].id).first().id,
+            'item_id': items[1].id,
+            'user_id': regular_user_id,
+            'other_user_id': users[1].id,
+        }
+
+
+def fill(value, ids):
+    """Substitute the ``{name}`` placeholders of a URL or JSON body with sample IDs."""
+    if isinstance(value, str):
+        if value.startswith('{') and value.endswith('}') and value[1:-1] in ids:
+            return ids[value[1:-1]]
+        return value.format(**ids)
+    if isinstance(value, dict):
+        return {key: fill(item, ids) for key, item in value.items()}
+    return value
+
+
+@pytest.mark.parametrize(
+    'method, url, role, body, status, budget', ENDPOINTS,
+    ids=[f'{method} {url}' + (f' as {role}' if role else '') for method, url, role, *_ in ENDPOINTS]
+)
+def test_query_budget(client, catalog, admin_headers, user_headers, query_budget,
+                      method, url, role, body, status, budget):
+    """Test the endpoint stays within its SQL statement budget however many rows exist."""
+    headers = {'admin': admin_headers, 'user': user_headers}.get(role)
+
+    with query_budget(budget):
+        response = client.open(fill(url, catalog), method=method, headers=headers, json=fill(body, catalog))
+
+    assert response.status_code == status
@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy import update
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.models.pharmaceutical import Company
+from app.utils.read_only import READ_ONLY_ENGINE
+
+
+@pytest.fixture
+def file_app(make_app):
+    """Create an app backed by a SQLite file, so it gets a read-only engine."""
+    return make_app(database='catalog.db', companies=['ACME'])
+
+
+def test_get_requests_read_from_read_only_engine(file_app):
+    """Test GET reads use the read-only engine and writes stay on the primary."""
+    read_only = file_app.extensions[READ_ONLY_ENGINE]
+
+    with file_app.test_request_context(method='GET'):
+        assert db.session.get_bind() is read_only
+        assert Company.query.first().name == 'ACME'
+        # Writes are pinned to the primary, as are the request's later reads
+        db.session.execute(update(Company).values(name='ACME Corp'))
+        assert db.session.get_bind() is db.engine
+        db.session.commit()
+
+    with file_app.test_request_context(method='POST'):
+        assert db.session.get_bind() is db.engine
+
+    with read_only.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.exec_driver_sql("UPDATE companies SET name = 'x'")
+
+
+def test_list_endpoint_served_by_read_only_engine(file_app):
+    """Test a GET endpoint returns data through the read-only engine."""
+    response = file_app.test_client().get('/api/v1/companies')
+    assert response.status_code == 200
+    assert [company['name'] for company in response.get_json()] == ['ACME']
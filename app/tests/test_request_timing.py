@@ -0,0 +1,73 @@
+import re
+
+import pytest
+from marshmallow import Schema
+from app.api.v1 import api
+from app.utils.pool import app_engines
+from app.utils.query_counter import QueryCounter
+
+SERVER_TIMING = re.compile(
+    r'^db;dur=[\d.]+;desc="(\d+) queries", ser;dur=([\d.]+), app;dur=[\d.]+, total;dur=([\d.]+)$'
+)
+
+
+@pytest.fixture
+def timed_app(make_app):
+    """Create an app with request timing enabled and a page of companies."""
+    return make_app(REQUEST_TIMING=True, companies=[f'COMPANY {number}' for number in range(100)])
+
+
+def test_server_timing_header(timed_app):
+    """Test API responses report their SQL count, serialization and total time."""
+    response = timed_app.test_client().get('/api/v1/companies')
+
+    assert response.status_code == 200
+    match = SERVER_TIMING.match(response.headers['Server-Timing'])
+    assert match
+    queries, serialize, total = int(match.group(1)), float(match.group(2)), float(match.group(3))
+    assert queries == 1
+    assert 0 < serialize <= total
+
+
+def test_queries_are_counted_per_request(timed_app):
+    """Test each request starts counting from zero."""
+    client = timed_app.test_client()
+    client.get('/api/v1/companies')
+    response = client.get('/api/v1/dosing?drug_id=1&age_days=30')
+
+    assert SERVER_TIMING.match(response.headers['Server-Timing']).group(1) == '2'
+
+
+def test_disabled_by_default(client):
+    """Test no Server-Timing header is sent unless enabled."""
+    response = client.get('/api/v1/companies')
+
+    assert response.status_code == 200
+    assert 'Server-Timing' not in response.headers
+
+
+def test_timing_shares_the_statement_count(timed_app):
+    """Test the header counts the same statements as QueryCounter."""
+    client = timed_app.test_client()
+    client.get('/api/v1/dosing?drug_id=1&age_days=30')
+    engines = list(app_engines(timed_app).values())
+    
+    counters = [QueryCounter(engine) for engine in engines]
+    for counter in counters:
+        counter.__enter__()
+    response = client.get('/api/v1/dosing?drug_id=1&age_days=30')
+    for counter in counters:
+        counter.__exit__(None, None, None)
+    
+    queries = SERVER_TIMING.match(response.headers['Server-Timing']).group(1)
+    assert int(queries) == sum(counter.count for counter in counters)
+
+
+def test_nothing_patched_outside_the_app(timed_app, make_app):
+    """Test enabling timing leaves marshmallow and the shared flask-restful Api alone."""
+    from flask_restful.representations.json import output_json
+    
+    assert api.representations.get('application/json', output_json) is output_json
+    assert not hasattr(Schema.dump, '__wrapped__')
+    assert 'cls' in timed_app.config['RESTFUL_JSON']
+    assert 'cls' not in make_app(REQUEST_TIMING=False).config.get('RESTFUL_JSON', {})
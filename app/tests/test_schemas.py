@@ -0,0 +1,30 @@
+import pytest
+from app.models.item import Item
+from app.models.pharmaceutical import Company, Drug, Brand, AdultDosage, PediatricDosage, NeonatalDosage
+from app.models.user import User
+from app.schemas.item import ItemSchema
+from app.schemas.pharmaceutical import (
+    CompanySchema, DrugSchema, BrandSchema, AdultDosageSchema, PediatricDosageSchema, NeonatalDosageSchema
+)
+from app.schemas.user import UserSchema
+
+# (schema, model, complete input, partial update)
+SCHEMAS = [
+    (CompanySchema, Company, {'name': 'ACME'}, {'address': 'Lahore'}),
+    (DrugSchema, Drug, {'name': 'ALPHA'}, {'category': 'Analgesic'}),
+    (BrandSchema, Brand, {'name': 'ALPHA BRAND'}, {'strength': '500 mg'}),
+    (AdultDosageSchema, AdultDosage, {'drug_id': 1, 'dosage': '500 mg'}, {'route': 'IV'}),
+    (PediatricDosageSchema, PediatricDosage, {'drug_id': 1, 'dosage': '10 mg/kg'}, {'route': 'IV'}),
+    (NeonatalDosageSchema, NeonatalDosage, {'drug_id': 1, 'dosage': '2 mg/kg'}, {'route': 'IV'}),
+    (ItemSchema, Item, {'name': 'Item', 'price': 1.5, 'user_id': 1}, {'quantity': 7}),
+    (UserSchema, User, {'username': 'someone', 'email': 'someone@example.com', 'password': 'secret123'},
+     {'username': 'renamed'}),
+]
+
+
+@pytest.mark.parametrize('schema, model, complete, update', SCHEMAS, ids=[s[0].__name__ for s in SCHEMAS])
+def test_load_creates_model_unless_partial(app, schema, model, complete, update):
+    """Test a complete load builds a model, while a partial update loads to the fields to apply."""
+    with app.app_context():
+        assert isinstance(schema().load(complete), model)
+        assert schema(partial=True).load(update) == update
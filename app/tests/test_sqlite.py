@@ -0,0 +1,46 @@
+import fcntl
+import os
+import pytest
+from app import db
+from app.utils.sqlite import ConnectionLock, DatabaseInUseError, profile_pragmas
+
+
+def test_fast_load_lock_refuses_while_database_in_use(tmp_path):
+    """Test the exclusive lock is refused while another holder has the database open."""
+    lock = ConnectionLock(str(tmp_path / 'catalog.db'))
+
+    # Stands in for a web worker holding connections
+    other = os.open(lock.path, os.O_RDWR | os.O_CREAT)
+    fcntl.flock(other, fcntl.LOCK_SH)
+    with pytest.raises(DatabaseInUseError):
+        with lock.exclusive():
+            pass
+
+    fcntl.flock(other, fcntl.LOCK_UN)
+    os.close(other)
+    with lock.exclusive():
+        assert lock.fd is not None
+    assert lock.fd is None
+
+
+def test_connections_get_the_configured_profile(make_app):
+    """Test every new connection runs with the journal mode, synchronous and cache size of the config."""
+    app = make_app(database='catalog.db', SQLITE_JOURNAL_MODE='WAL', SQLITE_SYNCHRONOUS='FULL',
+                   SQLITE_CACHE_SIZE=-2048)
+
+    with app.app_context():
+        db.engine.dispose()
+        with db.engine.connect() as connection:
+            assert connection.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+            # 2 is FULL
+            assert connection.exec_driver_sql('PRAGMA synchronous').scalar() == 2
+            assert connection.exec_driver_sql('PRAGMA cache_size').scalar() == -2048
+
+
+def test_unknown_profile_setting_rejected(make_app):
+    """Test a journal mode SQLite does not know stops the app from starting."""
+    assert profile_pragmas({'SQLITE_JOURNAL_MODE': 'wal', 'SQLITE_SYNCHRONOUS': 'normal'}) == [
+        'PRAGMA journal_mode=wal', 'PRAGMA synchronous=normal'
+    ]
+    with pytest.raises(ValueError, match='journal_mode'):
+        make_app(database='catalog.db', tables=False, SQLITE_JOURNAL_MODE='FAST')
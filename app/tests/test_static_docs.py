@@ -0,0 +1,67 @@
+import gzip
+import json
+import os
+
+
+def test_swagger_served_with_etag_and_gzip(client):
+    """Test swagger.json is served from memory with caching headers."""
+    response = client.get('/swagger.json')
+    assert response.status_code == 200
+    assert 'paths' in json.loads(response.get_data())
+    assert 'max-age=' in response.headers['Cache-Control']
+    etag = response.headers['ETag']
+    
+    # The blueprint alias serves the same document
+    assert client.get('/api/v1/swagger.json').headers['ETag'] == etag
+    assert client.get('/swagger.json', headers={'If-None-Match': etag}).status_code == 304
+    
+    compressed = client.get('/swagger.json', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['ETag'] != etag
+    assert gzip.decompress(compressed.get_data()) == response.get_data()
+
+
+def test_index_and_postman_collection_cached(client):
+    """Test the docs page and Postman collection get the same treatment."""
+    index = client.get('/static/index.html')
+    assert index.status_code == 200
+    assert index.mimetype == 'text/html'
+    assert 'ETag' in index.headers
+    
+    collection = client.get('/static/pharma-api-postman-collection.json', headers={'Accept-Encoding': 'gzip'})
+    assert collection.headers['Content-Encoding'] == 'gzip'
+    assert 'item' in json.loads(gzip.decompress(collection.get_data()))
+
+
+def test_missing_document_served_as_404(monkeypatch):
+    """Test a missing docs file does not stop the app from starting and answers 404."""
+    from app import create_app
+    from app.utils.static_docs import StaticDocument
+    
+    def missing(document, mtime):
+        raise FileNotFoundError(document.path)
+    monkeypatch.setattr(StaticDocument, '_load', missing)
+    
+    response = create_app('testing').test_client().get('/swagger.json')
+    assert response.status_code == 404
+    assert json.loads(response.get_data()) == {'error': 'File not found'}
+
+
+def test_reload_swaps_body_and_etag_together(app, tmp_path):
+    """Test a changed file is served with the ETag of its new content."""
+    from app.utils.static_docs import StaticDocument, serve_document
+    
+    path = tmp_path / 'doc.json'
+    path.write_text('{"version": 1}')
+    document = StaticDocument(str(path), 'application/json')
+    with app.test_request_context('/'):
+        first = serve_document(document)
+    
+    path.write_text('{"version": 2}')
+    os.utime(path, ns=(document.mtime + 1, document.mtime + 1))
+    with app.test_request_context('/'):
+        second = serve_document(document)
+    
+    assert json.loads(second.get_data()) == {'version': 2}
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert second.headers['ETag'] == f'"{document.content[3]}"'
@@ -0,0 +1,48 @@
+from app import db
+from app.models.pharmaceutical import Company
+from app.utils.upsert import select_then_write, upsert
+
+
+def test_upsert_on_source_id(app):
+    """Test rows are inserted once and updated in place on their source ID."""
+    with app.app_context():
+        table = Company.__table__
+        stmt = upsert(table, ['source_id'], ['source_id', 'name', 'country'], db.engine.dialect.name)
+
+        db.session.execute(stmt, [
+            {'source_id': 1, 'name': 'Acme', 'country': 'PK'},
+            {'source_id': 2, 'name': 'Globex', 'country': 'PK'},
+        ])
+        db.session.execute(stmt, [
+            {'source_id': 1, 'name': 'Acme Pharma', 'country': 'PK'},
+            {'source_id': 3, 'name': 'Initech', 'country': 'AE'},
+        ])
+        db.session.commit()
+
+        companies = {c.source_id: c.name for c in Company.query.all()}
+        assert companies == {1: 'Acme Pharma', 2: 'Globex', 3: 'Initech'}
+
+
+def test_select_then_write_on_source_id(app):
+    """Test the fallback for databases without ON CONFLICT inserts and updates like the upsert."""
+    with app.app_context():
+        table = Company.__table__
+        columns = ['source_id', 'name', 'country']
+
+        select_then_write(db.session, table, 'source_id', columns, [
+            {'source_id': 1, 'name': 'Acme', 'country': 'PK'},
+            {'source_id': 2, 'name': 'Globex', 'country': 'PK'},
+        ])
+        db.session.commit()
+        unchanged_at = db.session.get(Company, 2).updated_at
+
+        select_then_write(db.session, table, 'source_id', columns, [
+            {'source_id': 1, 'name': 'Acme Pharma', 'country': 'PK'},
+            {'source_id': 2, 'name': 'Globex', 'country': 'PK'},
+            {'source_id': 3, 'name': 'Initech', 'country': 'AE'},
+        ])
+        db.session.commit()
+
+        companies = {c.source_id: c.name for c in Company.query.all()}
+        assert companies == {1: 'Acme Pharma', 2: 'Globex', 3: 'Initech'}
+        assert db.session.get(Company, 2).updated_at == unchanged_at
@@ -95,4 +95,13 @@ def test_update_user_profile(client, user_headers):
     assert response.status_code == 200
     data = json.loads(response.data)
     assert data['username'] == 'updated_username'
-    assert data['email'] == 'user@example.com' 
\ No newline at end of file
+    assert data['email'] == 'user@example.com'
+
+
+def test_partial_user_update(client, user_headers, regular_user_id):
+    """Test a PUT with some fields changes only those fields."""
+    response = client.put(f'/api/v1/users/{regular_user_id}', headers=user_headers, json={'username': 'renamed'})
+    
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert (data['username'], data['email']) == ('renamed', 'user@example.com')
@@ -0,0 +1,133 @@
+"""
+Helpers for turning free-text age information into numeric day intervals.
+
+The source data only carries age information inside instruction text such as
+"Recommended for 6-12 Years of Children" or "For children under 2 years of
+age", so the bounds are parsed out here and stored as integer day columns that
+can be range-queried through an index.
+"""
+import re
+
+DAYS_PER_UNIT = {
+    'day': 1,
+    'week': 7,
+    'month': 30,
+    'year': 365,
+}
+
+ADULT_MIN_AGE_DAYS = 18 * DAYS_PER_UNIT['year']
+
+# Default age interval (in days, inclusive) covered by each dosage population
+POPULATION_AGE_DAYS = {
+    'neonatal': (0, 28),
+    'pediatric': (29, ADULT_MIN_AGE_DAYS - 1),
+    'adult': (ADULT_MIN_AGE_DAYS, None),
+}
+
+_UNIT = r'(days?|d|weeks?|wks?|months?|mos?|years?|yrs?)\b'
+_NUMBER = r'(\d+(?:\.\d+)?)'
+
+# "6-12 Years", "1 month-12 Years", "5 to 12 yrs"
+_RANGE_RE = re.compile(
+    _NUMBER + r'\s*' + r'(?:' + _UNIT + r')?' + r'\s*(?:-|to)\s*' + _NUMBER + r'\s*' + _UNIT,
+    re.IGNORECASE
+)
+# "under 2 years", "below 6 months", "less than 1 year"
+_UPPER_RE = re.compile(
+    r'\b(?:under|below|less than|younger than)\s+' + _NUMBER + r'\s*' + _UNIT,
+    re.IGNORECASE
+)
+# "over 1 month", "above 6 months", "older than 4 months"
+_LOWER_RE = re.compile(
+    r'\b(?:over|above|older than)\s+' + _NUMBER + r'\s*' + _UNIT,
+    re.IGNORECASE
+)
+# Words showing the text talks about patient age rather than treatment length
+_AGE_CONTEXT_RE = re.compile(r'\b(?:age|child|children|paeds?|infants?|old)\b', re.IGNORECASE)
+# "Do not use under 3 years", "avoid below 2 Yrs"
+_NEGATION_RE = re.compile(r'\b(?:not|avoid)\b', re.IGNORECASE)
+
+
+def _unit_days(unit):
+    """Return the number of days in a matched unit token."""
+    unit = unit.lower()
+    if unit.startswith('d'):
+        return DAYS_PER_UNIT['day']
+    if unit.startswith('w'):
+        return DAYS_PER_UNIT['week']
+    if unit.startswith('m'):
+        return DAYS_PER_UNIT['month']
+    return DAYS_PER_UNIT['year']
+
+
+def parse_age_range(text):
+    """
+    Parse age bounds out of free text.
+
+    Returns a ``(min_days, max_days, label)`` tuple where either bound may be
+    ``None`` when the text only gives one side, or ``None`` when no age
+    information was found.
+    """
+    if not text:
+        return None
+
+    match = _RANGE_RE.search(text)
+    if match:
+        low, low_unit, high, high_unit = match.groups()
+        # Ranges in days or weeks ("For 14 to 21 days") and bare month ranges
+        # ("every 2-3 Months") are treatment durations, not patient ages.
+        high_days = _unit_days(high_unit)
+        if high_days == DAYS_PER_UNIT['year'] or (
+                high_days == DAYS_PER_UNIT['month'] and _AGE_CONTEXT_RE.search(text)):
+            low_days = _unit_days(low_unit or high_unit)
+            # "6-12 Years" includes children who are 12, up to the day before 13
+            return (
+                int(float(low) * low_days),
+                int((float(high) + 1) * high_days) - 1,
+                match.group(0).strip()
+            )
+
+    match = _UPPER_RE.search(text)
+    if match:
+        value, unit = match.groups()
+        days = int(float(value) * _unit_days(unit))
+        label = match.group(0).strip()
+        # "Should not be used under 6 months" sets a lower bound
+        if _NEGATION_RE.search(text):
+            return days, None, label
+        return None, max(days - 1, 0), label
+
+    match = _LOWER_RE.search(text)
+    if match:
+        value, unit = match.groups()
+        return int(float(value) * _unit_days(unit)), None, match.group(0).strip()
+
+    return None
+
+
+def resolve_age_bounds(text, population):
+    """
+    Resolve the inclusive ``(min_days, max_days, label)`` interval for a dosage.
+
+    Bounds missing from the text fall back to the defaults of the dosage
+    population (``neonatal``, ``pediatric`` or ``adult``).
+    """
+    default_min, default_max = POPULATION_AGE_DAYS[population]
+    parsed = parse_age_range(text)
+    if not parsed:
+        return default_min, default_max, None
+
+    min_days, max_days, label = parsed
+    if min_days is None:
+        min_days = default_min
+    if max_days is None:
+        max_days = default_max
+        # Rows filed under a younger population but aimed at older children
+        if max_days is not None and min_days > max_days:
+            max_days = POPULATION_AGE_DAYS['pediatric'][1]
+
+    if max_days is not None and min_days > max_days:
+        # Contradictory text ("1 or over 21 years"); keep the population default
+        return default_min, default_max, None
+
+    return min_days, max_days, label
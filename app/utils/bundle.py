@@ -0,0 +1,203 @@
+"""
+Offline catalog bundle.
+
+The bundle is a compact, read-only SQLite copy of the reference catalog
+(companies, drugs, brands, brand-drug links and the dosage tables) with a
+``bundle_info`` table describing it, gzip-compressed for download. Its version
+is a fingerprint of the catalog (latest change log sequence number, row
+counts, highest IDs, latest ``updated_at`` and a checksum of the brand-drug
+links), so it only changes when the catalog does.
+
+Bundles are written to ``CATALOG_BUNDLE_DIR`` as ``catalog-<version>.sqlite.gz``
+next to a ``catalog-bundle.json`` with the current version's metadata. The
+importer rebuilds the bundle after every import, and the bundle endpoint
+rebuilds it when the catalog changed through the API, checking the
+fingerprint at most once per ``CATALOG_BUNDLE_CHECK_TTL`` seconds.
+"""
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import MetaData, create_engine, event, func, insert, select
+
+from app.models.change_log import ChangeLog
+from app.models.pharmaceutical import (
+    Company, Drug, Brand, AdultDosage, PediatricDosage, NeonatalDosage, brand_drugs
+)
+from app.utils.metrics import record_cache
+
+BUNDLE_FORMAT = 'sqlite'
+
+BUNDLE_TABLES = (
+    Company.__table__,
+    Drug.__table__,
+    Brand.__table__,
+    brand_drugs,
+    AdultDosage.__table__,
+    PediatricDosage.__table__,
+    NeonatalDosage.__table__,
+)
+
+METADATA_FILE = 'catalog-bundle.json'
+
+# Rows copied into the bundle per insert
+COPY_BATCH_SIZE = 5000
+
+
+def bundle_dir(app):
+    """Return the directory holding the bundles of the app, creating it if needed."""
+    path = app.config.get('CATALOG_BUNDLE_DIR') or os.path.join(app.instance_path, 'bundles')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def catalog_fingerprint(connection):
+    """
+    Return the catalog version, row counts and latest change log sequence number,
+    from one aggregate query per table.
+    """
+    change_seq = connection.execute(select(func.coalesce(func.max(ChangeLog.seq), 0))).scalar()
+    digest = hashlib.sha256(str(change_seq).encode('utf-8'))
+    counts = {}
+    for table in BUNDLE_TABLES:
+        if table is brand_drugs:
+            # Link rows have no ID or updated_at; a checksum of the pairs catches swaps
+            columns = (func.count(), func.max(table.c.created_at),
+                       func.sum(table.c.brand_id * 1000003 + table.c.drug_id))
+        else:
+            columns = (func.count(), func.max(table.c.updated_at), func.max(table.c.id))
+        row = connection.execute(select(*columns).select_from(table)).one()
+        counts[table.name] = row[0]
+        digest.update(repr((table.name, *row)).encode('utf-8'))
+    return digest.hexdigest()[:16], counts, change_seq
+
+
+def read_metadata(directory):
+    """Return the metadata of the current bundle, or None when none was built yet."""
+    try:
+        with open(os.path.join(directory, METADATA_FILE), encoding='utf-8') as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _scratch_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=OFF')
+    cursor.execute('PRAGMA synchronous=OFF')
+    cursor.close()
+
+
+def _copy_catalog(connection, path, version, counts, change_seq):
+    """Write the catalog tables and a ``bundle_info`` table into a new SQLite file."""
+    metadata = MetaData()
+    tables = [table.to_metadata(metadata) for table in BUNDLE_TABLES]
+    target = create_engine(f'sqlite:///{path}')
+    # A failed build is simply discarded, so the scratch file needs no journal or fsyncs
+    event.listen(target, 'connect', _scratch_pragmas)
+    try:
+        with target.begin() as bundle:
+            metadata.create_all(bundle)
+            for source, table in zip(BUNDLE_TABLES, tables):
+                result = connection.execution_options(stream_results=True, yield_per=COPY_BATCH_SIZE).execute(
+                    select(source).order_by(*source.primary_key.columns)
+                )
+                for rows in result.mappings().partitions():
+                    bundle.execute(insert(table), [dict(row) for row in rows])
+
+            bundle.exec_driver_sql('CREATE TABLE bundle_info (key TEXT PRIMARY KEY, value TEXT)')
+            bundle.exec_driver_sql(
+                'INSERT INTO bundle_info VALUES (?, ?), (?, ?), (?, ?), (?, ?)',
+                ('version', version, 'built_at', datetime.utcnow().isoformat(),
+                 'tables', json.dumps(counts), 'change_seq', str(change_seq))
+            )
+        with target.connect() as bundle:
+            bundle.exec_driver_sql('VACUUM')
+    finally:
+        target.dispose()
+
+
+def build_bundle(app, engine, force=False):
+    """
+    Build the bundle of the current catalog unless it is already up to date.
+
+    Builds are serialized across processes with a lock file. Returns the
+    metadata of the current bundle.
+    """
+    directory = bundle_dir(app)
+    with open(os.path.join(directory, 'build.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        # Fingerprint and copy come from the same transaction, so they match
+        with engine.connect() as connection, connection.begin():
+            version, counts, change_seq = catalog_fingerprint(connection)
+            current = read_metadata(directory)
+            if (not force and current and current['version'] == version
+                    and os.path.exists(os.path.join(directory, current['file']))):
+                return current
+
+            with tempfile.TemporaryDirectory(dir=directory) as tmp_dir:
+                raw_path = os.path.join(tmp_dir, 'catalog.sqlite')
+                _copy_catalog(connection, raw_path, version, counts, change_seq)
+
+                file_name = f'catalog-{version}.sqlite.gz'
+                gz_path = os.path.join(tmp_dir, file_name)
+                with open(raw_path, 'rb') as raw, gzip.open(gz_path, 'wb', compresslevel=9) as compressed:
+                    shutil.copyfileobj(raw, compressed)
+                sha256 = hashlib.sha256()
+                with open(gz_path, 'rb') as compressed:
+                    for block in iter(lambda: compressed.read(1024 * 1024), b''):
+                        sha256.update(block)
+
+                metadata = {
+                    'version': version,
+                    'format': BUNDLE_FORMAT,
+                    'file': file_name,
+                    'built_at': datetime.utcnow().isoformat(),
+                    'size': os.path.getsize(gz_path),
+                    'uncompressed_size': os.path.getsize(raw_path),
+                    'sha256': sha256.hexdigest(),
+                    'tables': counts,
+                    # Clients continue from here with GET /api/v1/changes?since=<change_seq>
+                    'change_seq': change_seq,
+                }
+                os.replace(gz_path, os.path.join(directory, file_name))
+
+        # Publish the new version atomically, then drop older bundles; the
+        # previous one is kept for downloads that already read its metadata
+        metadata_tmp = os.path.join(directory, f'{METADATA_FILE}.tmp')
+        with open(metadata_tmp, 'w', encoding='utf-8') as file:
+            json.dump(metadata, file, indent=2)
+        os.replace(metadata_tmp, os.path.join(directory, METADATA_FILE))
+        keep = {file_name, current['file'] if current else None}
+        for name in os.listdir(directory):
+            if name.startswith('catalog-') and name.endswith('.sqlite.gz') and name not in keep:
+                os.remove(os.path.join(directory, name))
+        return metadata
+
+
+def current_bundle(engine):
+    """Return the metadata of an up-to-date bundle for the current app, building it when stale."""
+    app = current_app._get_current_object()
+    checked_at = app.extensions.get('catalog_bundle_checked_at')
+    ttl = app.config.get('CATALOG_BUNDLE_CHECK_TTL', 60)
+
+    metadata = read_metadata(bundle_dir(app))
+    stale = metadata is None or checked_at is None or time.monotonic() - checked_at > ttl
+    if stale:
+        metadata = build_bundle(app, engine)
+        app.extensions['catalog_bundle_checked_at'] = time.monotonic()
+    record_cache('catalog_bundle', not stale)
+    return metadata
+
+
+def bundle_path(app, metadata):
+    """Return the file path of a bundle."""
+    return os.path.join(bundle_dir(app), metadata['file'])
@@ -0,0 +1,125 @@
+"""
+Database triggers feeding the ``change_log`` table.
+
+Every insert, update and delete on a catalog table appends a row with a
+monotonically increasing ``seq`` to ``change_log``. Triggers (rather than ORM
+events) also capture the importer's bulk Core statements and any other writer
+of the database. Triggers are installed on SQLite and PostgreSQL.
+
+Readers page through the log with ``seq > since``, which is only safe if no
+lower ``seq`` can become visible after a higher one. SQLite has one writer at
+a time, so that holds there. On PostgreSQL ``seq`` comes from a sequence
+drawn at insert time, so the trigger function first takes a transaction-level
+advisory lock: transactions writing catalog rows queue behind each other until
+the holder commits, and ``seq`` follows commit order. The price is that
+catalog writers (an import, API edits) no longer run concurrently.
+
+SQLite drops a table's triggers when the table is recreated, as Alembic's
+``batch_alter_table`` does; a migration that batch-alters a logged table must
+run ``trigger_statements`` again afterwards (``test_migrations_keep_change_log_triggers``
+fails otherwise).
+"""
+import zlib
+
+from sqlalchemy import text
+
+# Logged tables: table name, entity name in the feed, key column and, for
+# link tables, the second key column
+LOGGED_TABLES = (
+    ('companies', 'company', 'id', None),
+    ('drugs', 'drug', 'id', None),
+    ('brands', 'brand', 'id', None),
+    ('brand_drugs', 'brand_drug', 'brand_id', 'drug_id'),
+    ('adult_dosages', 'adult_dosage', 'id', None),
+    ('pediatric_dosages', 'pediatric_dosage', 'id', None),
+    ('neonatal_dosages', 'neonatal_dosage', 'id', None),
+)
+
+OPERATIONS = ('insert', 'update', 'delete')
+
+# Advisory lock serializing change log writers on PostgreSQL until they commit
+CHANGE_LOG_LOCK_KEY = zlib.crc32(b'pharma-api:change-log')
+
+_PG_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION log_change() RETURNS trigger AS $$
+DECLARE
+    row_data jsonb;
+BEGIN
+    -- Held until commit, so seq values become visible in increasing order
+    PERFORM pg_advisory_xact_lock({CHANGE_LOG_LOCK_KEY});
+    IF TG_OP = 'DELETE' THEN
+        row_data := to_jsonb(OLD);
+    ELSE
+        row_data := to_jsonb(NEW);
+    END IF;
+    INSERT INTO change_log (entity, entity_id, related_id, op)
+    VALUES (
+        TG_ARGV[0],
+        (row_data ->> TG_ARGV[1])::integer,
+        CASE WHEN TG_NARGS > 2 THEN (row_data ->> TG_ARGV[2])::integer END,
+        lower(TG_OP)
+    );
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def _trigger_name(table, operation):
+    return f'log_{table}_{operation}'
+
+
+def _sqlite_trigger(table, entity, key, related_key, operation):
+    row = 'OLD' if operation == 'delete' else 'NEW'
+    related = f'{row}.{related_key}' if related_key else 'NULL'
+    return (
+        f'CREATE TRIGGER IF NOT EXISTS {_trigger_name(table, operation)} '
+        f'AFTER {operation.upper()} ON {table} BEGIN '
+        f'INSERT INTO change_log (entity, entity_id, related_id, op) '
+        f"VALUES ('{entity}', {row}.{key}, {related}, '{operation}'); END"
+    )
+
+
+def _postgresql_trigger(table, entity, key, related_key, operation):
+    args = ', '.join(f"'{arg}'" for arg in (entity, key, related_key) if arg)
+    return (
+        f'CREATE TRIGGER {_trigger_name(table, operation)} '
+        f'AFTER {operation.upper()} ON {table} FOR EACH ROW '
+        f'EXECUTE FUNCTION log_change({args})'
+    )
+
+
+def trigger_statements(dialect_name):
+    """Return the statements creating the change log triggers for a dialect."""
+    if dialect_name == 'sqlite':
+        return [
+            _sqlite_trigger(*logged, operation)
+            for logged in LOGGED_TABLES for operation in OPERATIONS
+        ]
+    if dialect_name == 'postgresql':
+        statements = [_PG_FUNCTION]
+        for logged in LOGGED_TABLES:
+            for operation in OPERATIONS:
+                statements.append(f'DROP TRIGGER IF EXISTS {_trigger_name(logged[0], operation)} ON {logged[0]}')
+                statements.append(_postgresql_trigger(*logged, operation))
+        return statements
+    # Other databases get the table but no feed
+    return []
+
+
+def drop_statements(dialect_name):
+    """Return the statements dropping the change log triggers for a dialect."""
+    statements = []
+    for table, _, _, _ in LOGGED_TABLES:
+        for operation in OPERATIONS:
+            on_table = f' ON {table}' if dialect_name == 'postgresql' else ''
+            statements.append(f'DROP TRIGGER IF EXISTS {_trigger_name(table, operation)}{on_table}')
+    if dialect_name == 'postgresql':
+        statements.append('DROP FUNCTION IF EXISTS log_change()')
+    return statements
+
+
+def install_triggers(target, connection, **kwargs):
+    """Create the change log triggers; used as the metadata ``after_create`` hook."""
+    for statement in trigger_statements(connection.dialect.name):
+        connection.execute(text(statement))
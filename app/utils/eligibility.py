@@ -0,0 +1,187 @@
+"""
+Per-drug dosing eligibility bitmap.
+
+Every drug gets two bits per population: ``HAS_DOSING`` when at least one real
+dosage row exists and ``NOT_RECOMMENDED`` when the population has "Not
+recommended in this age group" placeholders without a dose. The flags are
+persisted in the ``drug_eligibility`` table (rebuilt by the importer and kept
+current on every dosage write) and mirrored into a per-process ``bytearray``
+indexed by drug ID, so batch lookups never touch the dosage tables.
+"""
+import time
+from datetime import datetime
+from itertools import chain
+
+from flask import current_app, has_app_context
+from sqlalchemy import and_, case, delete, event, func, inspect, insert, select
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models.pharmaceutical import AdultDosage, PediatricDosage, NeonatalDosage, DrugEligibility
+from app.utils.metrics import record_cache
+
+HAS_DOSING = 1
+NOT_RECOMMENDED = 2
+
+POPULATION_MODELS = {
+    'adult': AdultDosage,
+    'pediatric': PediatricDosage,
+    'neonatal': NeonatalDosage,
+}
+DOSAGE_MODELS = tuple(POPULATION_MODELS.values())
+
+# Bit offset of each population inside the per-drug flags byte
+_SHIFT = {'adult': 0, 'pediatric': 2, 'neonatal': 4}
+
+
+def population_status(flags, population):
+    """Return ``has_dosing``, ``not_recommended`` or ``no_data`` for a population."""
+    bits = (flags >> _SHIFT[population]) & (HAS_DOSING | NOT_RECOMMENDED)
+    if bits & HAS_DOSING:
+        return 'has_dosing'
+    if bits & NOT_RECOMMENDED:
+        return 'not_recommended'
+    return 'no_data'
+
+
+def describe_flags(flags):
+    """Expand a flags byte into a status per population."""
+    return {population: population_status(flags, population) for population in POPULATION_MODELS}
+
+
+def compute_flags(connection, drug_ids=None):
+    """Compute eligibility flags from the dosage tables with one grouped query per population."""
+    flags = {}
+    for population, model in POPULATION_MODELS.items():
+        table = model.__table__
+        placeholder = and_(
+            func.coalesce(func.trim(table.c.dosage), '') == '',
+            func.lower(table.c.notes).like('%not recommended%')
+        )
+        query = select(
+            table.c.drug_id,
+            func.max(case((placeholder, 0), else_=1)),
+            func.max(case((placeholder, 1), else_=0))
+        ).group_by(table.c.drug_id)
+        if drug_ids is not None:
+            query = query.where(table.c.drug_id.in_(drug_ids))
+
+        for drug_id, has_dosing, not_recommended in connection.execute(query):
+            bits = (HAS_DOSING if has_dosing else 0) | (NOT_RECOMMENDED if not_recommended else 0)
+            flags[drug_id] = flags.get(drug_id, 0) | (bits << _SHIFT[population])
+    return flags
+
+
+def refresh_eligibility(connection, drug_ids=None):
+    """
+    Recompute and persist the flags of ``drug_ids`` (or of every drug).
+
+    Returns the new flags, including zero for requested drugs that no longer
+    have any dosage rows.
+    """
+    table = DrugEligibility.__table__
+    if drug_ids is not None:
+        drug_ids = list(drug_ids)
+
+    flags = compute_flags(connection, drug_ids)
+
+    stmt = delete(table)
+    if drug_ids is not None:
+        stmt = stmt.where(table.c.drug_id.in_(drug_ids))
+    connection.execute(stmt)
+    if flags:
+        now = datetime.utcnow()
+        connection.execute(insert(table), [
+            {'drug_id': drug_id, 'flags': value, 'updated_at': now}
+            for drug_id, value in flags.items()
+        ])
+
+    if drug_ids is not None:
+        return {drug_id: flags.get(drug_id, 0) for drug_id in drug_ids}
+    return flags
+
+
+class EligibilityCache:
+    """In-memory eligibility bitmap holding one flags byte per drug ID."""
+
+    def __init__(self):
+        self._flags = bytearray()
+        self._loaded_at = None
+
+    def is_stale(self, ttl):
+        """Check whether the bitmap needs to be reloaded from the database."""
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > ttl
+
+    def load(self, connection):
+        """Load the whole bitmap from the ``drug_eligibility`` table."""
+        table = DrugEligibility.__table__
+        rows = connection.execute(select(table.c.drug_id, table.c.flags)).all()
+        flags = bytearray(max((row[0] for row in rows), default=-1) + 1)
+        for drug_id, value in rows:
+            flags[drug_id] = value
+        self._flags = flags
+        self._loaded_at = time.monotonic()
+
+    def update(self, flags):
+        """Apply freshly computed flags without a full reload."""
+        for drug_id, value in flags.items():
+            if drug_id >= len(self._flags):
+                self._flags.extend(bytes(drug_id + 1 - len(self._flags)))
+            self._flags[drug_id] = value
+
+    def get(self, drug_id):
+        """Return the flags byte of a drug (zero when unknown)."""
+        if 0 <= drug_id < len(self._flags):
+            return self._flags[drug_id]
+        return 0
+
+
+def get_eligibility_cache():
+    """Return the bitmap of the current app, reloading it once its TTL expired."""
+    cache = current_app.extensions.get('eligibility')
+    if cache is None:
+        cache = current_app.extensions['eligibility'] = EligibilityCache()
+
+    stale = cache.is_stale(current_app.config.get('ELIGIBILITY_CACHE_TTL', 60))
+    if stale:
+        cache.load(db.session.connection())
+    record_cache('eligibility', not stale)
+    return cache
+
+
+def get_eligibility(drug_ids):
+    """Return the eligibility flags of many drugs straight from memory."""
+    cache = get_eligibility_cache()
+    return {drug_id: cache.get(drug_id) for drug_id in drug_ids}
+
+
+@event.listens_for(Session, 'after_flush')
+def _refresh_after_dosage_writes(session, flush_context):
+    """Recompute the flags of drugs whose dosages were created, changed or deleted."""
+    drug_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, DOSAGE_MODELS):
+            drug_ids.add(obj.drug_id)
+            # Also refresh the drug a dosage was moved away from
+            drug_ids.update(inspect(obj).attrs.drug_id.history.deleted or ())
+    drug_ids.discard(None)
+
+    if drug_ids:
+        flags = refresh_eligibility(session.connection(), drug_ids)
+        session.info.setdefault('eligibility_flags', {}).update(flags)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_committed_flags(session):
+    """Push committed flags into this process's bitmap."""
+    flags = session.info.pop('eligibility_flags', None)
+    if flags and has_app_context():
+        cache = current_app.extensions.get('eligibility')
+        if cache is not None:
+            cache.update(flags)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back_flags(session):
+    """Forget flags computed inside a transaction that was rolled back."""
+    session.info.pop('eligibility_flags', None)
@@ -0,0 +1,105 @@
+"""
+Streaming CSV and NDJSON export of catalog tables.
+
+Rows are read with a server-side cursor (``stream_results``) in batches from
+one connection and transaction, so an export is a single consistent snapshot
+of the table and memory stays constant however large it is. Output can be
+gzip-compressed on the fly.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+from app.models.pharmaceutical import (
+    Company, Drug, Brand, AdultDosage, PediatricDosage, NeonatalDosage, brand_drugs
+)
+
+# Exportable tables by URL name
+EXPORT_TABLES = {
+    'companies': Company.__table__,
+    'drugs': Drug.__table__,
+    'brands': Brand.__table__,
+    'brand-drugs': brand_drugs,
+    'adult-dosages': AdultDosage.__table__,
+    'pediatric-dosages': PediatricDosage.__table__,
+    'neonatal-dosages': NeonatalDosage.__table__,
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Rows fetched from the cursor and encoded per batch
+EXPORT_BATCH_SIZE = 1000
+
+
+def _value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def iter_rows(engine, table, batch_size=EXPORT_BATCH_SIZE):
+    """Yield the column names of ``table``, then its rows in batches, from one snapshot."""
+    with engine.connect() as connection:
+        if connection.dialect.name == 'postgresql':
+            connection = connection.execution_options(isolation_level='REPEATABLE READ')
+        with connection.begin():
+            result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(
+                select(table).order_by(*table.primary_key.columns)
+            )
+            yield list(result.keys())
+            for rows in result.partitions():
+                yield rows
+
+
+def encode_csv(batches):
+    """Encode the header and row batches of ``iter_rows`` as CSV text chunks."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(next(batches))
+    for rows in batches:
+        writer.writerows([[_value(value) for value in row] for row in rows])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def encode_ndjson(batches):
+    """Encode the row batches of ``iter_rows`` as NDJSON text chunks, one object per row."""
+    columns = next(batches)
+    for rows in batches:
+        yield ''.join(
+            json.dumps({column: _value(value) for column, value in zip(columns, row)}) + '\n'
+            for row in rows
+        )
+
+
+ENCODERS = {
+    'csv': encode_csv,
+    'ndjson': encode_ndjson,
+}
+
+
+def gzip_chunks(chunks):
+    """Compress text chunks into a gzip stream as they are produced."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(engine, table, fmt, gzip=False):
+    """Return a generator of the encoded (and optionally compressed) export of a table."""
+    chunks = ENCODERS[fmt](iter_rows(engine, table, EXPORT_BATCH_SIZE))
+    if gzip:
+        return gzip_chunks(chunks)
+    return (chunk.encode('utf-8') for chunk in chunks)
@@ -0,0 +1,25 @@
+"""
+Content hashing helpers used to detect records that are already stored.
+"""
+import hashlib
+
+# Separator that cannot appear in normalized text values
+_FIELD_SEPARATOR = '\x1f'
+
+
+def normalize_value(value):
+    """Normalize a value so formatting-only differences hash the same."""
+    if value is None:
+        return ''
+    return ' '.join(str(value).split()).lower()
+
+
+def content_hash(*values):
+    """Return the SHA-256 hex digest of the normalized values."""
+    payload = _FIELD_SEPARATOR.join(normalize_value(value) for value in values)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def dosage_content_hash(drug_id, dosage=None, frequency=None, route=None, notes=None, indication=None):
+    """Return the content hash identifying a dosage row."""
+    return content_hash(drug_id, dosage, frequency, route, notes, indication)
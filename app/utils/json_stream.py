@@ -0,0 +1,106 @@
+"""
+Incremental reader for large JSON array files.
+
+Import feeds are a single top-level JSON array of records. Instead of
+``json.load``-ing the whole document, the array is decoded one element at a
+time from a fixed-size text buffer, so memory stays bounded by the chunk size
+and the largest single record. ``.json.gz`` and ``.json.xz`` files are
+decompressed on the fly.
+"""
+import gzip
+import json
+import lzma
+from pathlib import Path
+
+# Characters of text read from the file per refill
+CHUNK_SIZE = 64 * 1024
+
+COMPRESSED_SUFFIXES = ('.gz', '.xz')
+
+_WHITESPACE = ' \t\r\n'
+
+
+def find_data_file(path):
+    """Return ``path`` or its ``.gz``/``.xz`` compressed variant, whichever exists."""
+    path = Path(path)
+    if path.exists():
+        return path
+    for suffix in COMPRESSED_SUFFIXES:
+        candidate = path.with_name(path.name + suffix)
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def open_data_file(path):
+    """Open a data file for text reading, decompressing it when needed."""
+    path = Path(path)
+    if path.suffix == '.gz':
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if path.suffix == '.xz':
+        return lzma.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_json_array(fileobj, chunk_size=CHUNK_SIZE):
+    """
+    Yield the elements of a top-level JSON array one at a time.
+
+    Raises ``ValueError`` when the document is not an array or is truncated.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+    in_array = False
+
+    while True:
+        # Skip whitespace, and element separators once inside the array
+        separators = _WHITESPACE + ',' if in_array else _WHITESPACE + '\ufeff'
+        while pos < len(buffer) and buffer[pos] in separators:
+            pos += 1
+
+        if pos == len(buffer):
+            if eof:
+                raise ValueError("Unexpected end of JSON array")
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        if not in_array:
+            if buffer[pos] != '[':
+                raise ValueError("Expected a JSON array")
+            in_array = True
+            pos += 1
+            continue
+
+        if buffer[pos] == ']':
+            return
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            value, end = None, None
+
+        # An element reaching the end of the buffer may continue in the next chunk
+        if end is None or (end == len(buffer) and not eof):
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                if end is None:
+                    raise ValueError("Truncated or invalid JSON array element")
+                eof = True
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        yield value
+        pos = end
+
+
+def iter_json_file(path, chunk_size=CHUNK_SIZE):
+    """Yield the records of a (possibly compressed) JSON array file."""
+    with open_data_file(path) as fileobj:
+        yield from iter_json_array(fileobj, chunk_size)
@@ -0,0 +1,121 @@
+"""
+Prometheus metrics.
+
+``GET /metrics`` exposes, in the Prometheus text format:
+
+- ``http_requests_total`` and ``http_request_duration_seconds`` labeled by
+  flask-restful resource (or view function) and method, the counter also by
+  status; ``http_request_errors_total`` counts the 5xx responses
+- ``db_query_duration_seconds`` per engine (``primary`` or ``read_only``),
+  one observation per SQL statement
+- ``cache_requests_total`` per in-process cache and ``hit``/``miss`` result;
+  the hit ratio is ``rate(...{result="hit"}) / rate(...)`` in PromQL
+
+Under gunicorn every worker has its own counters. When
+``PROMETHEUS_MULTIPROC_DIR`` is set (before the app is imported), each process
+writes its samples to files in that directory and ``/metrics`` aggregates the
+files of all workers, so any worker answers the scrape with totals for the
+whole server; ``gunicorn.conf.py`` empties the directory on start and retires
+the files of exited workers.
+"""
+import os
+import time
+
+from flask import Response, current_app, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+
+from app.utils.query_counter import observe_statements
+
+REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests handled.', ['resource', 'method', 'status']
+)
+REQUEST_ERRORS = Counter(
+    'http_request_errors_total', 'HTTP requests answered with a server error (5xx).',
+    ['resource', 'method', 'status']
+)
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Time spent handling HTTP requests.', ['resource', 'method'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+QUERY_DURATION = Histogram(
+    'db_query_duration_seconds', 'Time spent executing SQL statements.', ['engine'],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Lookups of in-process caches.', ['cache', 'result']
+)
+
+# Label of requests that matched no route, keeping the label set bounded
+UNMATCHED = '<unmatched>'
+
+
+def record_cache(cache, hit):
+    """Count a hit or miss of an in-process cache."""
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def resource_label():
+    """Return the flask-restful resource class (or view function) name of the current request."""
+    if request.endpoint is None:
+        return UNMATCHED
+    view = current_app.view_functions.get(request.endpoint)
+    view_class = getattr(view, 'view_class', None)
+    return view_class.__name__ if view_class is not None else request.endpoint
+
+
+def _start_request():
+    g._metrics_started = time.perf_counter()
+
+
+def _record_request(response):
+    started = g.pop('_metrics_started', None)
+    if started is None or request.endpoint == 'metrics':
+        return response
+
+    resource, method, status = resource_label(), request.method, str(response.status_code)
+    REQUEST_DURATION.labels(resource, method).observe(time.perf_counter() - started)
+    REQUESTS.labels(resource, method, status).inc()
+    if response.status_code >= 500:
+        REQUEST_ERRORS.labels(resource, method, status).inc()
+    return response
+
+
+def instrument_engine(engine, name):
+    """Observe the duration of every statement executed on an engine."""
+    histogram = QUERY_DURATION.labels(name)
+
+    def observe(statement, duration):
+        histogram.observe(duration)
+
+    observe_statements(engine, observe)
+
+
+def metrics_registry():
+    """Return the registry to expose: all workers' samples in multiprocess mode, else this process's."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics():
+    """Expose the metrics in the Prometheus text format."""
+    return Response(generate_latest(metrics_registry()), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app):
+    """Record request, SQL and cache metrics and serve them at /metrics, unless ``METRICS_ENABLED`` is off."""
+    if not app.config.get('METRICS_ENABLED'):
+        return
+
+    from app.utils.pool import app_engines
+
+    for name, engine in app_engines(app).items():
+        instrument_engine(engine, name)
+
+    app.before_request(_start_request)
+    app.after_request(_record_request)
+    app.add_url_rule('/metrics', 'metrics', metrics)
@@ -0,0 +1,132 @@
+"""
+Deploy-time migration and seeding gate.
+
+Starting processes call ``ensure_database`` before serving. The head revision
+is read from the migration scripts without importing Alembic and compared to
+the database's ``alembic_version`` with one query, so once the database is
+current every process goes on immediately. Otherwise the process takes the
+migration lock (an exclusive ``flock`` on ``<database>.migrate.lock`` for
+SQLite files, a session advisory lock on PostgreSQL), checks again, and only
+the first process to get the lock upgrades the schema and seeds the default
+data; the others find the database current once the lock is released.
+"""
+import fcntl
+import os
+import re
+import zlib
+from contextlib import contextmanager
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.utils.sqlite import sqlite_database_path
+
+# Advisory lock key shared by every process migrating the same PostgreSQL database
+MIGRATION_LOCK_KEY = zlib.crc32(b'pharma-api:migrations')
+
+_REVISION = re.compile(r"^revision\s*=\s*['\"](\w+)['\"]", re.MULTILINE)
+_DOWN_REVISION = re.compile(r"^down_revision\s*=\s*(.+)$", re.MULTILINE)
+_REVISION_ID = re.compile(r"['\"](\w+)['\"]")
+
+
+def migrations_dir(app):
+    """Return the migration scripts directory of the app."""
+    return os.path.join(os.path.dirname(app.root_path), 'migrations')
+
+
+def head_revisions(directory):
+    """Return the head revisions of the migration scripts in ``directory``."""
+    revisions = set()
+    parents = set()
+    versions = os.path.join(directory, 'versions')
+    for name in os.listdir(versions):
+        if not name.endswith('.py'):
+            continue
+        with open(os.path.join(versions, name), encoding='utf-8') as file:
+            source = file.read()
+        revision = _REVISION.search(source)
+        if revision is None:
+            continue
+        revisions.add(revision.group(1))
+        down_revision = _DOWN_REVISION.search(source)
+        if down_revision:
+            parents.update(_REVISION_ID.findall(down_revision.group(1)))
+    return revisions - parents
+
+
+def database_revisions(engine):
+    """Return the revisions recorded in the database, empty when it was never migrated."""
+    try:
+        with engine.connect() as connection:
+            return {row[0] for row in connection.execute(text('SELECT version_num FROM alembic_version'))}
+    except DBAPIError:
+        # No alembic_version table yet
+        return set()
+
+
+@contextmanager
+def migration_lock(app, engine):
+    """Hold the lock that serializes migrations across processes."""
+    if engine.dialect.name == 'postgresql':
+        with engine.connect() as connection:
+            connection.execute(text('SELECT pg_advisory_lock(:key)'), {'key': MIGRATION_LOCK_KEY})
+            try:
+                yield
+            finally:
+                connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': MIGRATION_LOCK_KEY})
+                connection.commit()
+        return
+
+    database_path = sqlite_database_path(engine)
+    if database_path is not None:
+        path = f'{database_path}.migrate.lock'
+    else:
+        os.makedirs(app.instance_path, exist_ok=True)
+        path = os.path.join(app.instance_path, 'migrate.lock')
+    with open(path, 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def seed_admin():
+    """Create the default admin user unless it exists."""
+    from app import db
+    from app.models.user import User
+
+    if User.query.filter_by(email='admin@example.com').first() is None:
+        admin = User(email='admin@example.com', username='admin', admin=True)
+        admin.password = 'adminpassword'  # Will be hashed by the model
+        db.session.add(admin)
+        db.session.commit()
+        print("Created admin user: admin@example.com with password: adminpassword")
+
+
+def ensure_database(app, seed=seed_admin):
+    """
+    Upgrade the database to the head revision and seed it, unless it is current.
+
+    Returns True when this process migrated and seeded the database, False when
+    it was already current.
+    """
+    from app import db, init_migrate
+
+    heads = head_revisions(migrations_dir(app))
+    with app.app_context():
+        engine = db.engine
+        if database_revisions(engine) == heads:
+            return False
+
+        with migration_lock(app, engine):
+            # Another process may have finished while this one waited
+            if database_revisions(engine) == heads:
+                return False
+            from flask_migrate import upgrade
+            init_migrate(app)
+            upgrade(directory=migrations_dir(app))
+            if seed is not None:
+                seed()
+            db.session.remove()
+        return True
@@ -0,0 +1,117 @@
+"""
+Connection pool configuration, statistics and fork safety.
+
+Pool size, overflow, checkout timeout, recycle time and pre-ping come from the
+``DB_POOL_*`` config keys and apply to every pooled engine of the app. The
+pool records how many checkouts it served and how long callers waited for a
+connection, which the admin pool endpoint reports alongside the current
+checked-out and overflow counts of each engine.
+
+Engines must not be shared across ``fork()``: a worker process that inherits
+pooled connections from its parent would talk over the parent's sockets, so
+``dispose_engines`` drops the inherited pools in the child.
+"""
+import threading
+import time
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class TimedQueuePool(QueuePool):
+    """Queue pool recording the number of checkouts and the time spent waiting for them."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+
+def pool_options(config, uri):
+    """Build the pool engine options from the app config, or {} for unpooled databases."""
+    if uri is None:
+        return {}
+    # In-memory SQLite databases live in a single static connection
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite' and (url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory'):
+        return {}
+    return {
+        'poolclass': TimedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+
+
+def init_pool(app):
+    """Add the pool options to the engine options; explicit engine options win."""
+    options = pool_options(app.config, app.config.get('SQLALCHEMY_DATABASE_URI'))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {**options, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})}
+
+
+def app_engines(app):
+    """Return the engines of the app by name: the primary and, if any, the read-only one."""
+    from app import db
+    from app.utils.read_only import READ_ONLY_ENGINE
+
+    with app.app_context():
+        engines = {'primary': db.engine}
+    if READ_ONLY_ENGINE in app.extensions:
+        engines['read_only'] = app.extensions[READ_ONLY_ENGINE]
+    return engines
+
+
+def pool_stats(engine):
+    """Return the current statistics of an engine's connection pool."""
+    pool = engine.pool
+    stats = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+            'timeout': pool.timeout(),
+        })
+    if isinstance(pool, TimedQueuePool):
+        stats.update({
+            'checkouts': pool.checkouts,
+            'timeouts': pool.timeouts,
+            'wait_ms_total': round(pool.wait_total * 1000, 3),
+            'wait_ms_avg': round(pool.wait_total * 1000 / pool.checkouts, 3) if pool.checkouts else 0.0,
+            'wait_ms_max': round(pool.wait_max * 1000, 3),
+        })
+    return stats
+
+
+def dispose_engines(app, close=False):
+    """
+    Drop the pooled connections of the app's engines.
+
+    In a child after ``fork()`` the default ``close=False`` leaves the parent's
+    connections open for the parent; the parent itself closes them before forking.
+    """
+    for engine in app_engines(app).values():
+        engine.dispose(close=close)
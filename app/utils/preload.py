@@ -0,0 +1,37 @@
+"""
+Preparing a preloaded app (``gunicorn --preload``) for forking workers.
+
+The master builds the app once and warms the read-only caches, closes its
+database connections so no socket or SQLite handle is shared with the
+workers, and moves every object it allocated into the permanent GC
+generation with ``gc.freeze()``. The cyclic collector then never touches
+(and so never writes to) those objects in the workers, which keeps their
+memory pages shared copy-on-write with the master.
+"""
+import gc
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.utils.eligibility import get_eligibility_cache
+from app.utils.pool import dispose_engines
+
+
+def warm_caches(app):
+    """Load the per-process read-only caches, so workers inherit them ready to use."""
+    with app.app_context():
+        try:
+            get_eligibility_cache()
+        except SQLAlchemyError as e:
+            # e.g. a database that has not been migrated yet; workers load it on demand
+            app.logger.warning(f"Skipped warming the eligibility cache: {e}")
+        finally:
+            db.session.remove()
+
+
+def prepare_for_fork(app):
+    """Warm the caches, close all connections and freeze the heap before forking workers."""
+    warm_caches(app)
+    dispose_engines(app, close=True)
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,117 @@
+"""
+Count and time the SQL statements executed on an engine.
+
+Each engine gets a single pair of cursor listeners, which time every statement
+and pass it to the engine's statement observers: ``QueryCounter`` while it is
+active, and the Prometheus metrics and per-request timing when those are on.
+They all count the same statements, so their numbers agree. A statement that
+fails is observed too, when the driver reports the error.
+"""
+import time
+import weakref
+from contextlib import ExitStack, contextmanager
+
+from sqlalchemy import event
+
+# Observers of the statements executed on each engine
+_observers = weakref.WeakKeyDictionary()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._statement_started = time.perf_counter()
+
+
+def _notify(engine, statement, context):
+    started = getattr(context, '_statement_started', None)
+    if started is None:
+        return
+    # Only once per statement, whether it completed or failed
+    context._statement_started = None
+    duration = time.perf_counter() - started
+    for observer in tuple(_observers.get(engine, ())):
+        observer(statement, duration)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _notify(conn.engine, statement, context)
+
+
+def _handle_error(exception_context):
+    _notify(exception_context.engine, exception_context.statement, exception_context.execution_context)
+
+
+def observe_statements(engine, observer):
+    """
+    Call ``observer(statement, duration)`` for every statement executed on an engine.
+    
+    An ``executemany`` batch is one statement, as it is one round trip from the
+    application's point of view. Adding the same observer twice has no effect.
+    """
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+    observers = _observers.setdefault(engine, [])
+    if observer not in observers:
+        observers.append(observer)
+
+
+def unobserve_statements(engine, observer):
+    """Stop passing an engine's statements to an observer."""
+    observers = _observers.get(engine, [])
+    if observer in observers:
+        observers.remove(observer)
+
+
+class QueryCounter:
+    """
+    Context manager counting statements sent to the database while active.
+    
+    An ``executemany`` batch counts as one statement, as it is one round trip
+    from the application's point of view. With ``record=True`` the statements
+    themselves are kept in ``statements``.
+    """
+    
+    def __init__(self, engine, record=False):
+        self.engine = engine
+        self.record = record
+        self.count = 0
+        self.statements = []
+    
+    def _count(self, statement, duration):
+        self.count += 1
+        if self.record:
+            self.statements.append(statement)
+    
+    def __enter__(self):
+        observe_statements(self.engine, self._count)
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        unobserve_statements(self.engine, self._count)
+        return False
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block runs more SQL statements than its budget allows."""
+
+
+@contextmanager
+def assert_max_queries(engines, budget):
+    """
+    Fail if the block executes more than ``budget`` statements on ``engines``.
+    
+    The error lists the statements that ran, so an N+1 pattern is easy to spot.
+    """
+    with ExitStack() as stack:
+        counters = [stack.enter_context(QueryCounter(engine, record=True)) for engine in engines]
+        yield counters
+    
+    count = sum(counter.count for counter in counters)
+    if count > budget:
+        statements = '\n'.join(
+            f'  {number}. {statement}'
+            for number, statement in enumerate((s for c in counters for s in c.statements), 1)
+        )
+        raise QueryBudgetExceeded(f'{count} SQL statements executed, budget is {budget}:\n{statements}')
@@ -0,0 +1,70 @@
+"""
+Read-only engine for GET traffic.
+
+Besides the primary engine, the app opens a second engine with its own
+connection pool that can only read: ``DATABASE_READ_URL`` (e.g. a replica)
+when set, otherwise the primary SQLite file opened with ``mode=ro``. The
+session sends the queries of GET and HEAD requests to it, so reads never hold
+connections or transactions of the primary. Flushes and INSERT/UPDATE/DELETE
+statements are pinned to the primary, and once a request has written, the
+rest of it reads from the primary as well so it sees its own changes.
+"""
+from flask import current_app, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+# Key of the read-only engine in ``app.extensions``
+READ_ONLY_ENGINE = 'sqlalchemy_read_only'
+
+READ_METHODS = ('GET', 'HEAD')
+
+# Session ``info`` flag keeping a request on the primary after it has written
+PINNED = 'pinned_to_primary'
+
+
+class RoutingSession(Session):
+    """Session routing the reads of GET requests to the read-only engine."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self.info.get(PINNED) and has_request_context():
+            if self._flushing or getattr(clause, 'is_dml', False):
+                self.info[PINNED] = True
+            elif request.method in READ_METHODS:
+                engine = current_app.extensions.get(READ_ONLY_ENGINE)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_only_url(app, engine):
+    """Return the URL of the read-only engine, or None when there is none."""
+    from app.utils.sqlite import sqlite_database_path
+
+    if app.config.get('DATABASE_READ_URL'):
+        return make_url(app.config['DATABASE_READ_URL'])
+
+    path = sqlite_database_path(engine)
+    if path is None:
+        return None
+    return engine.url.set(database=f'file:{path}', query={**engine.url.query, 'mode': 'ro', 'uri': 'true'})
+
+
+def init_read_only(app):
+    """Create the read-only engine of the app, if enabled and available."""
+    from app import db
+    from app.utils.sqlite import apply_profile, profile_pragmas, track_connections
+
+    if not app.config.get('READ_ONLY_ENGINE'):
+        return
+
+    with app.app_context():
+        url = read_only_url(app, db.engine)
+    if url is None:
+        return
+
+    engine = create_engine(url, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    # The journal mode is a property of the database file that only the primary can change
+    apply_profile(engine, [pragma for pragma in profile_pragmas(app.config) if 'journal_mode' not in pragma])
+    track_connections(engine)
+    app.extensions[READ_ONLY_ENGINE] = engine
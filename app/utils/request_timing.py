@@ -0,0 +1,110 @@
+"""
+Opt-in per-request SQL and serialization timing.
+
+With ``REQUEST_TIMING`` enabled, the statement observers of the app's engines
+(see ``app.utils.query_counter``) count the SQL statements of each request and
+sum the time spent executing them, and the JSON encoding of API responses is
+timed as serialization, through an encoder set in this app's ``RESTFUL_JSON``
+settings. Nothing outside the app is patched. The totals are sent in a
+``Server-Timing`` header::
+
+    Server-Timing: db;dur=3.41;desc="4 queries", ser;dur=0.82, app;dur=1.90, total;dur=6.13
+
+which browsers show in their developer tools and gunicorn writes to the
+access log (see ``gunicorn.conf.py``). ``app`` is the rest of the time spent
+in the view, including the marshmallow dumps that build the response data.
+When disabled nothing is registered, so requests pay nothing.
+"""
+import contextvars
+import json
+import time
+
+from app.utils.query_counter import observe_statements
+
+# Timings of the request being handled in the current thread or task
+_current = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """SQL statement count and time spent in the database and serializing, for one request."""
+
+    __slots__ = ('started', 'queries', 'db_time', 'serialize_time')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+
+    def server_timing(self):
+        """Return the ``Server-Timing`` header value of the timings so far."""
+        total = time.perf_counter() - self.started
+        other = max(total - self.db_time - self.serialize_time, 0.0)
+        return (
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries", '
+            f'ser;dur={self.serialize_time * 1000:.2f}, '
+            f'app;dur={other * 1000:.2f}, '
+            f'total;dur={total * 1000:.2f}'
+        )
+
+
+def current_timings():
+    """Return the timings of the current request, or None when timing is off or outside a request."""
+    return _current.get()
+
+
+def _record_statement(statement, duration):
+    timings = _current.get()
+    if timings is not None:
+        timings.queries += 1
+        timings.db_time += duration
+
+
+def timed_encoder(encoder_class=json.JSONEncoder):
+    """Return a subclass of a JSON encoder class whose encoding counts as serialization time."""
+    class TimedEncoder(encoder_class):
+        def encode(self, o):
+            timings = _current.get()
+            if timings is None:
+                return super().encode(o)
+            started = time.perf_counter()
+            try:
+                return super().encode(o)
+            finally:
+                timings.serialize_time += time.perf_counter() - started
+
+    return TimedEncoder
+
+
+def _start_request():
+    _current.set(RequestTimings())
+
+
+def _add_server_timing(response):
+    timings = _current.get()
+    if timings is not None:
+        response.headers['Server-Timing'] = timings.server_timing()
+    return response
+
+
+def _end_request(exc):
+    _current.set(None)
+
+
+def init_request_timing(app):
+    """Time the SQL and serialization of every request when ``REQUEST_TIMING`` is on."""
+    if not app.config.get('REQUEST_TIMING'):
+        return
+
+    from app.utils.pool import app_engines
+
+    for engine in app_engines(app).values():
+        observe_statements(engine, _record_statement)
+    # flask-restful encodes responses with json.dumps(data, **RESTFUL_JSON)
+    settings = dict(app.config.get('RESTFUL_JSON', {}))
+    settings['cls'] = timed_encoder(settings.get('cls', json.JSONEncoder))
+    app.config['RESTFUL_JSON'] = settings
+
+    app.before_request(_start_request)
+    app.after_request(_add_server_timing)
+    app.teardown_request(_end_request)
@@ -0,0 +1,245 @@
+"""
+SQLite connection profile, connection tracking and the bulk fast-load mode.
+
+The connection profile (journal mode, busy timeout, mmap and page cache sizes,
+temp store and foreign key enforcement) comes from the ``SQLITE_*`` config
+keys and is applied to every new connection.
+
+Every process that opens connections to a SQLite database file through the
+app holds a shared ``flock`` on ``<database>.lock`` while it has connections
+open. A fast load upgrades that lock to an exclusive one, which only succeeds
+while no other process (e.g. a gunicorn worker) has the database open.
+"""
+import fcntl
+import os
+from contextlib import contextmanager
+
+from sqlalchemy import event, text
+
+from app import db
+
+# Connection settings used while bulk loading; durability is traded for speed
+# because the load either commits completely or is simply rerun
+FAST_LOAD_PRAGMAS = (
+    'PRAGMA locking_mode=EXCLUSIVE',
+    'PRAGMA journal_mode=MEMORY',
+    'PRAGMA synchronous=OFF',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-262144',
+)
+
+# Connection lock of each database file, shared by the engines opening it
+_LOCKS = {}
+
+
+class DatabaseInUseError(RuntimeError):
+    """Raised when a fast load is attempted while other processes use the database."""
+
+
+def sqlite_database_path(engine):
+    """Return the file path of a SQLite engine, or None for other or in-memory databases."""
+    url = engine.url
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return None
+    if url.query.get('mode') == 'memory':
+        return None
+    # URI filenames, e.g. the read-only ``file:<path>?mode=ro&uri=true``
+    if url.database.startswith('file:'):
+        if not url.query.get('uri'):
+            return None
+        return os.path.abspath(url.database[len('file:'):])
+    return os.path.abspath(url.database)
+
+
+class ConnectionLock:
+    """Shared advisory lock held by this process while it has connections open."""
+
+    def __init__(self, database_path):
+        self.database_path = database_path
+        self.path = f'{database_path}.lock'
+        self.fd = None
+        self.pid = None
+        self.connections = 0
+
+    def _open(self):
+        # A forked child must not share its parent's lock
+        if self.fd is not None and self.pid != os.getpid():
+            self.fd = None
+            self.connections = 0
+        if self.fd is None:
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self.pid = os.getpid()
+            fcntl.flock(self.fd, fcntl.LOCK_SH)
+
+    def acquire(self, *args):
+        """Count a new connection, taking the shared lock for the first one."""
+        # Blocks while another process holds the lock for a fast load
+        self._open()
+        self.connections += 1
+
+    def release(self, *args):
+        """Count a closed connection, dropping the lock with the last one."""
+        if self.pid != os.getpid():
+            return
+        self.connections -= 1
+        if self.connections <= 0 and self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
+            self.connections = 0
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the lock exclusively, refusing when another process has the database open."""
+        self.acquire()
+        try:
+            try:
+                fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                fcntl.flock(self.fd, fcntl.LOCK_SH)
+                raise DatabaseInUseError(
+                    f"{self.database_path} is open in another process; "
+                    "stop the web app before running a fast load"
+                )
+            try:
+                yield
+            finally:
+                fcntl.flock(self.fd, fcntl.LOCK_SH)
+        finally:
+            self.release()
+
+
+def connection_lock(engine):
+    """Return the connection lock of a SQLite file engine, or None."""
+    return _LOCKS.get(sqlite_database_path(engine))
+
+
+def track_connections(engine):
+    """Hold the shared connection lock whenever the engine has connections open."""
+    path = sqlite_database_path(engine)
+    if path is None:
+        return
+
+    # One lock (and file descriptor) per file, as flock conflicts between descriptors
+    lock = _LOCKS.setdefault(path, ConnectionLock(path))
+    if event.contains(engine, 'connect', lock.acquire):
+        return
+    event.listen(engine, 'connect', lock.acquire)
+    event.listen(engine, 'close', lock.release)
+    event.listen(engine, 'close_detached', lock.release)
+
+
+# Accepted values of the named profile settings; SQLite silently ignores others
+PROFILE_CHOICES = {
+    'journal_mode': ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'),
+    'synchronous': ('OFF', 'NORMAL', 'FULL', 'EXTRA'),
+    'temp_store': ('DEFAULT', 'FILE', 'MEMORY'),
+}
+
+
+def profile_pragmas(config):
+    """
+    Build the PRAGMA statements of the connection profile from the app config.
+
+    Raises ValueError for a journal mode, synchronous or temp store setting
+    SQLite does not know, instead of letting every connection ignore it.
+    """
+    settings = (
+        ('journal_mode', config.get('SQLITE_JOURNAL_MODE')),
+        ('synchronous', config.get('SQLITE_SYNCHRONOUS')),
+        ('busy_timeout', config.get('SQLITE_BUSY_TIMEOUT')),
+        ('mmap_size', config.get('SQLITE_MMAP_SIZE')),
+        ('cache_size', config.get('SQLITE_CACHE_SIZE')),
+        ('temp_store', config.get('SQLITE_TEMP_STORE')),
+        ('foreign_keys', 'ON' if config.get('SQLITE_FOREIGN_KEYS') else None),
+    )
+    for name, value in settings:
+        choices = PROFILE_CHOICES.get(name)
+        if value and choices and str(value).upper() not in choices:
+            raise ValueError(f"Unknown SQLite {name} {value!r}; expected one of {', '.join(choices)}")
+    return [f'PRAGMA {name}={value}' for name, value in settings if value]
+
+
+def apply_profile(engine, pragmas):
+    """Run the profile PRAGMAs on every new connection of a SQLite engine."""
+    if engine.url.get_backend_name() != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _apply_profile(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def init_sqlite(app):
+    """Install the SQLite connection hooks on the app's engine."""
+    with app.app_context():
+        apply_profile(db.engine, profile_pragmas(app.config))
+        track_connections(db.engine)
+
+
+def _apply_fast_load_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in FAST_LOAD_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def _secondary_indexes(connection, tables):
+    """Return ``(name, sql)`` of the non-unique indexes created on ``tables``."""
+    indexes = []
+    for table in tables:
+        for _, name, unique, origin, _ in connection.execute(text(f'PRAGMA index_list("{table}")')):
+            # Unique indexes back ON CONFLICT upserts and duplicate checks, so they stay
+            if unique or origin != 'c':
+                continue
+            sql = connection.execute(
+                text("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = :name"), {'name': name}
+            ).scalar()
+            indexes.append((name, sql))
+    return indexes
+
+
+@contextmanager
+def fast_load(engine, tables):
+    """
+    Bulk-load mode for a SQLite database file.
+
+    Refuses to start while another process has the database open. For the
+    duration of the load, connections take an exclusive lock and run with an
+    in-memory journal and without fsyncs, and the non-unique indexes of
+    ``tables`` are dropped. Afterwards the indexes are rebuilt, ``ANALYZE``
+    refreshes the planner statistics and the original journal mode is restored.
+    """
+    lock = connection_lock(engine)
+    if lock is None:
+        raise ValueError("Fast loads require a SQLite database file")
+
+    with lock.exclusive():
+        # Start from fresh connections so every load connection gets the pragmas
+        db.session.remove()
+        engine.dispose()
+
+        with engine.begin() as connection:
+            journal_mode = connection.execute(text('PRAGMA journal_mode')).scalar()
+            indexes = _secondary_indexes(connection, tables)
+            for name, _ in indexes:
+                connection.execute(text(f'DROP INDEX "{name}"'))
+
+        event.listen(engine, 'connect', _apply_fast_load_pragmas)
+        try:
+            yield
+        finally:
+            event.remove(engine, 'connect', _apply_fast_load_pragmas)
+            db.session.remove()
+            engine.dispose()
+
+            # Rebuild on a connection with the normal settings
+            with engine.begin() as connection:
+                for _, sql in indexes:
+                    connection.execute(text(sql))
+                connection.execute(text('ANALYZE'))
+            with engine.connect() as connection:
+                connection.execute(text(f'PRAGMA journal_mode={journal_mode}'))
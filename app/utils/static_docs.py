@@ -0,0 +1,80 @@
+"""
+Cached serving of the static API documents (swagger.json, the docs index page
+and the Postman collection).
+
+Each document is read once and kept in memory together with a gzip-compressed
+copy and the ETags of both; it is only reloaded when the file's mtime changes.
+A reload swaps all of these in as one tuple, so a request never pairs the new
+body with the old ETag. A missing file is answered with 404 until it appears.
+Responses carry a long-lived ``Cache-Control`` and answer ``If-None-Match``
+revalidations with 304.
+"""
+import gzip
+import hashlib
+import os
+import threading
+
+from flask import Response, current_app, request
+
+from app.utils.metrics import record_cache
+
+
+class StaticDocument:
+    """A static file held in memory in plain and gzip-compressed form."""
+
+    def __init__(self, path, mimetype):
+        self.path = path
+        self.mimetype = mimetype
+        # (mtime, data, gzipped, etag, gzip_etag), replaced as a whole on reload
+        self.content = None
+        self._lock = threading.Lock()
+
+    def _load(self, mtime):
+        with open(self.path, 'rb') as file:
+            data = file.read()
+        digest = hashlib.sha256(data).hexdigest()[:20]
+        # mtime=0 keeps the compressed bytes (and so their ETag) reproducible
+        gzipped = gzip.compress(data, compresslevel=9, mtime=0)
+        self.content = (mtime, data, gzipped, digest, f'{digest}-gz')
+
+    @property
+    def mtime(self):
+        return self.content[0] if self.content else None
+
+    def refresh(self):
+        """Reload the file if it changed on disk since it was last read.
+
+        Returns the current ``(mtime, data, gzipped, etag, gzip_etag)`` tuple;
+        raises FileNotFoundError if the file does not exist.
+        """
+        mtime = os.stat(self.path).st_mtime_ns
+        content = self.content
+        if content is None or content[0] != mtime:
+            with self._lock:
+                if self.mtime != mtime:
+                    self._load(mtime)
+                content = self.content
+        return content
+
+
+def serve_document(document):
+    """Serve a static document, gzip-compressed for clients that accept it."""
+    loaded_mtime = document.mtime
+    try:
+        mtime, data, gzipped, etag, gzip_etag = document.refresh()
+    except FileNotFoundError:
+        return Response('{"error": "File not found"}', status=404, mimetype='application/json')
+    record_cache('static_docs', mtime == loaded_mtime)
+
+    if request.accept_encodings['gzip'] > 0:
+        response = Response(gzipped, mimetype=document.mimetype)
+        response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(gzip_etag)
+    else:
+        response = Response(data, mimetype=document.mimetype)
+        response.set_etag(etag)
+
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get('STATIC_DOCS_MAX_AGE', 86400)
+    return response.make_conditional(request)
@@ -0,0 +1,70 @@
+"""
+Dialect-aware ``INSERT ... ON CONFLICT`` statements for bulk upserts.
+
+PostgreSQL and SQLite upsert a batch in one statement. Other databases fall
+back to :func:`select_then_write`, which looks the keys up first and then
+issues separate update and insert batches.
+"""
+from sqlalchemy import bindparam, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+def supports_upsert(dialect_name):
+    """Check whether :func:`upsert` can build a statement for a dialect."""
+    return dialect_name in _INSERTS
+
+
+def upsert(table, index_elements, columns, dialect_name):
+    """
+    Build an insert that updates ``columns`` when ``index_elements`` conflict.
+    
+    Rows whose values are unchanged are left alone, so re-importing the same
+    data does not touch ``updated_at``. Executed with a list of parameter
+    dicts, the statement upserts the whole batch at once.
+    """
+    if not supports_upsert(dialect_name):
+        raise NotImplementedError(f"Upserts are not supported on {dialect_name}; use select_then_write")
+    
+    stmt = _INSERTS[dialect_name](table)
+    columns = [name for name in columns if name not in index_elements]
+    set_ = {name: stmt.excluded[name] for name in columns}
+    if 'updated_at' in table.c:
+        set_['updated_at'] = stmt.excluded.updated_at
+    changed = or_(*(table.c[name].is_distinct_from(stmt.excluded[name]) for name in columns))
+    return stmt.on_conflict_do_update(index_elements=index_elements, set_=set_, where=changed)
+
+
+def select_then_write(connection, table, key, columns, rows):
+    """
+    Upsert ``rows`` on the single ``key`` column without ``ON CONFLICT``.
+    
+    Stored keys are looked up with one query per batch; stored rows are
+    updated (only when a value differs, like :func:`upsert`) and the others
+    inserted. Not safe against concurrent writers inserting the same keys.
+    """
+    columns = [name for name in columns if name != key]
+    keys = [row[key] for row in rows]
+    stored = set()
+    for start in range(0, len(keys), 500):
+        stored.update(connection.execute(
+            select(table.c[key]).where(table.c[key].in_(keys[start:start + 500]))
+        ).scalars())
+    
+    updates = [
+        {**{f'b_{name}': row[name] for name in columns}, 'b_key': row[key]}
+        for row in rows if row[key] in stored
+    ]
+    inserts = [row for row in rows if row[key] not in stored]
+    if updates:
+        values = {name: bindparam(f'b_{name}') for name in columns}
+        changed = or_(*(table.c[name].is_distinct_from(bindparam(f'b_{name}')) for name in columns))
+        connection.execute(
+            update(table).where(table.c[key] == bindparam('b_key'), changed).values(values), updates
+        )
+    if inserts:
+        connection.execute(insert(table), inserts)
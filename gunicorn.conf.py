@@ -0,0 +1,69 @@
+"""
+Gunicorn settings, loaded automatically from the working directory.
+
+Each worker builds its own connection pools. With ``--preload`` the app is
+created once in the master: its caches are warmed, its connections closed and
+its heap frozen before the workers are forked, and the pools a worker inherits
+are dropped as it starts.
+
+Access log lines (written with ``--access-logfile``) end with the request
+duration and, when ``REQUEST_TIMING`` is on, the ``Server-Timing`` header with
+the request's SQL count and DB, serialization and total time.
+
+When ``PROMETHEUS_MULTIPROC_DIR`` is set, the workers write their Prometheus
+metrics to that directory so ``/metrics`` reports totals for the whole server;
+it is emptied when gunicorn starts and the live samples of exited workers are
+dropped.
+"""
+import glob
+import os
+import sys
+
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" %(M)sms "%({server-timing}o)s"'
+
+
+def _preloaded_app():
+    # With --preload the master has imported wsgi.py before forking
+    wsgi = sys.modules.get('wsgi')
+    return wsgi.app if wsgi is not None else None
+
+
+def on_starting(server):
+    """Start with an empty Prometheus multiprocess directory."""
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if not directory:
+        return
+
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, '*.db')):
+        os.remove(path)
+
+
+def when_ready(server):
+    """Prepare a preloaded app for sharing with the workers."""
+    flask_app = _preloaded_app()
+    if flask_app is None:
+        return
+
+    from app.utils.preload import prepare_for_fork
+    prepare_for_fork(flask_app)
+
+
+def post_fork(server, worker):
+    """Give the new worker fresh connection pools."""
+    flask_app = _preloaded_app()
+    if flask_app is None:
+        # The app has not been loaded yet; the worker creates its engines itself
+        return
+
+    from app.utils.pool import dispose_engines
+    dispose_engines(flask_app)
+
+
+def child_exit(server, worker):
+    """Drop the live gauge samples of an exited worker; its counters keep counting in the totals."""
+    if not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        return
+
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
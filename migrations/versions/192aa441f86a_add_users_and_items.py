@@ -0,0 +1,55 @@
+"""Add users and items
+
+Revision ID: 192aa441f86a
+Revises: 5e8c2a7f1d34
+Create Date: 2026-10-19 19:05:12.640318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '192aa441f86a'
+down_revision = '5e8c2a7f1d34'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases set up with scripts/init_database.py got these tables from
+    # create_all() rather than a migration; leave those in place
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'users' not in existing:
+        op.create_table('users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('username', sa.String(length=50), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('active', sa.Boolean(), nullable=True),
+        sa.Column('admin', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('username')
+        )
+    if 'items' not in existing:
+        op.create_table('items',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=True),
+        sa.Column('active', sa.Boolean(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('items')
+    op.drop_table('users')
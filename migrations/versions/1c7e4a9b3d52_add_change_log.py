@@ -0,0 +1,119 @@
+"""Add the change log and the triggers feeding it
+
+Revision ID: 1c7e4a9b3d52
+Revises: 0b6d2e8f4a15
+Create Date: 2026-10-19 16:40:12.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1c7e4a9b3d52'
+down_revision = '0b6d2e8f4a15'
+branch_labels = None
+depends_on = None
+
+
+# Frozen copy of app.utils.change_log as of this revision
+LOGGED_TABLES = (
+    ('companies', 'company', 'id', None),
+    ('drugs', 'drug', 'id', None),
+    ('brands', 'brand', 'id', None),
+    ('brand_drugs', 'brand_drug', 'brand_id', 'drug_id'),
+    ('adult_dosages', 'adult_dosage', 'id', None),
+    ('pediatric_dosages', 'pediatric_dosage', 'id', None),
+    ('neonatal_dosages', 'neonatal_dosage', 'id', None),
+)
+
+OPERATIONS = ('insert', 'update', 'delete')
+
+# zlib.crc32(b'pharma-api:change-log'), the CHANGE_LOG_LOCK_KEY of the app
+CHANGE_LOG_LOCK_KEY = 2177074613
+
+PG_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION log_change() RETURNS trigger AS $$
+DECLARE
+    row_data jsonb;
+BEGIN
+    PERFORM pg_advisory_xact_lock({CHANGE_LOG_LOCK_KEY});
+    IF TG_OP = 'DELETE' THEN
+        row_data := to_jsonb(OLD);
+    ELSE
+        row_data := to_jsonb(NEW);
+    END IF;
+    INSERT INTO change_log (entity, entity_id, related_id, op)
+    VALUES (
+        TG_ARGV[0],
+        (row_data ->> TG_ARGV[1])::integer,
+        CASE WHEN TG_NARGS > 2 THEN (row_data ->> TG_ARGV[2])::integer END,
+        lower(TG_OP)
+    );
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def trigger_statements(dialect_name):
+    statements = []
+    if dialect_name == 'postgresql':
+        statements.append(PG_FUNCTION)
+    elif dialect_name != 'sqlite':
+        # Other databases get the table but no feed
+        return statements
+
+    for table, entity, key, related_key in LOGGED_TABLES:
+        for operation in OPERATIONS:
+            name = f'log_{table}_{operation}'
+            if dialect_name == 'sqlite':
+                row = 'OLD' if operation == 'delete' else 'NEW'
+                related = f'{row}.{related_key}' if related_key else 'NULL'
+                statements.append(
+                    f'CREATE TRIGGER IF NOT EXISTS {name} AFTER {operation.upper()} ON {table} BEGIN '
+                    f'INSERT INTO change_log (entity, entity_id, related_id, op) '
+                    f"VALUES ('{entity}', {row}.{key}, {related}, '{operation}'); END"
+                )
+            else:
+                args = ', '.join(f"'{arg}'" for arg in (entity, key, related_key) if arg)
+                statements.append(f'DROP TRIGGER IF EXISTS {name} ON {table}')
+                statements.append(
+                    f'CREATE TRIGGER {name} AFTER {operation.upper()} ON {table} FOR EACH ROW '
+                    f'EXECUTE FUNCTION log_change({args})'
+                )
+    return statements
+
+
+def drop_statements(dialect_name):
+    on_table = dialect_name == 'postgresql'
+    statements = [
+        f'DROP TRIGGER IF EXISTS log_{table}_{operation}' + (f' ON {table}' if on_table else '')
+        for table, _, _, _ in LOGGED_TABLES for operation in OPERATIONS
+    ]
+    if on_table:
+        statements.append('DROP FUNCTION IF EXISTS log_change()')
+    return statements
+
+
+def upgrade():
+    op.create_table('change_log',
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=32), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('related_id', sa.Integer(), nullable=True),
+    sa.Column('op', sa.String(length=8), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('seq'),
+    sqlite_autoincrement=True
+    )
+    
+    # Existing rows predate the log; clients start from a full snapshot
+    for statement in trigger_statements(op.get_bind().dialect.name):
+        op.execute(statement)
+
+
+def downgrade():
+    for statement in drop_statements(op.get_bind().dialect.name):
+        op.execute(statement)
+    op.drop_table('change_log')
@@ -0,0 +1,60 @@
+"""Mark catalogs whose references still hold supplier feed IDs
+
+Revision ID: 5e8c2a7f1d34
+Revises: 1c7e4a9b3d52
+Create Date: 2026-10-19 17:20:36.418205
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8c2a7f1d34'
+down_revision = '1c7e4a9b3d52'
+branch_labels = None
+depends_on = None
+
+
+SOURCE_TABLES = ('companies', 'drugs', 'brands')
+
+# Import record read by scripts/import_data.py (LEGACY_LINKS there)
+MARKER = {'source': 'legacy', 'source_key': 'feed_id_links'}
+
+
+def upgrade():
+    # The first importer stored brand CID, relationship BID/DID and dosage CODE
+    # values as row IDs. A catalog that has rows but no source IDs yet may have
+    # been loaded by it, or built through the API; the marker only makes the
+    # importer warn, and references are re-pointed when it is run with
+    # --remap-legacy.
+    bind = op.get_bind()
+    has_rows = False
+    for table_name in SOURCE_TABLES:
+        table = sa.table(table_name, sa.column('id', sa.Integer), sa.column('source_id', sa.Integer))
+        if bind.execute(sa.select(table.c.id).where(table.c.source_id.isnot(None)).limit(1)).first():
+            return
+        has_rows = has_rows or bind.execute(sa.select(table.c.id).limit(1)).first() is not None
+    if not has_rows:
+        return
+
+    import_records = sa.table(
+        'import_records',
+        sa.column('source', sa.String),
+        sa.column('source_key', sa.String),
+        sa.column('content_hash', sa.String),
+        sa.column('imported_at', sa.DateTime),
+    )
+    bind.execute(import_records.insert().values(content_hash='', imported_at=datetime.utcnow(), **MARKER))
+
+
+def downgrade():
+    import_records = sa.table('import_records', sa.column('source', sa.String), sa.column('source_key', sa.String))
+    op.get_bind().execute(
+        import_records.delete().where(
+            import_records.c.source == MARKER['source'],
+            import_records.c.source_key == MARKER['source_key']
+        )
+    )
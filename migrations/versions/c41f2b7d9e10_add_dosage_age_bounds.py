@@ -0,0 +1,144 @@
+"""Add numeric age bounds to pediatric and neonatal dosages
+
+Revision ID: c41f2b7d9e10
+Revises: a54a2c864729
+Create Date: 2026-10-19 09:12:41.503118
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41f2b7d9e10'
+down_revision = 'a54a2c864729'
+branch_labels = None
+depends_on = None
+
+
+AGE_TABLES = {
+    'pediatric_dosages': 'pediatric',
+    'neonatal_dosages': 'neonatal',
+}
+
+# Frozen copy of app.utils.age_range as of this revision, so later changes to
+# the parser do not change what this backfill writes
+DAYS_PER_UNIT = {'day': 1, 'week': 7, 'month': 30, 'year': 365}
+POPULATION_AGE_DAYS = {
+    'neonatal': (0, 28),
+    'pediatric': (29, 18 * 365 - 1),
+}
+
+_UNIT = r'(days?|d|weeks?|wks?|months?|mos?|years?|yrs?)\b'
+_NUMBER = r'(\d+(?:\.\d+)?)'
+_RANGE_RE = re.compile(
+    _NUMBER + r'\s*' + r'(?:' + _UNIT + r')?' + r'\s*(?:-|to)\s*' + _NUMBER + r'\s*' + _UNIT,
+    re.IGNORECASE
+)
+_UPPER_RE = re.compile(r'\b(?:under|below|less than|younger than)\s+' + _NUMBER + r'\s*' + _UNIT, re.IGNORECASE)
+_LOWER_RE = re.compile(r'\b(?:over|above|older than)\s+' + _NUMBER + r'\s*' + _UNIT, re.IGNORECASE)
+_AGE_CONTEXT_RE = re.compile(r'\b(?:age|child|children|paeds?|infants?|old)\b', re.IGNORECASE)
+_NEGATION_RE = re.compile(r'\b(?:not|avoid)\b', re.IGNORECASE)
+
+
+def _unit_days(unit):
+    return DAYS_PER_UNIT[{'d': 'day', 'w': 'week', 'm': 'month'}.get(unit[0].lower(), 'year')]
+
+
+def parse_age_range(text):
+    if not text:
+        return None
+
+    match = _RANGE_RE.search(text)
+    if match:
+        low, low_unit, high, high_unit = match.groups()
+        high_days = _unit_days(high_unit)
+        if high_days == DAYS_PER_UNIT['year'] or (
+                high_days == DAYS_PER_UNIT['month'] and _AGE_CONTEXT_RE.search(text)):
+            low_days = _unit_days(low_unit or high_unit)
+            return (
+                int(float(low) * low_days),
+                int((float(high) + 1) * high_days) - 1,
+                match.group(0).strip()
+            )
+
+    match = _UPPER_RE.search(text)
+    if match:
+        value, unit = match.groups()
+        days = int(float(value) * _unit_days(unit))
+        if _NEGATION_RE.search(text):
+            return days, None, match.group(0).strip()
+        return None, max(days - 1, 0), match.group(0).strip()
+
+    match = _LOWER_RE.search(text)
+    if match:
+        value, unit = match.groups()
+        return int(float(value) * _unit_days(unit)), None, match.group(0).strip()
+
+    return None
+
+
+def resolve_age_bounds(text, population):
+    default_min, default_max = POPULATION_AGE_DAYS[population]
+    parsed = parse_age_range(text)
+    if not parsed:
+        return default_min, default_max, None
+
+    min_days, max_days, label = parsed
+    if min_days is None:
+        min_days = default_min
+    if max_days is None:
+        max_days = default_max
+        if min_days > max_days:
+            max_days = POPULATION_AGE_DAYS['pediatric'][1]
+
+    if min_days > max_days:
+        return default_min, default_max, None
+
+    return min_days, max_days, label
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    for table_name in AGE_TABLES:
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('age_min_days', sa.Integer(), nullable=True))
+            batch_op.add_column(sa.Column('age_max_days', sa.Integer(), nullable=True))
+            batch_op.create_index(f'ix_{table_name}_drug_age', ['drug_id', 'age_min_days', 'age_max_days'], unique=False)
+    # ### end Alembic commands ###
+
+    # Backfill the bounds for rows imported before the columns existed
+    bind = op.get_bind()
+    for table_name, population in AGE_TABLES.items():
+        table = sa.table(
+            table_name,
+            sa.column('id', sa.Integer),
+            sa.column('age_range', sa.String),
+            sa.column('notes', sa.Text),
+            sa.column('age_min_days', sa.Integer),
+            sa.column('age_max_days', sa.Integer),
+        )
+        rows = bind.execute(sa.select(table.c.id, table.c.age_range, table.c.notes)).fetchall()
+        for row in rows:
+            min_days, max_days, label = resolve_age_bounds(row.age_range or row.notes, population)
+            bind.execute(
+                table.update()
+                .where(table.c.id == row.id)
+                .values(
+                    age_min_days=min_days,
+                    age_max_days=max_days,
+                    age_range=row.age_range or label
+                )
+            )
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    for table_name in AGE_TABLES:
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_index(f'ix_{table_name}_drug_age')
+            batch_op.drop_column('age_max_days')
+            batch_op.drop_column('age_min_days')
+    # ### end Alembic commands ###
@@ -0,0 +1,349 @@
+#!/usr/bin/env python
+"""
+Endpoint benchmark suite on a synthetic catalog.
+
+The base catalog is ``json_data``, with the drug list and brand-drug links
+synthesized when those files are missing: one drug per dosage ``CODE`` and one
+to three drugs per brand, from a fixed random seed. For every requested scale
+N copies of it are imported into a fresh SQLite file (as ``import_data.py
+--scale`` does), timing the import. A fresh interpreter then times the list,
+detail and search endpoints of the catalog, the dosing and eligibility
+lookups, the change feed and login through the test client, recording the
+latency percentiles, response size and SQL statements per request.
+
+Results are written as JSON. Given the results of an earlier run with
+``--baseline``, the median latencies and import times are compared and the
+script exits with status 1 when any regressed by more than ``--threshold``.
+
+    python scripts/bench_api.py --scale 1 10 --output bench.json
+    python scripts/bench_api.py --scale 1 10 --baseline bench.json --threshold 0.2
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the project root directory to the Python path
+sys.path.insert(0, ROOT)
+
+BENCH_EMAIL = 'bench@example.com'
+BENCH_PASSWORD = 'bench-password'
+
+# Catalog tables with list and detail endpoints, by URL name
+CATALOG_ENDPOINTS = {
+    'companies': 'companies',
+    'drugs': 'drugs',
+    'brands': 'brands',
+    'adult-dosages': 'adult_dosages',
+    'pediatric-dosages': 'pediatric_dosages',
+    'neonatal-dosages': 'neonatal_dosages',
+}
+
+# Dosage lists that can be searched by drug
+SEARCH_ENDPOINTS = ('adult-dosages', 'pediatric-dosages', 'neonatal-dosages')
+
+# Drugs per eligibility lookup
+ELIGIBILITY_BATCH = 100
+
+DOSAGE_FILES = ('adult.json', 'Paedriatic.json', 'Neonatal.json')
+
+DRUG_CATEGORIES = (
+    'Analgesic', 'Antibiotic', 'Antihypertensive', 'Antihistamine', 'Antiviral', 'Antifungal',
+    'Anticonvulsant', 'Antidiabetic', 'Bronchodilator', 'Corticosteroid', 'Diuretic', 'Vitamin',
+)
+
+DRUG_NAME_PARTS = (
+    ('ami', 'ceph', 'flu', 'levo', 'meto', 'pred', 'salbu', 'vala', 'clari', 'dexa', 'oxy', 'rani'),
+    ('cillin', 'prazole', 'olol', 'mycin', 'tidine', 'floxacin', 'sartan', 'pril', 'statin', 'zepam'),
+)
+
+
+def load_records(path):
+    """Return the records of a JSON data file."""
+    from app.utils.json_stream import find_data_file, iter_json_file
+
+    return list(iter_json_file(find_data_file(path)))
+
+
+def generate_catalog(source_dir, target_dir, seed=0):
+    """
+    Write the base benchmark catalog into ``target_dir``.
+
+    The files of ``source_dir`` are copied; a missing ``DRUG.json`` is
+    synthesized with one drug per dosage code and a missing
+    ``BRAND_DRUG.json`` links every brand to one to three of those drugs.
+    """
+    from app.utils.json_stream import find_data_file
+
+    rng = random.Random(seed)
+    for name in os.listdir(source_dir):
+        shutil.copy(os.path.join(source_dir, name), target_dir)
+
+    if find_data_file(os.path.join(source_dir, 'DRUG.json')) is None:
+        codes = set()
+        for file_name in DOSAGE_FILES:
+            if find_data_file(os.path.join(source_dir, file_name)) is not None:
+                codes.update(record['CODE'] for record in load_records(os.path.join(source_dir, file_name))
+                             if record.get('CODE'))
+        drugs = [{
+            'ID': code,
+            'NAME': f"{rng.choice(DRUG_NAME_PARTS[0])}{rng.choice(DRUG_NAME_PARTS[1])} {code}".upper(),
+            'DESCRIPTION': 'Synthetic benchmark drug',
+            'CATEGORY': rng.choice(DRUG_CATEGORIES),
+        } for code in sorted(codes)]
+        with open(os.path.join(target_dir, 'DRUG.json'), 'w', encoding='utf-8') as file:
+            json.dump(drugs, file)
+    else:
+        drugs = load_records(os.path.join(source_dir, 'DRUG.json'))
+
+    if find_data_file(os.path.join(source_dir, 'BRAND_DRUG.json')) is None and drugs:
+        drug_ids = [drug['ID'] for drug in drugs]
+        links = []
+        for brand in load_records(os.path.join(source_dir, 'BRAND.json')):
+            for drug_id in rng.sample(drug_ids, min(len(drug_ids), rng.randint(1, 3))):
+                links.append({'BID': brand['BID'], 'DID': drug_id})
+        with open(os.path.join(target_dir, 'BRAND_DRUG.json'), 'w', encoding='utf-8') as file:
+            json.dump(links, file)
+    return target_dir
+
+
+def seed(path):
+    """Create the tables and the benchmark (admin) user in a benchmark database."""
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    from app import create_app, db
+    from app.models.user import User
+
+    app = create_app('production')
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(email=BENCH_EMAIL, username='bench', password=BENCH_PASSWORD, admin=True))
+        db.session.commit()
+
+
+def import_catalog(path, scale, data_dir, tmp_dir):
+    """Import ``scale`` copies of the catalog into the database, returning the importer's results."""
+    output = os.path.join(tmp_dir, f'import-{scale}x.json')
+    env = {**os.environ, 'DATABASE_URL': f'sqlite:///{path}', 'FLASK_ENV': 'production'}
+    env.pop('RENDER', None)
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT, 'scripts', 'import_data.py'), '--scale', str(scale),
+         '--data-dir', data_dir, '--benchmark', '--no-bundle', '--output', output],
+        cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    with open(output, encoding='utf-8') as file:
+        results = json.load(file)
+    return {
+        'seconds': results['total']['seconds'],
+        'queries': results['total']['queries'],
+        'peak_rss_mb': results['total']['peak_rss_mb'],
+    }
+
+
+def summarize(latencies):
+    """Return latency statistics in milliseconds."""
+    latencies = sorted(latency * 1000 for latency in latencies)
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=100, method='inclusive')
+        p95, p99 = percentiles[94], percentiles[98]
+    else:
+        p95 = p99 = latencies[0]
+    return {
+        'runs': len(latencies),
+        'min_ms': round(latencies[0], 3),
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p95_ms': round(p95, 3),
+        'p99_ms': round(p99, 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+    }
+
+
+def sample_ids(connection):
+    """Return the median ID of each catalog table and a drug that has dosages."""
+    from sqlalchemy import text
+
+    ids = {}
+    counts = {}
+    for name, table in CATALOG_ENDPOINTS.items():
+        counts[table] = connection.execute(text(f'SELECT COUNT(*) FROM {table}')).scalar()
+        ids[name] = connection.execute(
+            text(f'SELECT id FROM {table} ORDER BY id LIMIT 1 OFFSET :offset'), {'offset': counts[table] // 2}
+        ).scalar()
+    counts['brand_drugs'] = connection.execute(text('SELECT COUNT(*) FROM brand_drugs')).scalar()
+    drug_id = connection.execute(text(
+        'SELECT drug_id FROM pediatric_dosages WHERE drug_id IS NOT NULL '
+        'GROUP BY drug_id ORDER BY COUNT(*) DESC LIMIT 1'
+    )).scalar()
+    drug_ids = connection.execute(
+        text('SELECT id FROM drugs ORDER BY id LIMIT :limit'), {'limit': ELIGIBILITY_BATCH}
+    ).scalars().all()
+    return ids, counts, drug_id, drug_ids
+
+
+def measure(path, requests, max_seconds):
+    """Time every endpoint against a database, printing the results as JSON."""
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    from app import create_app, db
+    from app.utils.pool import app_engines
+    from app.utils.query_counter import QueryCounter
+
+    app = create_app('production')
+    with app.app_context():
+        with db.engine.connect() as connection:
+            ids, counts, drug_id, drug_ids = sample_ids(connection)
+
+    client = app.test_client()
+    response = client.post('/api/v1/login', json={'email': BENCH_EMAIL, 'password': BENCH_PASSWORD})
+    headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    endpoints = []
+    for name in CATALOG_ENDPOINTS:
+        endpoints.append((f'{name}.list', 'GET', f'/api/v1/{name}', {}))
+        endpoints.append((f'{name}.detail', 'GET', f'/api/v1/{name}/{ids[name]}', {'headers': headers}))
+    for name in SEARCH_ENDPOINTS:
+        endpoints.append((f'{name}.search', 'GET', f'/api/v1/{name}?drug_id={drug_id}', {}))
+    endpoints += [
+        ('dosing', 'GET', f'/api/v1/dosing?drug_id={drug_id}&age_days=365', {}),
+        ('eligibility', 'POST', '/api/v1/eligibility', {'json': {'drug_ids': drug_ids}}),
+        ('changes', 'GET', '/api/v1/changes?limit=1000', {}),
+        ('login', 'POST', '/api/v1/login', {'json': {'email': BENCH_EMAIL, 'password': BENCH_PASSWORD}}),
+    ]
+
+    engines = list(app_engines(app).values())
+    results = {}
+    for name, method, url, options in endpoints:
+        # One untimed request warms the caches and connection pools
+        response = client.open(url, method=method, **options)
+        status, size = response.status_code, len(response.get_data())
+
+        latencies = []
+        queries = 0
+        deadline = time.perf_counter() + max_seconds
+        while len(latencies) < requests and (not latencies or time.perf_counter() < deadline):
+            counters = [QueryCounter(engine) for engine in engines]
+            for counter in counters:
+                counter.__enter__()
+            started = time.perf_counter()
+            try:
+                client.open(url, method=method, **options).get_data()
+            finally:
+                latencies.append(time.perf_counter() - started)
+                for counter in counters:
+                    counter.__exit__(None, None, None)
+            queries = sum(counter.count for counter in counters)
+
+        results[name] = {'status': status, 'bytes': size, 'queries': queries, **summarize(latencies)}
+
+    print(json.dumps({'rows': counts, 'endpoints': results}))
+
+
+def run_scale(scale, data_dir, requests, max_seconds):
+    """Import and benchmark the catalog at one scale."""
+    with tempfile.TemporaryDirectory(prefix=f'bench-api-{scale}x-') as tmp_dir:
+        path = os.path.join(tmp_dir, 'bench.db')
+        subprocess.run([sys.executable, __file__, '--seed', path], check=True)
+        imported = import_catalog(path, scale, data_dir, tmp_dir)
+        output = subprocess.run(
+            [sys.executable, __file__, '--measure', path, '--requests', str(requests),
+             '--max-seconds', str(max_seconds)],
+            check=True, capture_output=True, text=True
+        ).stdout
+    return {'import': imported, **json.loads(output.strip().splitlines()[-1])}
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """
+    Return the regressions of ``results`` against ``baseline``.
+
+    An endpoint regresses when its median latency grew by more than
+    ``threshold`` (a fraction) and by at least ``min_delta_ms``; an import when
+    its duration grew by more than ``threshold``.
+    """
+    regressions = []
+    for scale, current in results['scales'].items():
+        previous = baseline.get('scales', {}).get(scale)
+        if previous is None:
+            continue
+
+        before, after = previous['import']['seconds'], current['import']['seconds']
+        if after > before * (1 + threshold):
+            regressions.append(f"{scale}x import: {before:.2f} s -> {after:.2f} s")
+
+        for name, stats in current['endpoints'].items():
+            old = previous['endpoints'].get(name)
+            if old is None:
+                continue
+            before, after = old['p50_ms'], stats['p50_ms']
+            if after > before * (1 + threshold) and after - before >= min_delta_ms:
+                regressions.append(f"{scale}x {name}: p50 {before:.2f} ms -> {after:.2f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the API endpoints on a synthetic catalog')
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10],
+                        help='Catalog sizes to benchmark, as multiples of the json_data files')
+    parser.add_argument('--data-dir', default=os.path.join(ROOT, 'json_data'),
+                        help='Directory holding the JSON data files of the base catalog')
+    parser.add_argument('--requests', type=int, default=50, help='Timed requests per endpoint')
+    parser.add_argument('--max-seconds', type=float, default=10.0,
+                        help='Stop timing an endpoint after this many seconds (at least one request runs)')
+    parser.add_argument('--output', metavar='PATH', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare with the results of an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Fractional slowdown against the baseline counted as a regression')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='Ignore endpoint slowdowns smaller than this, as timing noise')
+    parser.add_argument('--seed', metavar='PATH', help=argparse.SUPPRESS)
+    parser.add_argument('--measure', metavar='PATH', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+        return 0
+    if args.measure:
+        measure(args.measure, args.requests, args.max_seconds)
+        return 0
+
+    results = {
+        'created_at': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'requests': args.requests,
+        'scales': {},
+    }
+    with tempfile.TemporaryDirectory(prefix='bench-api-data-') as data_dir:
+        generate_catalog(args.data_dir, data_dir)
+        for scale in args.scale:
+            print(f"Benchmarking a {scale}x catalog...", file=sys.stderr)
+            results['scales'][str(scale)] = run_scale(scale, data_dir, args.requests, args.max_seconds)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} of the baseline.", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
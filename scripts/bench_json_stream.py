@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Memory benchmark for the streaming JSON reader used by the importer.
+
+Generates a synthetic BRAND.json-style file (1M records by default), then
+parses it in separate processes with ``json.load`` and with the incremental
+reader, reporting the time taken and the peak RSS of each.
+
+    python scripts/bench_json_stream.py --records 1000000 --compress gz
+"""
+
+import os
+import sys
+import json
+import gzip
+import lzma
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.json_stream import open_data_file, iter_json_file
+
+OPENERS = {
+    'none': lambda path: open(path, 'w', encoding='utf-8'),
+    'gz': lambda path: gzip.open(path, 'wt', encoding='utf-8'),
+    'xz': lambda path: lzma.open(path, 'wt', encoding='utf-8'),
+}
+
+
+def generate_brand_file(path, records, compress):
+    """Write a synthetic brand file without holding it in memory."""
+    with OPENERS[compress](path) as file:
+        file.write('[\n')
+        for bid in range(1, records + 1):
+            if bid > 1:
+                file.write(',\n')
+            file.write(json.dumps({'BID': bid, 'BNAME': f'BRAND {bid:07d}', 'CID': bid % 1200}))
+        file.write('\n]\n')
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MB."""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+
+def measure(mode, path):
+    """Parse the file with one strategy and print the result as JSON."""
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    if mode == 'json.load':
+        with open_data_file(path) as file:
+            count = len(json.load(file))
+    else:
+        count = sum(1 for _ in iter_json_file(path))
+    print(json.dumps({
+        'mode': mode,
+        'records': count,
+        'seconds': round(time.perf_counter() - started, 2),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'baseline_rss_mb': round(baseline, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark memory use of JSON import parsing')
+    parser.add_argument('--records', type=int, default=1000000, help='Number of synthetic brand records')
+    parser.add_argument('--compress', choices=sorted(OPENERS), default='none', help='Compression of the file')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    parser.add_argument('--measure', nargs=2, metavar=('MODE', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(*args.measure)
+        return 0
+
+    suffix = '' if args.compress == 'none' else f'.{args.compress}'
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, f'BRAND.json{suffix}')
+        generate_brand_file(path, args.records, args.compress)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+
+        results = []
+        for mode in ('json.load', 'stream'):
+            output = subprocess.run(
+                [sys.executable, __file__, '--measure', mode, path],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results.append(json.loads(output))
+
+    if args.json:
+        print(json.dumps({'file_mb': round(size_mb, 1), 'results': results}, indent=2))
+        return 0
+
+    print(f"Synthetic brand file: {args.records} records, {size_mb:.1f} MB ({args.compress})")
+    for result in results:
+        print(
+            f"{result['mode']:>10}: {result['records']} records in {result['seconds']}s, "
+            f"peak RSS {result['peak_rss_mb']} MB (interpreter baseline {result['baseline_rss_mb']} MB)"
+        )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+"""
+Mixed read/write benchmark for the SQLite connection profile.
+
+Seeds a SQLite file with synthetic companies and brands, then runs several
+worker processes against it through the app for a fixed time: most operations
+read a brand by ID, the rest update one. The run is repeated with SQLite's
+defaults (rollback journal, no mmap) and with the configured ``SQLITE_*``
+profile, reporting operations/sec and "database is locked" errors for each.
+
+    python scripts/bench_sqlite_profile.py --workers 4 --seconds 10 --write-ratio 0.1
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Environment of a run with SQLite's default settings
+DEFAULT_PROFILE = {
+    'SQLITE_JOURNAL_MODE': '',
+    'SQLITE_SYNCHRONOUS': '',
+    'SQLITE_BUSY_TIMEOUT': '',
+    'SQLITE_MMAP_SIZE': '',
+    'SQLITE_CACHE_SIZE': '',
+    'SQLITE_TEMP_STORE': '',
+    'SQLITE_FOREIGN_KEYS': 'false',
+}
+
+
+def create_app_for(path):
+    """Create the app against a benchmark database file."""
+    # The config reads DATABASE_URL on import, so set it before importing the app
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    from app import create_app
+    return create_app('production')
+
+
+def seed(path, brands):
+    """Create the tables and insert synthetic companies and brands."""
+    app = create_app_for(path)
+    from sqlalchemy import insert
+    from app import db
+    from app.models.pharmaceutical import Company, Brand
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(Company.__table__), [
+            {'name': f'COMPANY {cid}', 'source_id': cid} for cid in range(1, 1001)
+        ])
+        db.session.execute(insert(Brand.__table__), [
+            {'name': f'BRAND {bid}', 'source_id': bid, 'company_id': bid % 1000 + 1}
+            for bid in range(1, brands + 1)
+        ])
+        db.session.commit()
+
+
+def work(path, seconds, write_ratio, brands):
+    """Run reads and writes until the deadline and print the counts as JSON."""
+    app = create_app_for(path)
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from app import db
+
+    counts = {'reads': 0, 'writes': 0, 'locked': 0}
+    deadline = time.perf_counter() + seconds
+    with app.app_context():
+        while time.perf_counter() < deadline:
+            brand_id = random.randint(1, brands)
+            try:
+                if random.random() < write_ratio:
+                    db.session.execute(
+                        text('UPDATE brands SET strength = :strength WHERE id = :id'),
+                        {'strength': f'{random.randint(1, 500)} mg', 'id': brand_id}
+                    )
+                    db.session.commit()
+                    counts['writes'] += 1
+                else:
+                    db.session.execute(
+                        text('SELECT b.name, c.name FROM brands b LEFT JOIN companies c '
+                             'ON c.id = b.company_id WHERE b.id = :id'),
+                        {'id': brand_id}
+                    ).all()
+                    db.session.commit()
+                    counts['reads'] += 1
+            except OperationalError:
+                db.session.rollback()
+                counts['locked'] += 1
+    print(json.dumps(counts))
+
+
+def run(profile, env, args, tmp_dir):
+    """Seed a fresh database and run the workers with one profile."""
+    path = os.path.join(tmp_dir, f'{profile}.db')
+    env = {**os.environ, **env}
+    subprocess.run([sys.executable, __file__, '--seed', path, '--brands', str(args.brands)], check=True, env=env)
+
+    workers = [
+        subprocess.Popen(
+            [sys.executable, __file__, '--work', path, '--seconds', str(args.seconds),
+             '--write-ratio', str(args.write_ratio), '--brands', str(args.brands)],
+            stdout=subprocess.PIPE, text=True, env=env
+        )
+        for _ in range(args.workers)
+    ]
+    totals = {'reads': 0, 'writes': 0, 'locked': 0}
+    for worker in workers:
+        output, _ = worker.communicate()
+        for key, value in json.loads(output).items():
+            totals[key] += value
+
+    ops = totals['reads'] + totals['writes']
+    return {
+        'profile': profile,
+        **totals,
+        'ops_per_sec': round(ops / args.seconds),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark mixed read/write throughput of the SQLite profile')
+    parser.add_argument('--workers', type=int, default=4, help='Number of worker processes')
+    parser.add_argument('--seconds', type=float, default=10, help='Duration of each run')
+    parser.add_argument('--write-ratio', type=float, default=0.1, help='Share of operations that write')
+    parser.add_argument('--brands', type=int, default=50000, help='Number of synthetic brands')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    parser.add_argument('--seed', metavar='PATH', help=argparse.SUPPRESS)
+    parser.add_argument('--work', metavar='PATH', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed, args.brands)
+        return 0
+    if args.work:
+        work(args.work, args.seconds, args.write_ratio, args.brands)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = [
+            run('default', DEFAULT_PROFILE, args, tmp_dir),
+            run('tuned', {}, args, tmp_dir),
+        ]
+
+    if args.json:
+        print(json.dumps({'workers': args.workers, 'write_ratio': args.write_ratio, 'results': results}, indent=2))
+        return 0
+
+    print(f"{args.workers} workers, {args.write_ratio:.0%} writes, {args.seconds}s per profile")
+    for result in results:
+        print(
+            f"{result['profile']:>8}: {result['ops_per_sec']} ops/sec "
+            f"({result['reads']} reads, {result['writes']} writes, {result['locked']} locked errors)"
+        )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+"""
+Startup-time benchmark for web workers.
+
+Measures, in fresh interpreter processes, the time to import the ``app``
+package, to build the app with ``create_app`` and to answer the first and a
+second request (``GET /api/v1/companies`` against a small seeded SQLite file).
+With ``--gunicorn`` it also starts gunicorn with and without ``--preload`` and
+reports the time until the first successful response and the RSS of the
+master and workers.
+
+    python scripts/bench_startup.py --runs 5 --gunicorn
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import resource
+import statistics
+import subprocess
+import tempfile
+import urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the project root directory to the Python path
+sys.path.insert(0, ROOT)
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MB."""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+
+def seed(path):
+    """Create the tables and a few companies in a benchmark database."""
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    from app import create_app, db
+    from app.models.pharmaceutical import Company
+
+    app = create_app('production')
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([Company(name=f'COMPANY {cid}') for cid in range(1, 101)])
+        db.session.commit()
+
+
+def measure(path):
+    """Time import, app creation and the first requests, printing the result as JSON."""
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    started = time.perf_counter()
+    from app import create_app
+    imported = time.perf_counter()
+    app = create_app('production')
+    created = time.perf_counter()
+
+    client = app.test_client()
+    latencies = []
+    for _ in range(2):
+        request_started = time.perf_counter()
+        assert client.get('/api/v1/companies').status_code == 200
+        latencies.append(time.perf_counter() - request_started)
+
+    print(json.dumps({
+        'import_ms': round((imported - started) * 1000, 1),
+        'create_app_ms': round((created - imported) * 1000, 1),
+        'first_request_ms': round(latencies[0] * 1000, 1),
+        'second_request_ms': round(latencies[1] * 1000, 1),
+        'alembic_imported': 'alembic' in sys.modules,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }))
+
+
+def free_port():
+    """Return a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def process_rss_mb(pid):
+    """Return the current RSS of a process in MB, from /proc (Linux only)."""
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def child_pids(pid):
+    """Return the IDs of the child processes of a process (Linux only)."""
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as children:
+            return [int(child) for child in children.read().split()]
+    except OSError:
+        return []
+
+
+def run_gunicorn(path, preload, workers, timeout=60):
+    """Start gunicorn and time it until the first successful response."""
+    port = free_port()
+    command = [sys.executable, '-m', 'gunicorn', '-w', str(workers), '-b', f'127.0.0.1:{port}']
+    if preload:
+        command.append('--preload')
+    command.append('wsgi:app')
+
+    env = {**os.environ, 'DATABASE_URL': f'sqlite:///{path}', 'FLASK_ENV': 'production'}
+    env.pop('RENDER', None)
+    started = time.perf_counter()
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/v1/companies', timeout=5) as response:
+                    if response.status == 200:
+                        break
+            except OSError:
+                time.sleep(0.02)
+        else:
+            raise RuntimeError('gunicorn did not answer in time')
+        ready = time.perf_counter() - started
+
+        # Let every worker finish booting before sampling memory
+        time.sleep(1)
+        workers_rss = [process_rss_mb(pid) for pid in child_pids(server.pid)]
+        return {
+            'preload': preload,
+            'first_response_ms': round(ready * 1000, 1),
+            'master_rss_mb': round(process_rss_mb(server.pid) or 0, 1),
+            'worker_rss_mb': [round(rss, 1) for rss in workers_rss if rss is not None],
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark import, app creation and first-request latency')
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh processes to measure')
+    parser.add_argument('--gunicorn', action='store_true', help='Also time gunicorn boots with and without --preload')
+    parser.add_argument('--workers', type=int, default=2, help='Gunicorn workers')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    parser.add_argument('--seed', metavar='PATH', help=argparse.SUPPRESS)
+    parser.add_argument('--measure', metavar='PATH', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+        return 0
+    if args.measure:
+        measure(args.measure)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'startup.db')
+        subprocess.run([sys.executable, __file__, '--seed', path], check=True)
+
+        runs = []
+        for _ in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, __file__, '--measure', path], check=True, capture_output=True, text=True
+            ).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+
+        keys = ('import_ms', 'create_app_ms', 'first_request_ms', 'second_request_ms', 'peak_rss_mb')
+        results = {
+            'runs': args.runs,
+            'median': {key: statistics.median(run[key] for run in runs) for key in keys},
+            'alembic_imported': any(run['alembic_imported'] for run in runs),
+        }
+        if args.gunicorn:
+            results['gunicorn'] = [run_gunicorn(path, preload, args.workers) for preload in (False, True)]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    median = results['median']
+    print(f"Median of {args.runs} cold starts:")
+    print(f"  import app:     {median['import_ms']} ms")
+    print(f"  create_app:     {median['create_app_ms']} ms")
+    print(f"  first request:  {median['first_request_ms']} ms")
+    print(f"  second request: {median['second_request_ms']} ms")
+    print(f"  peak RSS:       {median['peak_rss_mb']} MB (Alembic imported: {results['alembic_imported']})")
+    for run in results.get('gunicorn', []):
+        mode = 'with --preload' if run['preload'] else 'without --preload'
+        print(
+            f"  gunicorn {mode}: first response after {run['first_response_ms']} ms, "
+            f"master {run['master_rss_mb']} MB, workers {run['worker_rss_mb']} MB"
+        )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
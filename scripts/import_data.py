@@ -7,14 +7,37 @@ Run this script after creating the database tables with Flask-Migrate.
 import os
 import sys
 import json
+import time
+import argparse
+import resource
+import tempfile
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+from functools import partial
+from itertools import chain
 from pathlib import Path
 import logging
 
+from sqlalchemy import bindparam, delete, insert, select, update
+
 # Add the project root directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app import create_app, db
-from app.models.pharmaceutical import Company, Drug, Brand, AdultDosage, PediatricDosage, NeonatalDosage
+from app.models.pharmaceutical import (
+    Company, Drug, Brand, AdultDosage, PediatricDosage, NeonatalDosage, brand_drugs
+)
+from app.models.import_record import ImportRecord
+from app.utils.age_range import resolve_age_bounds
+from app.utils.bundle import build_bundle
+from app.utils.eligibility import refresh_eligibility
+from app.utils.hashing import content_hash, dosage_content_hash
+from app.utils.json_stream import find_data_file, iter_json_file
+from app.utils.query_counter import QueryCounter
+from app.utils.sqlite import fast_load
+from app.utils.upsert import select_then_write, supports_upsert, upsert
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -23,18 +46,46 @@ logger = logging.getLogger(__name__)
 # Path to JSON data files
 JSON_DATA_DIR = Path('json_data')
 
+# Rows per executemany batch for bulk inserts
+BATCH_SIZE = 5000
+
+# Import record left by the migration on a catalog loaded before source IDs
+# were stored, whose references still hold feed IDs
+LEGACY_LINKS = ('legacy', 'feed_id_links')
+
+# Records per chunk handed to a normalization worker
+CHUNK_RECORDS = 2000
+
+# Dosage model columns and the JSON keys they are imported from
+DOSAGE_FIELDS = {
+    'dosage': 'DOSE',
+    'frequency': 'FREQ',
+    'route': 'ROUTE',
+    'notes': 'INSTRUCTION',
+}
+
 # Create Flask application context
 app = create_app(os.getenv('FLASK_ENV', 'default'))
 
 
 def load_json_data(file_path):
-    """Load data from a JSON file."""
+    """
+    Yield the records of a JSON array file one at a time.
+    
+    ``.json.gz``/``.json.xz`` variants are used when the plain file is absent.
+    A missing file yields nothing; a malformed file raises so the import
+    transaction is rolled back instead of committing a partial table.
+    """
+    path = find_data_file(file_path)
+    if path is None:
+        logger.error(f"Error loading JSON file {file_path}: file not found")
+        return
+    
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return json.load(file)
-    except Exception as e:
-        logger.error(f"Error loading JSON file {file_path}: {e}")
-        return []
+        yield from iter_json_file(path)
+    except ValueError as e:
+        logger.error(f"Error loading JSON file {path}: {e}")
+        raise
 
 
 def clean_text(text):
@@ -49,422 +100,1344 @@ def clean_text(text):
     return text
 
 
-def import_companies():
-    """Import company data from COMPANY.json."""
-    logger.info("Importing companies...")
-    file_path = JSON_DATA_DIR / 'COMPANY.json'
-    companies_data = load_json_data(file_path)
+class BulkInserter:
+    """Collect row dicts and insert them with Core executemany batches."""
     
-    count = 0
-    skipped = 0
+    def __init__(self, table, batch_size=BATCH_SIZE):
+        self.table = table
+        self.batch_size = batch_size
+        self.rows = []
+        self.count = 0
     
-    for company_data in companies_data:
-        try:
-            # Get values with proper casing and cleaning
-            name = clean_text(company_data.get('NAME') or company_data.get('name'))
-            code = clean_text(company_data.get('CODE') or company_data.get('code'))
-            address = clean_text(company_data.get('ADDRESS') or company_data.get('address'))
-            country = clean_text(company_data.get('COUNTRY') or company_data.get('country'))
-            
-            # Skip the first entry if it's a placeholder
-            if name == "Unknown" and company_data.get('ID', company_data.get('id')) == 0:
-                logger.info("Skipping placeholder company with ID 0")
-                continue
-            
-            # Check if company already exists
-            company = Company.query.filter_by(name=name).first()
-            if company:
-                skipped += 1
-                continue
-            
-            # Create new company
-            company = Company(
-                name=name,
-                code=code,
-                address=address,
-                country=country
-            )
-            db.session.add(company)
-            count += 1
-            
-            # Commit every 100 records to avoid memory issues
-            if count % 100 == 0:
-                db.session.commit()
-                logger.info(f"Imported {count} companies so far...")
-        except Exception as e:
-            logger.error(f"Error importing company {name}: {e}")
-            # Roll back the session in case of error to avoid transaction issues
-            db.session.rollback()
+    def add(self, row):
+        """Queue a row, writing the batch once it is full."""
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
     
-    # Final commit
-    try:
-        db.session.commit()
-    except Exception as e:
-        logger.error(f"Error committing companies: {e}")
-        db.session.rollback()
+    def flush(self):
+        """Write the queued rows."""
+        if self.rows:
+            db.session.execute(insert(self.table), self.rows)
+            self.count += len(self.rows)
+            self.rows = []
+
+
+def log_import_rate(label, count, stored, started):
+    """Log the number of imported rows and the insert throughput."""
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed > 0 else 0
+    logger.info(
+        f"Imported {count} {label}, {stored} already stored "
+        f"in {elapsed:.2f}s ({rate:.0f} rows/sec)."
+    )
+
+
+def clean_optional(text):
+    """Clean text data, mapping placeholders to None."""
+    text = clean_text(text)
+    return text if text != "Unknown" else None
+
+
+# Normalizers turn one source record into a row (or None when it is unusable).
+# They are pure functions so the pipeline mode can run them in worker processes.
+
+def normalize_company(company_data):
+    """Map a COMPANY.json record to a companies row."""
+    # Get values with proper casing and cleaning
+    name = clean_text(company_data.get('NAME') or company_data.get('name'))
+    source_id = company_data.get('ID', company_data.get('id'))
+    
+    # Skip placeholder entries without a name
+    if name == "Unknown" or source_id is None:
+        return None
     
-    logger.info(f"Imported {count} companies, skipped {skipped} existing records.")
+    return {
+        'source_id': source_id,
+        'name': name,
+        'code': clean_text(company_data.get('CODE') or company_data.get('code')),
+        'address': clean_text(company_data.get('ADDRESS') or company_data.get('address')),
+        'country': clean_text(company_data.get('COUNTRY') or company_data.get('country'))
+    }
 
 
-def import_drugs():
-    """Import drug data from DRUG.json."""
-    logger.info("Importing drugs...")
-    file_path = JSON_DATA_DIR / 'DRUG.json'
-    drugs_data = load_json_data(file_path)
+def normalize_drug(drug_data):
+    """Map a DRUG.json record to a drugs row."""
+    name = clean_text(drug_data.get('NAME') or drug_data.get('name'))
+    source_id = drug_data.get('ID', drug_data.get('id'))
+    if name == "Unknown" or source_id is None:
+        return None
     
-    count = 0
-    skipped = 0
+    return {
+        'source_id': source_id,
+        'name': name,
+        'description': clean_text(drug_data.get('DESCRIPTION') or drug_data.get('description')),
+        'category': clean_text(drug_data.get('CATEGORY') or drug_data.get('category'))
+    }
+
+
+def normalize_brand(brand_data):
+    """Map a BRAND.json record to a brands row keyed by the company's source ID."""
+    name = clean_text(brand_data.get('BNAME') or brand_data.get('bname'))
+    source_id = brand_data.get('BID', brand_data.get('bid'))
+    if name == "Unknown" or source_id is None:
+        return None
     
-    for drug_data in drugs_data:
-        try:
-            # Get values with proper casing and cleaning
-            name = clean_text(drug_data.get('NAME') or drug_data.get('name'))
-            description = clean_text(drug_data.get('DESCRIPTION') or drug_data.get('description'))
-            category = clean_text(drug_data.get('CATEGORY') or drug_data.get('category'))
-            
-            # Skip if name is missing or a placeholder
-            if name == "Unknown":
-                skipped += 1
-                continue
-            
-            # Check if drug already exists
-            drug = Drug.query.filter_by(name=name).first()
-            if drug:
-                skipped += 1
-                continue
-            
-            # Create new drug
-            drug = Drug(
-                name=name,
-                description=description,
-                category=category
-            )
-            db.session.add(drug)
-            count += 1
-            
-            # Commit every 100 records to avoid memory issues
-            if count % 100 == 0:
-                db.session.commit()
-                logger.info(f"Imported {count} drugs so far...")
-        except Exception as e:
-            logger.error(f"Error importing drug {name}: {e}")
-            db.session.rollback()
+    return {
+        'source_id': source_id,
+        'name': name,
+        'company_source_id': brand_data.get('CID', brand_data.get('cid'))
+    }
+
+
+def normalize_brand_drug(rel):
+    """Map a BRAND_DRUG.json record to a (BID, DID) source ID pair."""
+    bid = rel.get('BID')
+    did = rel.get('DID')
+    if not bid or not did:
+        return None
+    return bid, did
+
+
+def normalize_dosage(population, dosage_data):
+    """Map a dosage record to a dosage row keyed by the drug's source ID."""
+    # Get the drug's source ID from the CODE field
+    code = dosage_data.get('CODE')
+    if not code:
+        return None
     
-    # Final commit
-    try:
-        db.session.commit()
-    except Exception as e:
-        logger.error(f"Error committing drugs: {e}")
-        db.session.rollback()
+    row = {'drug_source_id': code}
+    for column, key in DOSAGE_FIELDS.items():
+        row[column] = clean_optional(dosage_data.get(key) or dosage_data.get(key.lower()))
     
-    logger.info(f"Imported {count} drugs, skipped {skipped} existing records.")
+    # Identifies the record within the feed; the stored hash uses the drug's row ID
+    row['content_hash'] = dosage_content_hash(
+        code, row['dosage'], row['frequency'], row['route'], row['notes']
+    )
+    
+    # Core inserts bypass the model events, so derive the age bounds here
+    if population != 'adult':
+        row['age_min_days'], row['age_max_days'], row['age_range'] = resolve_age_bounds(
+            row['notes'], population
+        )
+    
+    return row
 
 
-def import_brands():
-    """Import brand data from BRAND.json."""
-    logger.info("Importing brands...")
-    file_path = JSON_DATA_DIR / 'BRAND.json'
-    brands_data = load_json_data(file_path)
+class SourceKeys(dict):
+    """Source ID to row ID mapping per model, loaded with one query on first use."""
     
-    count = 0
-    skipped = 0
+    def __missing__(self, model):
+        query = select(model.source_id, model.id).where(model.source_id.isnot(None))
+        keys = self[model] = {source_id: row_id for source_id, row_id in db.session.execute(query)}
+        return keys
+
+
+class SourceUpserter(BulkInserter):
+    """Upsert row dicts on their source ID with ``INSERT ... ON CONFLICT`` batches."""
     
-    for brand_data in brands_data:
-        try:
-            # Get values with proper casing and cleaning
-            name = clean_text(brand_data.get('BNAME') or brand_data.get('bname'))
-            brand_id = brand_data.get('BID', brand_data.get('bid'))
-            company_id = brand_data.get('CID', brand_data.get('cid'))
-            
-            # Skip if name is missing or a placeholder
-            if name == "Unknown":
-                skipped += 1
-                continue
-            
-            # Check if brand already exists
-            brand = Brand.query.filter_by(name=name).first()
-            if brand:
-                skipped += 1
-                continue
-            
-            # Create new brand
-            brand = Brand(
-                name=name,
-                company_id=company_id
+    def __init__(self, table, columns, batch_size=BATCH_SIZE):
+        super().__init__(table, batch_size)
+        self.columns = columns
+        dialect_name = db.session.get_bind().dialect.name
+        # Databases without ON CONFLICT look the source IDs up before writing
+        self.stmt = upsert(table, ['source_id'], columns, dialect_name) if supports_upsert(dialect_name) else None
+        self.adopted = []
+    
+    def adopt(self, row_id, source_id):
+        """Attach a source ID to a row stored before source IDs were kept."""
+        self.adopted.append({'b_id': row_id, 'b_source_id': source_id})
+    
+    def flush(self):
+        """Attach pending source IDs, then upsert the queued rows."""
+        if self.adopted:
+            table = self.table
+            db.session.execute(
+                update(table).where(table.c.id == bindparam('b_id')).values(source_id=bindparam('b_source_id')),
+                self.adopted
             )
-            
-            db.session.add(brand)
-            count += 1
-            
-            # Commit every 100 records to avoid memory issues
-            if count % 100 == 0:
-                db.session.commit()
-                logger.info(f"Imported {count} brands so far...")
-        except Exception as e:
-            logger.error(f"Error importing brand {name}: {e}")
-            db.session.rollback()
+            self.adopted = []
+        if self.rows:
+            if self.stmt is not None:
+                db.session.execute(self.stmt, self.rows)
+            else:
+                select_then_write(db.session, self.table, 'source_id', self.columns, self.rows)
+            self.count += len(self.rows)
+            self.rows = []
+
+
+# Writers consume normalized rows in dependency order and return (imported, already stored).
+
+def import_sourced_rows(model, rows, label, source_keys, unique_names=False):
+    """Upsert companies, drugs or brands on their source ID."""
+    table = model.__table__
+    existing = source_keys[model]
     
-    # Final commit
-    try:
-        db.session.commit()
-    except Exception as e:
-        logger.error(f"Error committing brands: {e}")
-        db.session.rollback()
+    # Rows loaded before source IDs were stored are adopted by name
+    unsourced = {}
+    for row_id, name in db.session.execute(select(table.c.id, table.c.name).where(table.c.source_id.is_(None))):
+        unsourced.setdefault(name, row_id)
+    
+    # Names that must stay unique map duplicates onto the first source ID
+    owners = {}
+    if unique_names:
+        owners = {name: source_id for name, source_id in db.session.execute(
+            select(table.c.name, table.c.source_id).where(table.c.source_id.isnot(None))
+        )}
+    
+    writer = None
+    seen = set()
+    aliases = {}
+    stored = 0
+    invalid = 0
     
-    logger.info(f"Imported {count} brands, skipped {skipped} existing records.")
+    for row in rows:
+        if row is None:
+            invalid += 1
+            continue
+        
+        # Keep the first record of a source ID repeated within the file
+        source_id = row['source_id']
+        if source_id in seen:
+            continue
+        seen.add(source_id)
+        
+        if unique_names:
+            owner = owners.setdefault(row['name'], source_id)
+            if owner != source_id:
+                aliases[source_id] = owner
+                continue
+        
+        if writer is None:
+            writer = SourceUpserter(table, list(row))
+        if source_id in existing:
+            stored += 1
+        elif row['name'] in unsourced:
+            writer.adopt(unsourced.pop(row['name']), source_id)
+            stored += 1
+        
+        writer.add(row)
+    
+    if writer is not None:
+        writer.flush()
+    
+    # Reload the mapping once so later steps resolve references without lookups
+    del source_keys[model]
+    keys = source_keys[model]
+    for source_id, owner in aliases.items():
+        if owner in keys:
+            keys[source_id] = keys[owner]
+    
+    if invalid:
+        logger.info(f"Skipped {invalid} {label} records without a usable name or ID.")
+    if aliases:
+        logger.info(f"Mapped {len(aliases)} {label} sharing a name onto the first record with that name.")
+    return len(seen) - len(aliases) - stored, stored
+
 
+def import_companies(rows, source_keys):
+    """Import company rows from COMPANY.json."""
+    return import_sourced_rows(Company, rows, "companies", source_keys, unique_names=True)
 
-def import_brand_drug_relationships():
+
+def import_drugs(rows, source_keys):
+    """Import drug rows from DRUG.json."""
+    return import_sourced_rows(Drug, rows, "drugs", source_keys)
+
+
+def resolve_brand_companies(rows, source_keys):
+    """Replace the company source ID of brand rows with the company's row ID."""
+    companies = source_keys[Company]
+    for row in rows:
+        if row is not None:
+            row['company_id'] = companies.get(row.pop('company_source_id'))
+        yield row
+
+
+def import_brands(rows, source_keys):
+    """Import brand rows from BRAND.json."""
+    return import_sourced_rows(Brand, resolve_brand_companies(rows, source_keys), "brands", source_keys)
+
+
+def import_brand_drug_relationships(pairs_data, source_keys):
     """Import brand-drug relationships from BRAND_DRUG.json."""
-    logger.info("Importing brand-drug relationships...")
-    file_path = JSON_DATA_DIR / 'BRAND_DRUG.json'
-    relationship_data = load_json_data(file_path)
+    # Map source IDs and load the stored pairs once instead of per relationship
+    brand_keys = source_keys[Brand]
+    drug_keys = source_keys[Drug]
+    existing = {
+        tuple(row) for row in db.session.execute(select(brand_drugs.c.brand_id, brand_drugs.c.drug_id))
+    }
+    
+    pairs = set()
+    orphaned = set()
+    invalid = 0
+    
+    for pair in pairs_data:
+        if pair is None:
+            invalid += 1
+            continue
+        
+        bid, did = pair
+        if bid in brand_keys and did in drug_keys:
+            pairs.add((brand_keys[bid], drug_keys[did]))
+        else:
+            orphaned.add(pair)
     
-    count = 0
+    # Only pairs that are not associated yet need to be written
+    new_pairs = sorted(pairs - existing)
+    writer = BulkInserter(brand_drugs)
+    for bid, did in new_pairs:
+        writer.add({'brand_id': bid, 'drug_id': did})
+    writer.flush()
+    
+    if invalid:
+        logger.info(f"Skipped {invalid} brand-drug relationships without a BID or DID.")
+    if orphaned:
+        logger.info(f"Skipped {len(orphaned)} orphaned brand-drug pairs referencing unknown brands or drugs.")
+    return len(new_pairs), len(pairs) - len(new_pairs)
+
+
+def resolve_dosage_drug(row, drug_keys):
+    """Point a dosage row at the drug's row ID, or return None for unknown drugs."""
+    drug_id = drug_keys.get(row.pop('drug_source_id'))
+    if drug_id is None:
+        return None
+    
+    row['drug_id'] = drug_id
+    row['content_hash'] = dosage_content_hash(
+        drug_id, row['dosage'], row['frequency'], row['route'], row['notes']
+    )
+    return row
+
+
+def import_dosages(model, rows, label, source_keys):
+    """Import dosage rows for one population, skipping content already stored."""
+    table = model.__table__
+    
+    # Preload the drug mapping and the content hashes of stored dosages once
+    drug_keys = source_keys[Drug]
+    existing = set(db.session.execute(
+        select(table.c.content_hash).where(table.c.content_hash.isnot(None))
+    ).scalars())
+    writer = BulkInserter(table)
     skipped = 0
+    missing_drug = 0
     
-    for rel in relationship_data:
+    for row in rows:
+        if row is not None:
+            row = resolve_dosage_drug(row, drug_keys)
+        if row is None:
+            missing_drug += 1
+            continue
+        
+        # Skip content that is already stored or repeated within the file
+        if row['content_hash'] in existing:
+            skipped += 1
+            continue
+        existing.add(row['content_hash'])
+        
+        writer.add(row)
+    
+    writer.flush()
+    if missing_drug:
+        logger.info(f"Skipped {missing_drug} {label} without a matching drug.")
+    return writer.count, skipped
+
+
+def import_adult_dosages(rows, source_keys):
+    """Import adult dosage rows from adult.json."""
+    return import_dosages(AdultDosage, rows, "adult dosages", source_keys)
+
+
+def import_pediatric_dosages(rows, source_keys):
+    """Import pediatric dosage rows from Paedriatic.json."""
+    return import_dosages(PediatricDosage, rows, "pediatric dosages", source_keys)
+
+
+def import_neonatal_dosages(rows, source_keys):
+    """Import neonatal dosage rows from Neonatal.json."""
+    return import_dosages(NeonatalDosage, rows, "neonatal dosages", source_keys)
+
+
+ImportStep = namedtuple('ImportStep', ['label', 'file_name', 'normalize', 'write'])
+
+# Catalog steps in dependency order; they are committed as one transaction
+CATALOG_STEPS = [
+    ImportStep("companies", 'COMPANY.json', normalize_company, import_companies),
+    ImportStep("drugs", 'DRUG.json', normalize_drug, import_drugs),
+    ImportStep("brands", 'BRAND.json', normalize_brand, import_brands),
+    ImportStep("brand-drug relationships", 'BRAND_DRUG.json', normalize_brand_drug,
+               import_brand_drug_relationships),
+]
+
+# Dosage steps, committed together with the rebuilt eligibility flags
+DOSAGE_STEPS = [
+    ImportStep("adult dosages", 'adult.json', partial(normalize_dosage, 'adult'), import_adult_dosages),
+    ImportStep("pediatric dosages", 'Paedriatic.json', partial(normalize_dosage, 'pediatric'),
+               import_pediatric_dosages),
+    ImportStep("neonatal dosages", 'Neonatal.json', partial(normalize_dosage, 'neonatal'),
+               import_neonatal_dosages),
+]
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process and its workers in MB."""
+    usage = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+
+# Source ID fields of each file, offset per copy when scaling a dataset
+SOURCE_ID_FIELDS = {
+    'COMPANY.json': ('ID',),
+    'DRUG.json': ('ID',),
+    'BRAND.json': ('BID', 'CID'),
+    'BRAND_DRUG.json': ('BID', 'DID'),
+    'adult.json': ('CODE',),
+    'Paedriatic.json': ('CODE',),
+    'Neonatal.json': ('CODE',),
+}
+
+# Name fields made unique per copy when scaling a dataset
+NAME_FIELDS = ('NAME', 'BNAME')
+
+# Gap between the source IDs of consecutive copies of a scaled dataset
+SCALE_ID_OFFSET = 1000000
+
+
+def generate_scaled_dataset(source_dir, target_dir, scale):
+    """
+    Write ``scale`` copies of every data file into ``target_dir``.
+    
+    Each copy shifts its source IDs by ``SCALE_ID_OFFSET`` and suffixes names,
+    so the copies import as distinct records with intact references.
+    """
+    for file_name, id_fields in SOURCE_ID_FIELDS.items():
+        if find_data_file(Path(source_dir) / file_name) is None:
+            continue
+        
+        with open(Path(target_dir) / file_name, 'w', encoding='utf-8') as file:
+            file.write('[\n')
+            first = True
+            for copy in range(scale):
+                for record in load_json_data(Path(source_dir) / file_name):
+                    if copy:
+                        record = dict(record)
+                        for field in id_fields:
+                            if isinstance(record.get(field), int) and record[field]:
+                                record[field] += copy * SCALE_ID_OFFSET
+                        for field in NAME_FIELDS:
+                            if isinstance(record.get(field), str) and record[field].strip():
+                                record[field] = f"{record[field]} #{copy}"
+                    if not first:
+                        file.write(',\n')
+                    file.write(json.dumps(record))
+                    first = False
+            file.write('\n]\n')
+    return Path(target_dir)
+
+
+class StageStats:
+    """Records processed and time spent per import stage for one table."""
+    
+    def __init__(self):
+        self.records = 0
+        self.rows = 0
+        self.parse = 0.0
+        self.normalize = 0.0
+        self.write = 0.0
+        self.queries = 0
+        self.peak_rss_mb = 0.0
+    
+    def as_dict(self):
+        """Return the stage timings as JSON-serializable benchmark results."""
+        return {
+            'records': self.records,
+            'rows': self.rows,
+            'parse_seconds': round(self.parse, 4),
+            'normalize_seconds': round(self.normalize, 4),
+            'write_seconds': round(self.write, 4),
+            'rows_per_sec': round(self.rows / self.write) if self.write > 0 else None,
+            'queries': self.queries,
+            'peak_rss_mb': round(self.peak_rss_mb, 1),
+        }
+    
+    def log(self, label):
+        """Log the throughput of every stage."""
+        def rate(count, seconds):
+            return f"{count / seconds:.0f}/s" if seconds > 0 else "n/a"
+        
+        logger.info(
+            f"{label}: {self.records} records | "
+            f"parse {self.parse:.2f}s ({rate(self.records, self.parse)}) | "
+            f"normalize {self.normalize:.2f}s ({rate(self.records, self.normalize)}) | "
+            f"write {self.write:.2f}s ({self.rows} rows, {rate(self.rows, self.write)}) | "
+            f"{self.queries} queries"
+        )
+
+
+def timed(iterable, stats, stage):
+    """Yield from an iterable, adding the time spent producing items to a stage."""
+    iterator = iter(iterable)
+    while True:
+        started = time.perf_counter()
         try:
-            # Extract the relationship IDs
-            bid = rel.get('BID')
-            did = rel.get('DID')
-            
-            if not bid or not did:
-                skipped += 1
-                continue
-            
-            # Find the brand and drug
-            brand = Brand.query.get(bid)
-            drug = Drug.query.get(did)
-            
-            if not brand or not drug:
-                skipped += 1
-                continue
-            
-            # Add drug to brand if not already associated
-            if drug not in brand.drugs:
-                brand.drugs.append(drug)
-                count += 1
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            setattr(stats, stage, getattr(stats, stage) + time.perf_counter() - started)
+        yield item
+
+
+def read_records(step, stats, data_dir=JSON_DATA_DIR):
+    """Stream the source records of a step, counting records and parse time."""
+    for record in timed(load_json_data(Path(data_dir) / step.file_name), stats, 'parse'):
+        stats.records += 1
+        yield record
+
+
+def iter_chunks(records, size):
+    """Group records into lists of at most ``size`` items."""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def normalize_chunk(normalize, records):
+    """Normalize a chunk of records in a worker process."""
+    started = time.perf_counter()
+    rows = [normalize(record) for record in records]
+    return rows, time.perf_counter() - started
+
+
+class NormalizationPipeline:
+    """
+    Normalize every import file in a process pool, in dependency order.
+    
+    This process streams the files and hands out chunks of records, keeping at
+    most ``window`` chunks in flight, so files are normalized concurrently
+    while the single writer consumes the results of each step in order.
+    """
+    
+    def __init__(self, pool, steps, stats, window, data_dir=JSON_DATA_DIR):
+        self.pool = pool
+        self.stats = stats
+        self.window = window
+        self.pending = deque()
+        self.submissions = self._submit(steps, data_dir)
+        self._fill()
+    
+    def _submit(self, steps, data_dir):
+        for step in steps:
+            records = read_records(step, self.stats[step.label], data_dir)
+            for chunk in iter_chunks(records, CHUNK_RECORDS):
+                yield step.label, self.pool.submit(normalize_chunk, step.normalize, chunk)
+    
+    def _fill(self):
+        while len(self.pending) < self.window:
+            submission = next(self.submissions, None)
+            if submission is None:
+                return
+            self.pending.append(submission)
+    
+    def rows(self, label):
+        """Yield the normalized rows of one step as the workers finish them."""
+        stats = self.stats[label]
+        while True:
+            self._fill()
+            if not self.pending or self.pending[0][0] != label:
+                return
+            _, future = self.pending.popleft()
+            rows, seconds = future.result()
+            stats.normalize += seconds
+            yield from rows
+
+
+def run_step(step, rows, stats, source_keys):
+    """Write the rows of one step, logging its write throughput."""
+    logger.info(f"Importing {step.label}...")
+    started = time.perf_counter()
+    # Time spent waiting for rows belongs to the parse/normalize stages
+    waited = StageStats()
+    count, stored = step.write(timed(rows, waited, 'write'), source_keys)
+    log_import_rate(step.label, count, stored, started)
+    stats.rows = count
+    stats.write = time.perf_counter() - started - waited.write
+    return waited.write
+
+
+def run_steps(steps, stats, source_keys, pipeline=None, data_dir=JSON_DATA_DIR):
+    """Run import steps sequentially, or fed by a normalization pipeline."""
+    for step in steps:
+        step_stats = stats[step.label]
+        with QueryCounter(db.engine) as queries:
+            if pipeline is not None:
+                run_step(step, pipeline.rows(step.label), step_stats, source_keys)
             else:
-                skipped += 1
-            
-            # Commit every 100 records to avoid memory issues
-            if count % 100 == 0:
-                db.session.commit()
-                logger.info(f"Imported {count} brand-drug relationships so far...")
-        except Exception as e:
-            logger.error(f"Error importing relationship for BID:{bid} - DID:{did}: {e}")
-            db.session.rollback()
+                rows = (step.normalize(record) for record in read_records(step, step_stats, data_dir))
+                waited = run_step(step, rows, step_stats, source_keys)
+                step_stats.normalize = waited - step_stats.parse
+        step_stats.queries = queries.count
+        step_stats.peak_rss_mb = peak_rss_mb()
+
+
+def rebuild_drug_eligibility(commit=True):
+    """
+    Rebuild the per-drug eligibility flags from the imported dosages.
     
-    # Final commit
-    try:
+    With ``commit`` the flags are committed together with the dosages written
+    before them. Errors propagate so the caller rolls back and fails the run.
+    """
+    logger.info("Rebuilding drug eligibility flags...")
+    
+    flags = refresh_eligibility(db.session.connection())
+    if commit:
         db.session.commit()
-    except Exception as e:
-        logger.error(f"Error committing brand-drug relationships: {e}")
-        db.session.rollback()
     
-    logger.info(f"Imported {count} brand-drug relationships, skipped {skipped} records.")
+    logger.info(f"Rebuilt eligibility flags for {len(flags)} drugs.")
 
 
-def import_adult_dosages():
-    """Import adult dosage data from adult.json."""
-    logger.info("Importing adult dosages...")
-    file_path = JSON_DATA_DIR / 'adult.json'
-    dosages_data = load_json_data(file_path)
+def adopt_by_name(model, rows):
+    """
+    Give rows stored without a source ID the source ID of the first feed record with their name.
     
-    count = 0
-    skipped = 0
+    Returns the source IDs of the adopted rows.
+    """
+    table = model.__table__
+    unsourced = {}
+    for row_id, name in db.session.execute(
+        select(table.c.id, table.c.name).where(table.c.source_id.is_(None)).order_by(table.c.id)
+    ):
+        unsourced.setdefault(name, row_id)
     
-    for dosage_data in dosages_data:
-        try:
-            # Get drug ID from CODE field
-            drug_id = dosage_data.get('CODE')
-            
-            if not drug_id:
-                skipped += 1
-                continue
-            
-            # Find the drug by ID
-            drug = Drug.query.get(drug_id)
-            if not drug:
-                skipped += 1
+    seen = set(SourceKeys()[model])
+    adopted = []
+    for row in rows:
+        if row is None or row['source_id'] in seen:
+            continue
+        seen.add(row['source_id'])
+        row_id = unsourced.pop(row['name'], None)
+        if row_id is not None:
+            adopted.append({'b_id': row_id, 'b_source_id': row['source_id']})
+    
+    for chunk in iter_chunks(adopted, BATCH_SIZE):
+        db.session.execute(
+            update(table).where(table.c.id == bindparam('b_id')).values(source_id=bindparam('b_source_id')),
+            chunk
+        )
+    return {row['b_source_id'] for row in adopted}
+
+
+def legacy_links_marked():
+    """Return whether the migration flagged the catalog as possibly loaded by the first importer."""
+    table = ImportRecord.__table__
+    marker = (table.c.source == LEGACY_LINKS[0]) & (table.c.source_key == LEGACY_LINKS[1])
+    return db.session.execute(select(table.c.source).where(marker)).first() is not None
+
+
+def remap_legacy_links(data_dir=JSON_DATA_DIR):
+    """
+    Re-point the references of a catalog loaded by the first importer (``--remap-legacy``).
+    
+    That importer stored brand ``CID``, relationship ``BID``/``DID`` and dosage
+    ``CODE`` values as row IDs. The stored companies, drugs and brands are
+    adopted by name, and only references that match the feed are rewritten: the
+    company of an adopted brand holding its record's ``CID``, pairs listed in
+    ``BRAND_DRUG.json`` between adopted brands and drugs, and dosages whose
+    content and drug match a feed record. Rows created through the API hold
+    row IDs and are left alone, and feed-shaped references whose target is
+    missing are reported rather than deleted. Clears the ``LEGACY_LINKS`` record.
+    """
+    logger.info("Re-pointing references stored as feed IDs by an earlier import...")
+    feed = {}
+    adopted = {}
+    for step, model in zip(CATALOG_STEPS, (Company, Drug, Brand)):
+        rows = [row for row in map(step.normalize, load_json_data(Path(data_dir) / step.file_name)) if row]
+        feed[model] = rows
+        adopted[model] = adopt_by_name(model, rows)
+        logger.info(f"Matched {len(adopted[model])} stored {step.label} to the feed by name.")
+    source_keys = SourceKeys()
+    companies, drug_keys, brand_keys = source_keys[Company], source_keys[Drug], source_keys[Brand]
+    unmatched = 0
+    
+    # Adopted brands still holding their record's CID
+    brand_cids = {row['source_id']: row['company_source_id'] for row in feed[Brand]}
+    brand_rows = {brand_keys[bid]: cid for bid, cid in brand_cids.items() if bid in adopted[Brand]}
+    remapped_brands = []
+    for brand_id, company_id in db.session.execute(select(Brand.id, Brand.company_id)):
+        if brand_id not in brand_rows or company_id is None or company_id != brand_rows[brand_id]:
+            continue
+        if company_id in adopted[Company]:
+            remapped_brands.append({'b_id': brand_id, 'b_company_id': companies[company_id]})
+        else:
+            unmatched += 1
+    for chunk in iter_chunks(remapped_brands, BATCH_SIZE):
+        db.session.execute(
+            update(Brand.__table__).where(Brand.id == bindparam('b_id')).values(company_id=bindparam('b_company_id')),
+            chunk
+        )
+    
+    # Stored pairs listed in the feed, between adopted brands and drugs
+    feed_pairs = {
+        pair for pair in map(normalize_brand_drug, load_json_data(Path(data_dir) / 'BRAND_DRUG.json')) if pair
+    }
+    stored_pairs = {
+        (bid, did): created_at for bid, did, created_at in db.session.execute(
+            select(brand_drugs.c.brand_id, brand_drugs.c.drug_id, brand_drugs.c.created_at)
+        )
+    }
+    moved = {}
+    for (bid, did), created_at in stored_pairs.items():
+        if (bid, did) not in feed_pairs:
+            continue
+        if bid in adopted[Brand] and did in adopted[Drug]:
+            moved[(bid, did)] = ((brand_keys[bid], drug_keys[did]), created_at)
+        else:
+            unmatched += 1
+    for chunk in iter_chunks([{'b_brand_id': bid, 'b_drug_id': did} for bid, did in moved], BATCH_SIZE):
+        db.session.execute(
+            delete(brand_drugs).where(
+                brand_drugs.c.brand_id == bindparam('b_brand_id'), brand_drugs.c.drug_id == bindparam('b_drug_id')
+            ),
+            chunk
+        )
+    kept = set(stored_pairs) - set(moved)
+    writer = BulkInserter(brand_drugs)
+    for (bid, did), created_at in dict(moved.values()).items():
+        if (bid, did) not in kept:
+            writer.add({'brand_id': bid, 'drug_id': did, 'created_at': created_at})
+    writer.flush()
+    
+    # Dosages whose content matches a feed record of their stored drug ID
+    remapped_dosages = 0
+    for step, model in zip(DOSAGE_STEPS, (AdultDosage, PediatricDosage, NeonatalDosage)):
+        feed_hashes = {
+            row['content_hash'] for row in map(step.normalize, load_json_data(Path(data_dir) / step.file_name)) if row
+        }
+        dosages = model.__table__
+        remapped = []
+        for row in db.session.execute(select(
+            dosages.c.id, dosages.c.drug_id, dosages.c.dosage, dosages.c.frequency, dosages.c.route, dosages.c.notes
+        )):
+            fields = (row.dosage, row.frequency, row.route, row.notes)
+            if dosage_content_hash(row.drug_id, *fields) not in feed_hashes:
                 continue
-            
-            # Get dosage information
-            dosage_value = clean_text(dosage_data.get('DOSE') or dosage_data.get('dose'))
-            frequency = clean_text(dosage_data.get('FREQ') or dosage_data.get('freq'))
-            route = clean_text(dosage_data.get('ROUTE') or dosage_data.get('route'))
-            notes = clean_text(dosage_data.get('INSTRUCTION') or dosage_data.get('instruction'))
-            
-            # Create new dosage record
-            dosage = AdultDosage(
-                drug_id=drug.id,
-                dosage=dosage_value if dosage_value != "Unknown" else None,
-                frequency=frequency if frequency != "Unknown" else None,
-                route=route if route != "Unknown" else None,
-                notes=notes if notes != "Unknown" else None
+            if row.drug_id in adopted[Drug]:
+                drug_id = drug_keys[row.drug_id]
+                remapped.append({
+                    'b_id': row.id, 'b_drug_id': drug_id, 'b_content_hash': dosage_content_hash(drug_id, *fields)
+                })
+            else:
+                unmatched += 1
+        for chunk in iter_chunks(remapped, BATCH_SIZE):
+            db.session.execute(
+                update(dosages).where(dosages.c.id == bindparam('b_id')).values(
+                    drug_id=bindparam('b_drug_id'), content_hash=bindparam('b_content_hash')
+                ),
+                chunk
             )
-            db.session.add(dosage)
-            count += 1
-            
-            # Commit every 100 records to avoid memory issues
-            if count % 100 == 0:
-                db.session.commit()
-                logger.info(f"Imported {count} adult dosages so far...")
-        except Exception as e:
-            logger.error(f"Error importing adult dosage for drug ID {drug_id}: {e}")
-            db.session.rollback()
+        remapped_dosages += len(remapped)
     
-    # Final commit
-    try:
-        db.session.commit()
-    except Exception as e:
-        logger.error(f"Error committing adult dosages: {e}")
-        db.session.rollback()
+    refresh_eligibility(db.session.connection())
+    table = ImportRecord.__table__
+    db.session.execute(delete(table).where(
+        (table.c.source == LEGACY_LINKS[0]) & (table.c.source_key == LEGACY_LINKS[1])
+    ))
+    logger.info(
+        f"Re-pointed {len(remapped_brands)} brands, {len(moved)} brand-drug relationships "
+        f"and {remapped_dosages} dosages."
+    )
+    if unmatched:
+        logger.warning(
+            f"Left {unmatched} references that look like feed IDs but have no adopted row to point at; "
+            "check them by hand."
+        )
+
+
+def handle_legacy_links(remap, data_dir=JSON_DATA_DIR):
+    """Remap legacy references when asked to, otherwise warn while the migration's marker is set."""
+    if remap:
+        remap_legacy_links(data_dir)
+    elif legacy_links_marked():
+        logger.warning(
+            "This catalog has rows without source IDs and may hold references stored as feed IDs by the "
+            "first importer; if it was loaded by that importer, re-run with --remap-legacy."
+        )
+
+
+def source_id(field, record):
+    """Return the source ID of a record as a string key."""
+    return str(record.get(field, record.get(field.lower())))
+
+
+def brand_drug_key(record):
+    """Return the source key of a brand-drug relationship."""
+    return f"{record.get('BID')}:{record.get('DID')}"
+
+
+def row_digest(row):
+    """Hash a normalized company, drug or brand row."""
+    return content_hash(*row.values())
+
+
+def pair_digest(pair):
+    """Hash a brand-drug pair."""
+    return content_hash(*pair)
+
+
+def dosage_group_digest(rows):
+    """Hash all dosage rows of one drug."""
+    return content_hash(*sorted(row['content_hash'] for row in rows))
+
+
+class ChangeSet:
+    """Inserts, updates and deletes of one source, keyed by source ID."""
+    
+    def __init__(self):
+        self.inserted = {}
+        self.updated = {}
+        self.deleted = {}
+        self.unchanged = 0
+        self.skipped = set()
     
-    logger.info(f"Imported {count} adult dosages, skipped {skipped} records.")
+    def skip(self, key):
+        """Move a change that could not be applied out of the change set."""
+        self.inserted.pop(key, None)
+        self.updated.pop(key, None)
+        self.skipped.add(key)
+    
+    def summary(self):
+        """Return the number of changes of each kind."""
+        return {
+            'inserted': len(self.inserted),
+            'updated': len(self.updated),
+            'deleted': len(self.deleted),
+            'unchanged': self.unchanged,
+            'skipped': len(self.skipped),
+        }
+    
+    def report(self):
+        """Return the summary with the source keys of every change."""
+        report = self.summary()
+        for kind in ('inserted', 'updated', 'deleted', 'skipped'):
+            report[f'{kind}_keys'] = sorted(getattr(self, kind))
+        return report
 
 
-def import_pediatric_dosages():
-    """Import pediatric dosage data from Paedriatic.json."""
-    logger.info("Importing pediatric dosages...")
-    file_path = JSON_DATA_DIR / 'Paedriatic.json'
-    dosages_data = load_json_data(file_path)
+def read_feed(source, data_dir=JSON_DATA_DIR):
+    """Load a feed as ``{source key: (content hash, normalized value)}``."""
+    feed = {}
+    for record in load_json_data(Path(data_dir) / source.step.file_name):
+        row = source.step.normalize(record)
+        if row is None:
+            continue
+        key = source.key(record)
+        if source.grouped:
+            # Dosages are keyed by drug CODE; a drug's rows change together
+            rows = feed.setdefault(key, {})
+            rows.setdefault(row['content_hash'], row)
+        else:
+            feed.setdefault(key, row)
     
-    count = 0
-    skipped = 0
+    if source.grouped:
+        feed = {key: list(rows.values()) for key, rows in feed.items()}
+    return {key: (source.digest(value), value) for key, value in feed.items()}
+
+
+def load_import_state(source):
+    """Return ``{source key: (content hash, row ID)}`` as of the last delta import."""
+    table = ImportRecord.__table__
+    query = select(table.c.source_key, table.c.content_hash, table.c.row_id).where(
+        table.c.source == source.name
+    )
+    return {key: (digest, row_id) for key, digest, row_id in db.session.execute(query)}
+
+
+def diff_feed(feed, state):
+    """Compare a feed with the stored state by content hash."""
+    changes = ChangeSet()
+    for key, (digest, value) in feed.items():
+        stored = state.get(key)
+        if stored is None:
+            changes.inserted[key] = (digest, value)
+        elif stored[0] != digest:
+            changes.updated[key] = (digest, value, stored[1])
+        else:
+            changes.unchanged += 1
     
-    for dosage_data in dosages_data:
-        try:
-            # Get drug ID from CODE field
-            drug_id = dosage_data.get('CODE')
-            
-            if not drug_id:
-                skipped += 1
-                continue
-            
-            # Find the drug by ID
-            drug = Drug.query.get(drug_id)
-            if not drug:
-                skipped += 1
-                continue
-            
-            # Get dosage information
-            dosage_value = clean_text(dosage_data.get('DOSE') or dosage_data.get('dose'))
-            frequency = clean_text(dosage_data.get('FREQ') or dosage_data.get('freq'))
-            route = clean_text(dosage_data.get('ROUTE') or dosage_data.get('route'))
-            notes = clean_text(dosage_data.get('INSTRUCTION') or dosage_data.get('instruction'))
-            
-            # Create new dosage record
-            dosage = PediatricDosage(
-                drug_id=drug.id,
-                dosage=dosage_value if dosage_value != "Unknown" else None,
-                frequency=frequency if frequency != "Unknown" else None,
-                route=route if route != "Unknown" else None,
-                notes=notes if notes != "Unknown" else None
+    for key, (digest, row_id) in state.items():
+        if key not in feed:
+            changes.deleted[key] = row_id
+    return changes
+
+
+def delete_in(table, column, values):
+    """Delete the rows of ``table`` whose ``column`` is in ``values``, in batches."""
+    for chunk in iter_chunks(values, BATCH_SIZE):
+        db.session.execute(delete(table).where(table.c[column].in_(chunk)))
+
+
+def save_import_state(source, changes, applied):
+    """Record the content hashes of the applied changes."""
+    table = ImportRecord.__table__
+    now = datetime.utcnow()
+    
+    stale = [key for key in chain(changes.deleted, changes.updated, changes.skipped) if key not in applied]
+    for chunk in iter_chunks(stale, BATCH_SIZE):
+        db.session.execute(
+            delete(table).where(table.c.source == source.name, table.c.source_key.in_(chunk))
+        )
+    
+    new = [
+        {'source': source.name, 'source_key': key, 'content_hash': digest,
+         'row_id': row_id, 'imported_at': now}
+        for key, (digest, row_id) in applied.items() if key not in changes.updated
+    ]
+    changed = [
+        {'source': source.name, 'source_key': key, 'content_hash': digest,
+         'row_id': row_id, 'imported_at': now}
+        for key, (digest, row_id) in applied.items() if key in changes.updated
+    ]
+    for chunk in iter_chunks(new, BATCH_SIZE):
+        db.session.execute(insert(table), chunk)
+    if changed:
+        db.session.execute(update(ImportRecord), changed)
+
+
+def forget_import_records(sources, column, values):
+    """
+    Drop the import records of rows removed along with their parent.
+    
+    Their feed records are unchanged, so without this they would keep hashing
+    as already imported and never come back when the parent does.
+    """
+    table = ImportRecord.__table__
+    for chunk in iter_chunks(values, BATCH_SIZE):
+        db.session.execute(delete(table).where(table.c.source.in_(sources), table.c[column].in_(chunk)))
+
+
+def brand_drug_record_keys(position, source_ids):
+    """Return the recorded ``BID:DID`` keys whose BID (position 0) or DID (1) is in ``source_ids``."""
+    table = ImportRecord.__table__
+    keys = db.session.execute(select(table.c.source_key).where(table.c.source == 'brand_drugs')).scalars()
+    return [key for key in keys if key.split(':')[position] in source_ids]
+
+
+def delete_entities(source, changes, source_keys):
+    """Delete companies, drugs or brands that left the feed, with their dependents."""
+    row_ids = [row_id for row_id in changes.deleted.values() if row_id is not None]
+    if not row_ids:
+        return set()
+    
+    if source.target is Company:
+        # Brands lose their company; re-import them once it is back
+        brand_ids = []
+        for chunk in iter_chunks(row_ids, BATCH_SIZE):
+            brand_ids += db.session.execute(select(Brand.id).where(Brand.company_id.in_(chunk))).scalars()
+            db.session.execute(
+                update(Brand.__table__).where(Brand.company_id.in_(chunk)).values(company_id=None)
             )
-            db.session.add(dosage)
-            count += 1
-            
-            # Commit every 100 records to avoid memory issues
-            if count % 100 == 0:
-                db.session.commit()
-                logger.info(f"Imported {count} pediatric dosages so far...")
-        except Exception as e:
-            logger.error(f"Error importing pediatric dosage for drug ID {drug_id}: {e}")
-            db.session.rollback()
+        forget_import_records(['brands'], 'row_id', brand_ids)
+    elif source.target is Brand:
+        delete_in(brand_drugs, 'brand_id', row_ids)
+        forget_import_records(['brand_drugs'], 'source_key', brand_drug_record_keys(0, set(changes.deleted)))
+    elif source.target is Drug:
+        delete_in(brand_drugs, 'drug_id', row_ids)
+        forget_import_records(['brand_drugs'], 'source_key', brand_drug_record_keys(1, set(changes.deleted)))
+        for model in (AdultDosage, PediatricDosage, NeonatalDosage):
+            delete_in(model.__table__, 'drug_id', row_ids)
+        forget_import_records(
+            [model.__tablename__ for model in (AdultDosage, PediatricDosage, NeonatalDosage)], 'row_id', row_ids
+        )
     
-    # Final commit
-    try:
-        db.session.commit()
-    except Exception as e:
-        logger.error(f"Error committing pediatric dosages: {e}")
-        db.session.rollback()
+    delete_in(source.target.__table__, 'id', row_ids)
+    source_keys.pop(source.target, None)
+    return set(row_ids) if source.target is Drug else set()
+
+
+def write_entities(source, changes, source_keys):
+    """Upsert changed companies, drugs or brands, returning the applied records."""
+    rows = [row for _, row in changes.inserted.values()]
+    rows += [row for _, row, _ in changes.updated.values()]
+    unlinked = set()
+    if source.target is Brand:
+        # Brands of companies missing from the catalog are stored without a
+        # company and left unrecorded, so they are linked once it appears
+        companies = source_keys[Company]
+        unlinked = {
+            key for key, (_, row, *_) in chain(changes.inserted.items(), changes.updated.items())
+            if row['company_source_id'] is not None and row['company_source_id'] not in companies
+        }
+        rows = resolve_brand_companies(rows, source_keys)
+    import_sourced_rows(
+        source.target, rows, source.step.label, source_keys, unique_names=source.target is Company
+    )
+    
+    # Records mapped onto another record's row are not tracked themselves
+    owned = SourceKeys()[source.target]
+    applied = {}
+    for key in list(changes.inserted) + list(changes.updated):
+        row_id = owned.get(int(key))
+        if row_id is None:
+            changes.skip(key)
+        elif key not in unlinked:
+            applied[key] = (changes.inserted.get(key, changes.updated.get(key))[0], row_id)
+    return applied
+
+
+def map_brand_drug_keys(keys, source_keys):
+    """Map ``BID:DID`` keys to (brand ID, drug ID) pairs, dropping unknown IDs."""
+    brand_keys = source_keys[Brand]
+    drug_keys = source_keys[Drug]
+    pairs = {}
+    for key in keys:
+        bid, did = (int(value) for value in key.split(':'))
+        if bid in brand_keys and did in drug_keys:
+            pairs[key] = (brand_keys[bid], drug_keys[did])
+    return pairs
+
+
+def delete_brand_drugs(source, changes, source_keys):
+    """Delete brand-drug relationships that left the feed."""
+    pairs = [
+        {'b_brand_id': bid, 'b_drug_id': did}
+        for bid, did in map_brand_drug_keys(changes.deleted, source_keys).values()
+    ]
+    if pairs:
+        db.session.execute(
+            delete(brand_drugs).where(
+                brand_drugs.c.brand_id == bindparam('b_brand_id'),
+                brand_drugs.c.drug_id == bindparam('b_drug_id')
+            ),
+            pairs
+        )
+    return set()
+
+
+def write_brand_drugs(source, changes, source_keys):
+    """Insert new brand-drug relationships, returning the applied records."""
+    existing = {
+        tuple(row) for row in db.session.execute(select(brand_drugs.c.brand_id, brand_drugs.c.drug_id))
+    }
+    pairs = map_brand_drug_keys(changes.inserted, source_keys)
     
-    logger.info(f"Imported {count} pediatric dosages, skipped {skipped} records.")
+    applied = {}
+    writer = BulkInserter(brand_drugs)
+    for key, (digest, _) in list(changes.inserted.items()):
+        if key not in pairs:
+            changes.skip(key)
+            continue
+        if pairs[key] not in existing:
+            bid, did = pairs[key]
+            writer.add({'brand_id': bid, 'drug_id': did})
+        applied[key] = (digest, None)
+    writer.flush()
+    return applied
+
 
+def delete_dosages(source, changes, source_keys):
+    """Delete the dosage rows of drugs whose dosages changed or left the feed."""
+    drug_keys = source_keys[Drug]
+    drug_ids = {row_id for row_id in changes.deleted.values() if row_id is not None}
+    for rows in chain(
+        (rows for _, rows in changes.inserted.values()),
+        (rows for _, rows, _ in changes.updated.values())
+    ):
+        drug_id = drug_keys.get(rows[0]['drug_source_id'])
+        if drug_id is not None:
+            drug_ids.add(drug_id)
+    delete_in(source.target.__table__, 'drug_id', list(drug_ids))
+    return drug_ids
 
-def import_neonatal_dosages():
-    """Import neonatal dosage data from Neonatal.json."""
-    logger.info("Importing neonatal dosages...")
-    file_path = JSON_DATA_DIR / 'Neonatal.json'
-    dosages_data = load_json_data(file_path)
+
+def write_dosages(source, changes, source_keys):
+    """Insert the current dosage rows of changed drugs, returning the applied records."""
+    drug_keys = source_keys[Drug]
+    groups = [
+        (key, digest, rows) for key, (digest, rows) in changes.inserted.items()
+    ] + [
+        (key, digest, rows) for key, (digest, rows, _) in changes.updated.items()
+    ]
     
-    count = 0
-    skipped = 0
+    applied = {}
+    writer = BulkInserter(source.target.__table__)
+    for key, digest, rows in groups:
+        rows = [resolve_dosage_drug(dict(row), drug_keys) for row in rows]
+        if rows[0] is None:
+            changes.skip(key)
+            continue
+        for row in rows:
+            writer.add(row)
+        applied[key] = (digest, rows[0]['drug_id'])
+    writer.flush()
+    return applied
+
+
+DeltaSource = namedtuple(
+    'DeltaSource', ['name', 'step', 'target', 'key', 'digest', 'grouped', 'delete', 'write']
+)
+
+STEPS_BY_FILE = {step.file_name: step for step in CATALOG_STEPS + DOSAGE_STEPS}
+
+# Delta sources in dependency order; deletes are applied in reverse order
+DELTA_SOURCES = [
+    DeltaSource('companies', STEPS_BY_FILE['COMPANY.json'], Company, partial(source_id, 'ID'), row_digest, False,
+                delete_entities, write_entities),
+    DeltaSource('drugs', STEPS_BY_FILE['DRUG.json'], Drug, partial(source_id, 'ID'), row_digest, False,
+                delete_entities, write_entities),
+    DeltaSource('brands', STEPS_BY_FILE['BRAND.json'], Brand, partial(source_id, 'BID'), row_digest, False,
+                delete_entities, write_entities),
+    DeltaSource('brand_drugs', STEPS_BY_FILE['BRAND_DRUG.json'], brand_drugs, brand_drug_key, pair_digest, False,
+                delete_brand_drugs, write_brand_drugs),
+] + [
+    DeltaSource(model.__tablename__, STEPS_BY_FILE[file_name], model, partial(source_id, 'CODE'),
+                dosage_group_digest, True, delete_dosages, write_dosages)
+    for file_name, model in (
+        ('adult.json', AdultDosage),
+        ('Paedriatic.json', PediatricDosage),
+        ('Neonatal.json', NeonatalDosage),
+    )
+]
+
+
+def run_delta_import(report_path=None, dry_run=False, data_dir=JSON_DATA_DIR, remap_legacy=False):
+    """Apply only the records that changed since the last delta import, in one transaction."""
+    started = time.perf_counter()
+    handle_legacy_links(remap_legacy, data_dir)
+    changes = {}
+    for source in DELTA_SOURCES:
+        if find_data_file(Path(data_dir) / source.step.file_name) is None:
+            # Without a snapshot nothing can be diffed, so leave the table alone
+            logger.warning(f"Skipping {source.step.label}: {source.step.file_name} not found.")
+            continue
+        changes[source.name] = diff_feed(read_feed(source, data_dir), load_import_state(source))
+    
+    sources = [source for source in DELTA_SOURCES if source.name in changes]
+    source_keys = SourceKeys()
+    affected_drugs = set()
+    applied = {}
+    for source in reversed(sources):
+        affected_drugs |= source.delete(source, changes[source.name], source_keys)
+    for source in sources:
+        applied[source.name] = source.write(source, changes[source.name], source_keys)
+        if source.grouped:
+            # Drugs inserted in this run were unknown while deleting, so add
+            # the drugs whose dosages were written
+            affected_drugs |= {row_id for _, row_id in applied[source.name].values()}
+    for source in sources:
+        save_import_state(source, changes[source.name], applied[source.name])
+    
+    if affected_drugs:
+        refresh_eligibility(db.session.connection(), affected_drugs)
+    if dry_run:
+        db.session.rollback()
+    else:
+        db.session.commit()
+    
+    for source in sources:
+        summary = ', '.join(f'{count} {kind}' for kind, count in changes[source.name].summary().items())
+        logger.info(f"{source.step.label}: {summary}")
+    logger.info(
+        f"Applied delta import in {time.perf_counter() - started:.2f}s; "
+        f"refreshed eligibility flags for {len(affected_drugs)} drugs."
+    )
     
-    for dosage_data in dosages_data:
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as file:
+            json.dump({name: change_set.report() for name, change_set in changes.items()}, file, indent=2)
+    return changes
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Import pharmaceutical data from JSON files')
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help='Normalize records in this many worker processes (1 runs everything in-process)'
+    )
+    parser.add_argument(
+        '--delta', action='store_true',
+        help='Apply only records that changed since the last delta import, keyed by source ID'
+    )
+    parser.add_argument(
+        '--report', metavar='PATH',
+        help='With --delta, write the change set (source keys per change) to this JSON file'
+    )
+    parser.add_argument(
+        '--data-dir', default=str(JSON_DATA_DIR),
+        help='Directory holding the JSON data files'
+    )
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='Parse, validate and run the writes, then roll back instead of committing'
+    )
+    parser.add_argument(
+        '--benchmark', action='store_true',
+        help='Print per-table timings, rows/sec, peak memory and query counts as JSON'
+    )
+    parser.add_argument(
+        '--scale', type=int, default=1,
+        help='Import a synthetic dataset made of this many copies of the data files'
+    )
+    parser.add_argument(
+        '--output', metavar='PATH',
+        help='Write the benchmark results to this file instead of stdout'
+    )
+    parser.add_argument(
+        '--fast-load', action='store_true',
+        help='SQLite only: load with an exclusive lock, no fsyncs and secondary indexes '
+             'rebuilt afterwards; refuses to run while the web app has the database open'
+    )
+    parser.add_argument(
+        '--remap-legacy', action='store_true',
+        help='Re-point brand, relationship and dosage references stored as feed IDs by the first '
+             'version of this script, for rows matched to the feed by name'
+    )
+    parser.add_argument(
+        '--no-bundle', action='store_true',
+        help='Skip rebuilding the offline catalog bundle after the import'
+    )
+    return parser.parse_args(argv)
+
+
+# Tables written by the importer, whose secondary indexes a fast load rebuilds
+LOAD_TABLES = [
+    'companies', 'drugs', 'brands', 'brand_drugs', 'adult_dosages', 'pediatric_dosages',
+    'neonatal_dosages', 'drug_eligibility', 'import_records',
+]
+
+
+def write_benchmark(args, results):
+    """Emit benchmark results as JSON."""
+    results = {
+        'mode': 'delta' if args.delta else 'full',
+        'dry_run': args.dry_run,
+        'workers': args.workers,
+        'scale': args.scale,
+        'database': db.engine.dialect.name,
+        **results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+def main_delta(args, data_dir):
+    """Run a delta import."""
+    with app.app_context(), ExitStack() as stack:
         try:
-            # Get drug ID from CODE field
-            drug_id = dosage_data.get('CODE')
-            
-            if not drug_id:
-                skipped += 1
-                continue
-            
-            # Find the drug by ID
-            drug = Drug.query.get(drug_id)
-            if not drug:
-                skipped += 1
-                continue
-            
-            # Get dosage information
-            dosage_value = clean_text(dosage_data.get('DOSE') or dosage_data.get('dose'))
-            frequency = clean_text(dosage_data.get('FREQ') or dosage_data.get('freq'))
-            route = clean_text(dosage_data.get('ROUTE') or dosage_data.get('route'))
-            notes = clean_text(dosage_data.get('INSTRUCTION') or dosage_data.get('instruction'))
-            
-            # Create new dosage record
-            dosage = NeonatalDosage(
-                drug_id=drug.id,
-                dosage=dosage_value if dosage_value != "Unknown" else None,
-                frequency=frequency if frequency != "Unknown" else None,
-                route=route if route != "Unknown" else None,
-                notes=notes if notes != "Unknown" else None
-            )
-            db.session.add(dosage)
-            count += 1
-            
-            # Commit every 100 records to avoid memory issues
-            if count % 100 == 0:
-                db.session.commit()
-                logger.info(f"Imported {count} neonatal dosages so far...")
+            if args.fast_load:
+                stack.enter_context(fast_load(db.engine, LOAD_TABLES))
+            logger.info("Starting delta import...")
+            started = time.perf_counter()
+            with QueryCounter(db.engine) as queries:
+                changes = run_delta_import(args.report, args.dry_run, data_dir, args.remap_legacy)
+            logger.info("Delta import completed successfully.")
         except Exception as e:
-            logger.error(f"Error importing neonatal dosage for drug ID {drug_id}: {e}")
+            logger.error(f"Error during delta import: {e}")
             db.session.rollback()
+            return 1
+        
+        if args.benchmark:
+            write_benchmark(args, {
+                'tables': {name: change_set.summary() for name, change_set in changes.items()},
+                'total': {
+                    'seconds': round(time.perf_counter() - started, 4),
+                    'queries': queries.count,
+                    'peak_rss_mb': round(peak_rss_mb(), 1),
+                },
+            })
     
-    # Final commit
-    try:
-        db.session.commit()
-    except Exception as e:
-        logger.error(f"Error committing neonatal dosages: {e}")
-        db.session.rollback()
-    
-    logger.info(f"Imported {count} neonatal dosages, skipped {skipped} records.")
+    return 0
 
 
-def main():
-    """Main function to run all import operations."""
-    with app.app_context():
+def main_full(args, data_dir):
+    """Run a full import."""
+    steps = CATALOG_STEPS + DOSAGE_STEPS
+    stats = {step.label: StageStats() for step in steps}
+    started = time.perf_counter()
+    
+    with app.app_context(), ExitStack() as stack:
+        pipeline = None
+        if args.workers > 1:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=args.workers))
+            pipeline = NormalizationPipeline(pool, steps, stats, args.workers * 4, data_dir)
+        
         try:
-            logger.info("Starting data import...")
+            if args.fast_load:
+                stack.enter_context(fast_load(db.engine, LOAD_TABLES))
+            logger.info(f"Starting data import with {args.workers} worker(s)...")
+            
+            # Import in the correct order to maintain relationships;
+            # the catalog tables are written in one transaction
+            handle_legacy_links(args.remap_legacy, data_dir)
+            source_keys = SourceKeys()
+            run_steps(CATALOG_STEPS, stats, source_keys, pipeline, data_dir)
+            if not args.dry_run:
+                db.session.commit()
             
-            # Import in the correct order to maintain relationships
-            import_companies()
-            import_drugs()
-            import_brands()
-            import_brand_drug_relationships()
-            import_adult_dosages()
-            import_pediatric_dosages()
-            import_neonatal_dosages()
+            # Dosages are committed together with the rebuilt eligibility flags
+            run_steps(DOSAGE_STEPS, stats, source_keys, pipeline, data_dir)
+            rebuild_drug_eligibility(commit=not args.dry_run)
+            if args.dry_run:
+                db.session.rollback()
+                logger.info("Dry run: rolled back all writes.")
             
+            for step in steps:
+                stats[step.label].log(step.label)
             logger.info("Data import completed successfully.")
         except Exception as e:
             logger.error(f"Error during data import: {e}")
+            db.session.rollback()
             return 1
+        
+        if args.benchmark:
+            write_benchmark(args, {
+                'tables': {step.label: stats[step.label].as_dict() for step in steps},
+                'total': {
+                    'seconds': round(time.perf_counter() - started, 4),
+                    'queries': sum(step_stats.queries for step_stats in stats.values()),
+                    'peak_rss_mb': round(peak_rss_mb(), 1),
+                },
+            })
     
     return 0
 
 
+def rebuild_bundle():
+    """Rebuild the offline catalog bundle if the import changed the catalog."""
+    with app.app_context():
+        bundle = build_bundle(app, db.engine)
+    logger.info(f"Catalog bundle {bundle['version']}: {bundle['size']} bytes")
+
+
+def main(argv=None):
+    """Main function to run all import operations."""
+    args = parse_args(argv)
+    run = main_delta if args.delta else main_full
+    if args.scale <= 1:
+        status = run(args, Path(args.data_dir))
+    else:
+        with tempfile.TemporaryDirectory(prefix='import-scaled-') as tmp_dir:
+            logger.info(f"Generating a {args.scale}x synthetic dataset from {args.data_dir}...")
+            data_dir = generate_scaled_dataset(args.data_dir, tmp_dir, args.scale)
+            status = run(args, data_dir)
+    
+    if status == 0 and not args.dry_run and not args.no_bundle:
+        rebuild_bundle()
+    return status
+
+
 if __name__ == "__main__":
-    sys.exit(main()) 
\ No newline at end of file
+    sys.exit(main())
@@ -6,7 +6,7 @@ from flask_migrate import upgrade
 # Add parent directory to path so we can import app
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app import create_app, db
+from app import create_app, db, init_migrate
 from app.models.user import User
 from app.models.item import Item
 from app.models.pharmaceutical import Company, Drug, Brand, AdultDosage, PediatricDosage, NeonatalDosage
@@ -14,6 +14,7 @@ from app.models.pharmaceutical import Company, Drug, Brand, AdultDosage, Pediatr
 def init_db():
     """Initialize the database with migrations and seed data."""
     app = create_app(os.getenv('FLASK_ENV', 'production'))
+    init_migrate(app)
     
     with app.app_context():
         # Run migrations
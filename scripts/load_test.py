@@ -0,0 +1,449 @@
+#!/usr/bin/env python
+"""
+Load test of the app served by gunicorn.
+
+Starts ``gunicorn wsgi:app`` on a seeded SQLite database (a synthetic catalog
+built as in ``bench_api.py``, or ``--database``) and replays a weighted mix of
+requests at a fixed target rate for ``--duration`` seconds:
+
+- ``catalog``: authenticated detail reads of random companies, drugs, brands
+  and dosages
+- ``dosing``: dosing lookups for random drugs and ages
+- ``login``: logins of the benchmark user
+- ``write``: companies created by the (admin) benchmark user; these stay in
+  the database
+- ``update``: PUT updates of companies, drugs, brands and dosages, spread over
+  the first ``UPDATE_HOT_ROWS`` rows of each table so concurrent writers
+  contend for the same rows; dosage updates also refresh the drug's
+  eligibility flags. The changes stay in the database
+
+Requests are sent on a fixed schedule by ``--concurrency`` client threads with
+keep-alive connections. Latency is measured from the time a request was
+scheduled, so a saturated server shows up as growing latency instead of a
+silently lower request rate. The report gives the achieved throughput, errors
+and p50/p95/p99 latency per endpoint, and the CPU use and peak RSS of the
+gunicorn master and workers (sampled from /proc, Linux only).
+
+    python scripts/load_test.py --workers 2 --threads 4 --rate 200 --duration 30
+    python scripts/load_test.py --mix catalog=65,dosing=20,login=2,write=5,update=8 --json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+import uuid
+import http.client
+from collections import defaultdict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the project root directory to the Python path
+sys.path.insert(0, ROOT)
+
+from scripts.bench_api import BENCH_EMAIL, BENCH_PASSWORD, generate_catalog, import_catalog
+
+DEFAULT_MIX = 'catalog=65,dosing=20,login=2,write=5,update=8'
+
+# Tables read by the catalog requests, by URL name
+CATALOG_TABLES = {
+    'companies': 'companies',
+    'drugs': 'drugs',
+    'brands': 'brands',
+    'adult-dosages': 'adult_dosages',
+    'pediatric-dosages': 'pediatric_dosages',
+    'neonatal-dosages': 'neonatal_dosages',
+}
+
+# Field set by the update requests of each table, and the values it cycles through
+UPDATE_FIELDS = {
+    'companies': ('address', ('Load test address', 'Load test address 2')),
+    'drugs': ('category', ('Load test', 'Load test 2')),
+    'brands': ('strength', ('500 mg', '250 mg')),
+    'adult-dosages': ('route', ('PO', 'IV')),
+    'pediatric-dosages': ('route', ('PO', 'IV')),
+    'neonatal-dosages': ('route', ('PO', 'IV')),
+}
+
+# Rows per table the update requests are spread over
+UPDATE_HOT_ROWS = 10
+
+# Ages (in days) of the dosing lookups: neonates, children and adults
+DOSING_AGES = (7, 200, 900, 3650, 9000)
+
+# Seconds between CPU and memory samples of the gunicorn processes
+SAMPLE_INTERVAL = 0.5
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+
+
+def parse_mix(value):
+    """Parse ``name=weight,...`` into a dict of request kinds and weights."""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ('catalog', 'dosing', 'login', 'write', 'update'):
+            raise argparse.ArgumentTypeError(f'unknown request kind: {name}')
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError('the mix needs at least one positive weight')
+    return mix
+
+
+def seed_database(path, scale):
+    """Create a database with the benchmark user and a ``scale``x synthetic catalog."""
+    subprocess.run([sys.executable, os.path.join(ROOT, 'scripts', 'bench_api.py'), '--seed', path], check=True)
+    with tempfile.TemporaryDirectory(prefix='load-test-data-') as data_dir:
+        generate_catalog(os.path.join(ROOT, 'json_data'), data_dir)
+        import_catalog(path, scale, data_dir, data_dir)
+
+
+def load_ids(path):
+    """Return the row IDs of the catalog tables of a database."""
+    import sqlite3
+
+    connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        ids = {name: [row[0] for row in connection.execute(f'SELECT id FROM {table}')]
+               for name, table in CATALOG_TABLES.items()}
+        ids['dosing'] = [row[0] for row in connection.execute(
+            'SELECT DISTINCT drug_id FROM pediatric_dosages WHERE drug_id IS NOT NULL'
+        )] or ids['drugs']
+    finally:
+        connection.close()
+    return ids
+
+
+def free_port():
+    """Return a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(path, port, workers, threads, preload, timeout=60):
+    """Start gunicorn on a database and wait until it answers."""
+    command = [sys.executable, '-m', 'gunicorn', '-w', str(workers), '--threads', str(threads),
+               '-b', f'127.0.0.1:{port}']
+    if preload:
+        command.append('--preload')
+    command.append('wsgi:app')
+
+    env = {**os.environ, 'DATABASE_URL': f'sqlite:///{path}', 'FLASK_ENV': 'production'}
+    env.pop('RENDER', None)
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/swagger.json')
+            if connection.getresponse().status == 200:
+                connection.close()
+                return server
+        except OSError:
+            time.sleep(0.05)
+    server.terminate()
+    raise RuntimeError('gunicorn did not answer in time')
+
+
+def child_pids(pid):
+    """Return the IDs of the child processes of a process (Linux only)."""
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as children:
+            return [int(child) for child in children.read().split()]
+    except OSError:
+        return []
+
+
+def process_usage(pid):
+    """Return the CPU seconds used so far and the RSS in MB of a process, or None."""
+    try:
+        with open(f'/proc/{pid}/stat') as stat:
+            # Fields after the parenthesized command name; utime and stime are 14 and 15
+            fields = stat.read().rsplit(')', 1)[1].split()
+        with open(f'/proc/{pid}/status') as status:
+            rss = next(int(line.split()[1]) / 1024 for line in status if line.startswith('VmRSS:'))
+    except (OSError, StopIteration):
+        return None
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS, rss
+
+
+class ProcessSampler(threading.Thread):
+    """Samples the CPU time and RSS of the gunicorn master and its workers."""
+
+    def __init__(self, master_pid):
+        super().__init__(daemon=True)
+        self.master_pid = master_pid
+        self.first = {}
+        self.last = {}
+        self.peak_rss = defaultdict(float)
+        self.started = None
+        self.stopped = None
+        self._stopping = threading.Event()
+
+    def sample(self):
+        for pid in [self.master_pid, *child_pids(self.master_pid)]:
+            usage = process_usage(pid)
+            if usage is None:
+                continue
+            self.first.setdefault(pid, usage[0])
+            self.last[pid] = usage[0]
+            self.peak_rss[pid] = max(self.peak_rss[pid], usage[1])
+
+    def run(self):
+        self.started = time.monotonic()
+        self.sample()
+        while not self._stopping.wait(SAMPLE_INTERVAL):
+            self.sample()
+
+    def stop(self):
+        self._stopping.set()
+        self.join()
+        self.sample()
+        self.stopped = time.monotonic()
+
+    def report(self):
+        elapsed = self.stopped - self.started
+
+        def usage(pid):
+            return {
+                'pid': pid,
+                'cpu_percent': round((self.last[pid] - self.first[pid]) * 100 / elapsed, 1),
+                'peak_rss_mb': round(self.peak_rss[pid], 1),
+            }
+
+        workers = [usage(pid) for pid in self.last if pid != self.master_pid]
+        return {
+            'master': usage(self.master_pid) if self.master_pid in self.last else None,
+            'workers': workers,
+            'workers_cpu_percent': round(sum(worker['cpu_percent'] for worker in workers), 1),
+            'workers_rss_mb': round(sum(worker['peak_rss_mb'] for worker in workers), 1),
+        }
+
+
+class LoadClient:
+    """Sends the request mix on a fixed schedule and records latencies per endpoint."""
+
+    def __init__(self, port, ids, mix, token, seed=0):
+        self.port = port
+        self.ids = ids
+        self.kinds = list(mix)
+        self.weights = list(mix.values())
+        self.headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
+        self.seed = seed
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+        self._next_slot = 0
+
+    def build_request(self, rng):
+        """Return the endpoint name, method, URL and body of a random request of the mix."""
+        kind = rng.choices(self.kinds, self.weights)[0]
+        if kind == 'catalog':
+            name = rng.choice([name for name in CATALOG_TABLES if self.ids[name]])
+            return f'GET /{name}/<id>', 'GET', f'/api/v1/{name}/{rng.choice(self.ids[name])}', None
+        if kind == 'dosing':
+            url = f'/api/v1/dosing?drug_id={rng.choice(self.ids["dosing"])}&age_days={rng.choice(DOSING_AGES)}'
+            return 'GET /dosing', 'GET', url, None
+        if kind == 'login':
+            return 'POST /login', 'POST', '/api/v1/login', {'email': BENCH_EMAIL, 'password': BENCH_PASSWORD}
+        if kind == 'update':
+            name = rng.choice([name for name in UPDATE_FIELDS if self.ids[name]])
+            field, values = UPDATE_FIELDS[name]
+            row_id = rng.choice(self.ids[name][:UPDATE_HOT_ROWS])
+            return f'PUT /{name}/<id>', 'PUT', f'/api/v1/{name}/{row_id}', {field: rng.choice(values)}
+        return ('POST /companies', 'POST', '/api/v1/companies',
+                {'name': f'LOAD TEST {uuid.uuid4().hex}', 'address': 'Load test address'})
+
+    def take_slot(self):
+        with self._lock:
+            slot = self._next_slot
+            self._next_slot += 1
+            return slot
+
+    def worker(self, index, started, rate, deadline):
+        rng = random.Random(self.seed * 1000 + index)
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+        while True:
+            scheduled = started + self.take_slot() / rate
+            if scheduled >= deadline:
+                break
+            delay = scheduled - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            name, method, url, body = self.build_request(rng)
+            try:
+                connection.request(method, url, body=json.dumps(body) if body is not None else None,
+                                   headers=self.headers)
+                response = connection.getresponse()
+                response.read()
+                ok = response.status < 400
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+                ok = False
+            finished = time.monotonic()
+            with self._lock:
+                self.latencies[name].append(finished - scheduled)
+                if not ok:
+                    self.errors[name] += 1
+        connection.close()
+
+    def run(self, rate, duration, concurrency):
+        """Replay the mix at ``rate`` requests/sec for ``duration`` seconds."""
+        self.latencies.clear()
+        self.errors.clear()
+        self._next_slot = 0
+        started = time.monotonic()
+        deadline = started + duration
+        threads = [threading.Thread(target=self.worker, args=(index, started, rate, deadline))
+                   for index in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.monotonic() - started
+
+
+def latency_stats(latencies):
+    """Return latency percentiles in milliseconds."""
+    latencies = sorted(latency * 1000 for latency in latencies)
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=100, method='inclusive')
+        p95, p99 = percentiles[94], percentiles[98]
+    else:
+        p95 = p99 = latencies[0]
+    return {
+        'p50_ms': round(statistics.median(latencies), 2),
+        'p95_ms': round(p95, 2),
+        'p99_ms': round(p99, 2),
+        'max_ms': round(latencies[-1], 2),
+    }
+
+
+def login(port):
+    """Log in as the benchmark user, returning an access token."""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        connection.request('POST', '/api/v1/login', body=json.dumps({'email': BENCH_EMAIL, 'password': BENCH_PASSWORD}),
+                           headers={'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        body = json.loads(response.read())
+    finally:
+        connection.close()
+    if response.status != 200:
+        raise RuntimeError(f'login failed: {body}')
+    return body['access_token']
+
+
+def run_load_test(args, path):
+    """Start gunicorn on a database, replay the mix and return the results."""
+    ids = load_ids(path)
+    port = free_port()
+    server = start_gunicorn(path, port, args.workers, args.threads, not args.no_preload)
+    try:
+        client = LoadClient(port, ids, args.mix, login(port), args.seed)
+        if args.warmup > 0:
+            client.run(args.rate, args.warmup, args.concurrency)
+
+        sampler = ProcessSampler(server.pid)
+        sampler.start()
+        elapsed = client.run(args.rate, args.duration, args.concurrency)
+        sampler.stop()
+    finally:
+        server.terminate()
+        server.wait()
+
+    total = sum(len(latencies) for latencies in client.latencies.values())
+    all_latencies = [latency for latencies in client.latencies.values() for latency in latencies]
+    return {
+        'gunicorn': {'workers': args.workers, 'threads': args.threads, 'preload': not args.no_preload},
+        'target_rate': args.rate,
+        'concurrency': args.concurrency,
+        'duration_s': round(elapsed, 2),
+        'requests': total,
+        'throughput_rps': round(total / elapsed, 1),
+        'errors': sum(client.errors.values()),
+        'latency': latency_stats(all_latencies) if all_latencies else None,
+        'endpoints': {
+            name: {
+                'requests': len(latencies),
+                'errors': client.errors[name],
+                'throughput_rps': round(len(latencies) / elapsed, 1),
+                **latency_stats(latencies),
+            }
+            for name, latencies in sorted(client.latencies.items())
+        },
+        'processes': sampler.report(),
+    }
+
+
+def print_report(results):
+    """Print the results as a table."""
+    gunicorn = results['gunicorn']
+    print(f"gunicorn: {gunicorn['workers']} worker(s) x {gunicorn['threads']} thread(s), "
+          f"preload={gunicorn['preload']}")
+    print(f"Target {results['target_rate']} req/s, achieved {results['throughput_rps']} req/s "
+          f"({results['requests']} requests, {results['errors']} errors in {results['duration_s']} s)")
+    print()
+    print(f"{'endpoint':<28} {'reqs':>7} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = list(results['endpoints'].items())
+    if results['latency']:
+        rows.append(('all', {'requests': results['requests'], 'errors': results['errors'],
+                             'throughput_rps': results['throughput_rps'], **results['latency']}))
+    for name, stats in rows:
+        print(f"{name:<28} {stats['requests']:>7} {stats['errors']:>7} {stats['throughput_rps']:>8} "
+              f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}")
+    print()
+    processes = results['processes']
+    if processes['master']:
+        print(f"master: {processes['master']['cpu_percent']}% CPU, {processes['master']['peak_rss_mb']} MB peak RSS")
+    for worker in processes['workers']:
+        print(f"worker {worker['pid']}: {worker['cpu_percent']}% CPU, {worker['peak_rss_mb']} MB peak RSS")
+    print(f"workers total: {processes['workers_cpu_percent']}% CPU, {processes['workers_rss_mb']} MB RSS")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the app under gunicorn')
+    parser.add_argument('--database', metavar='PATH',
+                        help='SQLite database to serve; seeded first if it does not exist (default: a temporary one)')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='Size of the seeded catalog, as multiples of the json_data files')
+    parser.add_argument('--workers', type=int, default=2, help='Gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=1, help='Threads per gunicorn worker')
+    parser.add_argument('--no-preload', action='store_true', help='Start gunicorn without --preload')
+    parser.add_argument('--rate', type=float, default=100, help='Target requests per second')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds of measured load')
+    parser.add_argument('--warmup', type=float, default=3, help='Seconds of unmeasured load before measuring')
+    parser.add_argument('--concurrency', type=int, default=16, help='Client threads (maximum requests in flight)')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f'Request kinds and their weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the request mix')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='load-test-') as tmp_dir:
+        path = os.path.abspath(args.database) if args.database else os.path.join(tmp_dir, 'load.db')
+        if not os.path.exists(path):
+            print(f"Seeding a {args.scale}x catalog into {path}...", file=sys.stderr)
+            seed_database(path, args.scale)
+        results = run_load_test(args, path)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
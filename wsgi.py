@@ -1,8 +1,6 @@
 import os
 import sys
-from flask_migrate import upgrade
-from app import create_app, db
-from app.models.user import User
+from app import create_app
 
 # Use FLASK_ENV if set, otherwise use 'production'
 env = os.getenv('FLASK_ENV', 'production')
@@ -11,28 +9,14 @@ app = create_app(env)
 # For compatibility with common WSGI servers like Gunicorn
 application = app  # This is for WSGI servers that look for 'application'
 
-# Initialize database when running on Render
+# Migrate and seed the database when running on Render; only the first
+# process to start does so, the others go on once the database is current
 if os.getenv('RENDER'):
-    with app.app_context():
-        try:
-            # Run migrations
-            upgrade()
-            
-            # Add admin user if doesn't exist
-            admin = User.query.filter_by(email='admin@example.com').first()
-            if not admin:
-                from werkzeug.security import generate_password_hash
-                admin = User(
-                    email='admin@example.com',
-                    username='admin',
-                    admin=True
-                )
-                admin.password = 'adminpassword'  # Will be hashed by the model
-                db.session.add(admin)
-                db.session.commit()
-                print("Created admin user: admin@example.com with password: adminpassword")
-        except Exception as e:
-            print(f"Error initializing database: {e}")
+    from app.utils.migration_gate import ensure_database
+    try:
+        ensure_database(app)
+    except Exception as e:
+        print(f"Error initializing database: {e}")
 
 if __name__ == "__main__":
     app.run(host='0.0.0.0', port=int(os.getenv('PORT', 10000))) 
\ No newline at end of file